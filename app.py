@@ -3,10 +3,35 @@ Face Recognition Attendance System - Multi-Frame Consensus Verification
 Robust, real-time event-driven system with production-safe thresholds.
 
 Controls:
-    r -> Register new user
+    r -> Register new user (type name on screen, Enter to confirm)
     i -> Punch-In
     o -> Punch-Out
+    Esc -> Cancel running registration
     q -> Quit
+
+Punch verification and registration run as background jobs; the live
+preview and face detection keep running at full rate meanwhile.
+
+With --headless (HEADLESS) there is no window: nothing is drawn and the
+same actions are triggered through the local control socket instead
+(python -m src.control in|out|register NAME|cancel|status|quit).
+
+With --serve there is no camera at all: other programs send images to a
+local HTTP/WebSocket service (see src/service.py and ServiceSystem).
+
+With --auto (AUTO_PUNCH) no key is needed: every tracked face that reaches
+consensus and passes the thresholds is punched once per AUTO_PUNCH_DEDUP,
+with the punch type chosen by AUTO_PUNCH_RULE.
+
+Usage:
+    python app.py                                  # FRAME_SOURCE from config.py
+    python app.py --source video:recording.mp4 --fast
+    python app.py --source images:frames/ --loop
+    python app.py --source synthetic
+    python app.py --source camera:0 --source camera:1   # one process, two cameras
+    python app.py --headless                       # turnstile box, no display
+    python app.py --auto                           # touchless entrance
+    python app.py --serve                          # HTTP/WebSocket service on SERVICE_ADDRESS
 """
 
 # FIX #1: SILENCE TENSORFLOW SPAM - Set ALL logging levels
@@ -22,7 +47,13 @@ import cv2
 import numpy as np
 from datetime import datetime
 import pandas as pd
+import threading
 import time
+import asyncio
+import json
+from collections import deque
+from functools import partial
+from http import HTTPStatus
 
 # Suppress TensorFlow and Keras logging
 import tensorflow as tf
@@ -41,6 +72,16 @@ from config import (
     LIVE_WEIGHT,
     REG_SAMPLES,
     REG_LIVENESS_MIN,
+    REG_MIN_SAMPLES,
+    REG_CANDIDATES,
+    REG_MAX_CANDIDATES,
+    REG_DUP_SIMILARITY,
+    REG_MIN_FACE_SIZE,
+    REG_MIN_SHARPNESS,
+    REG_TEMPLATES,
+    RETAIN_CROPS,
+    CROP_PACK_PATH,
+    CROP_JPEG_QUALITY,
     ATTENDANCE_CSV,
     CONSENSUS_FRAMES,
     CONSENSUS_THRESHOLD,
@@ -49,15 +90,104 @@ from config import (
     REJECTION_LOW_SIM,
     REJECTION_LOW_CONF,
     REJECTION_LOW_LIVE,
+    TEMPORAL_WINDOW,
+    TEMPORAL_CROP_SIZE,
+    TEMPORAL_MIN_FRAMES,
+    TEMPORAL_LIVE_WEIGHT,
+    TRACK_IOU_THRESHOLD,
+    TRACK_MAX_MISSED,
+    WORKER_THREADS,
+    INFER_MAX_BATCH,
+    INFER_MAX_WAIT,
+    INFER_ADAPTIVE_WAIT,
+    SEQUENTIAL_CONSENSUS,
+    VERIFY_TIME_BUDGET,
+    RESULT_BUFFER_SIZE,
+    RESULT_MAX_AGE,
+    JOB_RESULT_DISPLAY,
+    GALLERY_MODE,
+    PQ_SUBSPACES,
+    PQ_CENTROIDS,
+    PQ_RERANK,
+    PQ_EXACT_PATH,
+    PQ_MIN_TRAIN,
+    BINARY_BITS,
+    BINARY_SHORTLIST,
+    GALLERY_SHARDS,
+    SHARD_START_METHOD,
+    SHARD_TIMEOUT,
+    EMBEDDINGS_PATH,
+    PCA_DIM,
+    PCA_WHITEN,
+    PCA_MIN_TRAIN,
+    PCA_PATH,
+    SHARED_GALLERY,
+    SHARED_GALLERY_DIR,
+    SHARED_POLL_INTERVAL,
+    DB_WATCH,
+    DB_POLL_INTERVAL,
+    FRAME_SOURCE,
+    FRAME_REALTIME,
+    FRAME_LOOP,
+    CAMERAS,
+    MULTI_BATCH_SIZE,
+    MULTI_PENDING_PER_STREAM,
+    MULTI_TILE_WIDTH,
+    HEADLESS,
+    CONTROL_ADDRESS,
+    STATS_INTERVAL,
+    DISPLAY_FPS,
+    DISPLAY_SCALE,
+    SCHED_ADAPTIVE,
+    FRAME_SKIP,
+    SCHED_CPU_BUDGET,
+    SCHED_TARGET_LATENCY,
+    SCHED_MAX_DETECT_INTERVAL,
+    SCHED_MAX_RECOGNIZE_INTERVAL,
+    SCHED_PERIOD,
+    MOTION_GATE,
+    MOTION_WIDTH,
+    MOTION_PIXEL_DELTA,
+    MOTION_MIN_AREA,
+    MOTION_IDLE_AFTER,
+    MOTION_BG_RATE,
+    IDENTITY_CACHE,
+    IDENTITY_REVERIFY,
+    IDENTITY_MAX_JUMP,
+    IDENTITY_MAX_SCALE,
+    AUTO_PUNCH,
+    AUTO_PUNCH_RULE,
+    AUTO_PUNCH_SCHEDULE,
+    AUTO_PUNCH_DEDUP,
+    SERVICE_ADDRESS,
+    SERVICE_MAX_BODY,
 )
 
 # Import all modules
 from src.camera import get_camera
 from src.face_detector import detect_face
-from src.embedding_model import get_embedding
-from src.recognition import recognize_single, recognize_consensus
-from src.liveness import liveness
-from src.database import load_db, save_db
+from src.recognition import recognize_single, recognize_batch, recognize_consensus, SequentialConsensus
+from src.liveness import TemporalLiveness, fuse_liveness
+from src.tracking import FaceTracker
+from src.workers import configure_pool, get_pool, analyze_face, analyze_faces
+from src.inference import configure_inference, embed, get_scheduler, inference_report
+from src.result_buffer import RecentResults
+from src.jobs import FrameFeed, BackgroundJob
+from src.enrollment import EnrollmentSelector
+from src.crop_store import CropStore
+from src.database import load_db, save_db, update_db, db_version, diff_db, DatabaseWatcher
+from src.gallery import build_gallery, count_templates, kmeans_templates
+from src.pca import PCAProjection
+from src.sharding import ShardedGallery
+from src.shared_gallery import SharedGalleryStore, db_view
+from src.streams import FairBatcher
+from src.control import ControlChannel
+from src.metrics import StageStats
+from src.scheduler import AdaptiveScheduler
+from src.motion import MotionGate
+from src.identity_cache import IdentityCache
+from src.autopunch import AutoPuncher, PunchRules
+from src.service import HttpService, HttpError, decode_image
 
 
 # ============================================================================
@@ -139,6 +269,16 @@ def draw_confidence_meter(img, center_x, center_y, confidence, radius=32):
                cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
 
 
+def draw_progress_bar(img, progress, color=(0, 200, 100)):
+    """
+    Draw thin progress bar under the status banner.
+    Shows completion of background jobs (verification, registration).
+    """
+    w = img.shape[1]
+    cv2.rectangle(img, (0, 50), (w, 56), (30, 30, 30), -1)
+    cv2.rectangle(img, (0, 50), (int(w * progress), 56), color, -1)
+
+
 def draw_identity_badge(img, x, y, w, h, name):
     """
     Draw professional identity badge below face.
@@ -151,6 +291,55 @@ def draw_identity_badge(img, x, y, w, h, name):
                cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 200), 2)
 
 
+def make_motion_gate():
+    """Motion gate configured from config.py, or None if MOTION_GATE is off."""
+    if not MOTION_GATE:
+        return None
+    return MotionGate(MOTION_WIDTH, MOTION_PIXEL_DELTA, MOTION_MIN_AREA,
+                      MOTION_IDLE_AFTER, MOTION_BG_RATE)
+
+
+def make_identity_cache():
+    """Track identity cache configured from config.py, or None if IDENTITY_CACHE is off."""
+    if not IDENTITY_CACHE:
+        return None
+    return IdentityCache(IDENTITY_REVERIFY, IDENTITY_MAX_JUMP, IDENTITY_MAX_SCALE)
+
+
+def blit(frame, dst):
+    """
+    Copy or resize a frame into a preallocated display buffer, so the
+    preview never allocates a new frame.
+    
+    Returns:
+        float: Scale from frame to buffer coordinates
+    """
+    if frame.shape == dst.shape:
+        np.copyto(dst, frame)
+        return 1.0
+    cv2.resize(frame, (dst.shape[1], dst.shape[0]), dst=dst, interpolation=cv2.INTER_AREA)
+    return dst.shape[1] / frame.shape[1]
+
+
+def scale_box(box, scale):
+    """Face box (x, y, w, h) in display-buffer coordinates."""
+    if box is None or scale == 1.0:
+        return box
+    return tuple(int(v * scale) for v in box)
+
+
+def draw_tile_label(tile, index, label, active=False):
+    """
+    Frame and name one camera tile of a multi-camera window.
+    The active camera (keyboard target) is highlighted.
+    """
+    h, w = tile.shape[:2]
+    color = (0, 255, 255) if active else (200, 200, 200)
+    cv2.rectangle(tile, (0, 0), (w - 1, h - 1), color, 2 if active else 1)
+    cv2.putText(tile, f"[{index+1}] {label}", (8, h - 10),
+               cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 1)
+
+
 class FaceAttendanceSystem:
     """
     Multi-frame consensus face recognition system.
@@ -160,21 +349,59 @@ class FaceAttendanceSystem:
     problem where unregistered faces get accepted as the "closest match".
     """
     
-    def __init__(self):
-        """Initialize the system."""
+    def __init__(self, source=FRAME_SOURCE, realtime=FRAME_REALTIME, loop=FRAME_LOOP,
+                 headless=HEADLESS, auto_punch=AUTO_PUNCH, control=None):
+        """
+        Initialize the system.
+        
+        Args:
+            source (str): Frame source spec (see src/camera.py), or None when
+                          the cameras are opened by a subclass
+            realtime (bool): Replay recordings at their frame rate
+            loop (bool): Restart recordings when they end
+            headless (bool): No window; commands come from the control socket
+            auto_punch (bool): Punch recognized faces without a keypress
+            control (bool): Listen on the control socket (default: when headless)
+        """
         print("\n" + "="*60)
         print("  FACE RECOGNITION ATTENDANCE SYSTEM")
         print("  Multi-Frame Consensus Verification")
         print("="*60 + "\n")
         
-        try:
-            self.cap = get_camera()
-            print("[+] Camera initialized")
-        except RuntimeError as e:
-            print(f"[-] Error: {e}")
-            raise
+        self.cap = None
+        self.camera_name = source  # Logged with every punch
+        if source is not None:
+            try:
+                self.cap = get_camera(source, realtime, loop)
+                print(f"[+] Frame source initialized ({source})")
+            except RuntimeError as e:
+                print(f"[-] Error: {e}")
+                raise
         
-        self.db = load_db()
+        self._quantizer = None  # PQ codebooks, reused until the gallery doubles
+        self._quantizer_rows = 0  # Templates the codebooks were trained on
+        self._projection = None  # PCA projection, fitted/loaded once and reused
+        self._db_lock = threading.Lock()  # Serializes gallery writers
+        self.store = None
+        if SHARED_GALLERY:
+            # Map the published gallery instead of loading a private copy
+            self.store = SharedGalleryStore(SHARED_GALLERY_DIR)
+            with self.store.writer():
+                if self.store.generation is None:
+                    self.store.publish(load_db())
+            self.store.changed()
+            self.gallery = self.store.load()
+            self.db = db_view(self.gallery)
+            self._last_poll = time.time()
+            print(f"[+] Shared gallery generation {self.gallery.generation} mapped")
+        else:
+            self.db = load_db()
+            self.gallery = self._build_gallery(self.db)  # Matching structure
+        
+        # Users enrolled elsewhere are applied live (the shared store has its own poll)
+        self.watcher = None
+        if DB_WATCH and self.store is None:
+            self.watcher = DatabaseWatcher(self._on_db_change, DB_POLL_INTERVAL).start()
         print(f"[+] Database loaded ({len(self.db)} users registered)")
         
         # Initialize attendance CSV if not exists
@@ -185,9 +412,59 @@ class FaceAttendanceSystem:
         self.last_action_time = 0
         self.COOLDOWN = 3  # seconds between allowed actions
         
+        # FIX #2: Skip frames to reduce FaceNet calls - how many is now
+        # re-planned from measured latencies
+        self.scheduler = AdaptiveScheduler(SCHED_CPU_BUDGET, SCHED_TARGET_LATENCY,
+                                           SCHED_MAX_DETECT_INTERVAL,
+                                           SCHED_MAX_RECOGNIZE_INTERVAL, SCHED_PERIOD,
+                                           SCHED_ADAPTIVE, FRAME_SKIP)
+        self.frame_count = 0
+        self._last_box = None               # Carried over on frames without detection
+        self.prediction = (None, 0.0, 0.0)  # Latest (name, face_sim, live_score)
+        self.gate = make_motion_gate()      # Idles detection while nothing moves
+        
         # Track last attendance per user to prevent duplicate punches
         # Format: {(user, punch_type): timestamp}
         self.last_attendance = {}
+        self._csv_lock = threading.Lock()  # Punch jobs may log concurrently
+        
+        # Touchless mode: tracks reaching consensus are punched without a key
+        self.autopunch = self._make_autopuncher() if auto_punch else None
+        self.auto_result = None  # (status, time) of the last auto-punch, for the overlay
+        
+        # Embedding + liveness run concurrently on a shared worker pool
+        configure_pool(WORKER_THREADS)
+        configure_inference(INFER_MAX_BATCH, INFER_MAX_WAIT, INFER_ADAPTIVE_WAIT)
+        get_scheduler()  # Load the model now, not on the first face
+        
+        # Face tracks and per-track micro-motion buffers for temporal liveness
+        self.tracker = FaceTracker(TRACK_IOU_THRESHOLD, TRACK_MAX_MISSED)
+        self.temporal = TemporalLiveness(TEMPORAL_WINDOW, TEMPORAL_CROP_SIZE,
+                                         TEMPORAL_MIN_FRAMES)
+        self.identities = make_identity_cache()  # Skips recognition of known tracks
+        
+        # Recent per-frame analysis from the live loop, reused by punches
+        self.recent = RecentResults(RESULT_BUFFER_SIZE)
+        
+        # Live loop publishes frames to background jobs (punch / registration)
+        self.feed = FrameFeed()
+        self.job = None
+        self.name_entry = None          # Registration name being typed, or None
+        self.pending_overwrite = False  # Waiting for y/n on existing user
+        
+        # Headless: punch triggers arrive on the control socket, nothing is drawn
+        self.headless = headless
+        self.control = None
+        self.stats = StageStats()
+        self._last_stats = time.time()
+        self._stop = threading.Event()  # Ends the pipeline and display loops
+        self._display = None            # Preallocated display buffer
+        self._display_ticks = 0
+        if control is None:
+            control = headless
+        if control:
+            self.control = ControlChannel(CONTROL_ADDRESS).start()
+            print(f"[+] Headless mode: control channel on {CONTROL_ADDRESS}")
         
         self._print_controls()
     
@@ -201,22 +478,306 @@ class FaceAttendanceSystem:
             ])
             df.to_csv(ATTENDANCE_CSV, index=False)
     
+    def _make_autopuncher(self):
+        """
+        Auto-punch voting configured from config.py. Today's accepted punches
+        are replayed from the log so alternating punch types survive a restart.
+        """
+        rules = PunchRules(AUTO_PUNCH_RULE, AUTO_PUNCH_SCHEDULE)
+        try:
+            df = pd.read_csv(ATTENDANCE_CSV)
+            df["time"] = pd.to_datetime(df["time"])
+            today = df[(df["status"] == "ACCEPTED") & (df["time"].dt.date == datetime.now().date())]
+            for row in today.itertuples():
+                rules.record(row.name, row.punch_type, row.time.to_pydatetime())
+        except (OSError, KeyError, ValueError) as e:
+            print(f"[-] Could not replay today's punches: {e}")
+        print(f"[+] Auto-punch on ({AUTO_PUNCH_RULE} punch types, "
+              f"once per {AUTO_PUNCH_DEDUP:.0f}s per person)")
+        return AutoPuncher(rules, CONSENSUS_FRAMES, CONSENSUS_THRESHOLD,
+                           MIN_FRAMES_FOR_DECISION, AUTO_PUNCH_DEDUP)
+    
     def _print_controls(self):
         """Print control instructions."""
+        if self.headless:
+            print("-> Commands: in | out | register NAME [--overwrite] | cancel | status | quit")
+            print("   e.g. python -m src.control in\n")
+            return
         print("\n" + "-"*60)
         print("KEYBOARD CONTROLS:")
         print("-"*60)
-        print("  [R] -> Register new user")
-        print("  [I] -> Punch-In")
-        print("  [O] -> Punch-Out")
-        print("  [Q] -> Quit")
+        print("  [R]   -> Register new user (type name in window)")
+        print("  [I]   -> Punch-In")
+        print("  [O]   -> Punch-Out")
+        print("  [Esc] -> Cancel registration")
+        print("  [Q]   -> Quit")
         print("-"*60 + "\n")
     
+    def _observe(self, face, box):
+        """
+        Update face tracks and temporal liveness with this frame's detection.
+        
+        Called on every frame (live loop and verification) so the micro-motion
+        buffer is already warm when a punch is requested.
+        
+        Returns:
+            tuple: (track_id, temporal_score) - temporal_score may be None
+        """
+        track_ids = self.tracker.update([box] if box is not None else [])
+        for lost_id in self.tracker.lost:
+            self.temporal.reset(lost_id)
+        
+        track_id = track_ids[0] if face is not None and box is not None else None
+        if self.identities is not None:
+            self.identities.observe(track_id, box, self.tracker.lost)
+        if self.autopunch is not None:
+            for lost_id in self.tracker.lost:
+                self.autopunch.forget((self.camera_name, lost_id))
+        if track_id is None:
+            return None, None
+        
+        return track_id, self.temporal.update(track_id, face)
+    
+    def _known_identity(self, track_id):
+        """
+        Cached prediction of a confidently identified track.
+        
+        Returns:
+            tuple: (name, face_sim, live_score), or None if recognition should run
+                   (unknown track, or its periodic re-verification is due)
+        """
+        if self.identities is None or track_id is None:
+            return None
+        entry = self.identities.lookup(track_id)
+        return entry.prediction if entry is not None else None
+    
+    def _remember_identity(self, track_id, box, name, face_sim, live_score):
+        """Cache a confident recognition for the track; anything else drops its identity."""
+        if self.identities is None:
+            return
+        if self.autopunch is not None and not self.autopunch.settled((self.camera_name, track_id)):
+            return  # Auto-punch still needs fresh results of this track to vote on
+        confident = (name is not None and face_sim >= FACE_SIM_THRESHOLD and
+                     live_score >= LIVENESS_THRESHOLD)
+        self.identities.store(track_id, box, name, face_sim, live_score, confident)
+    
+    def _forget_identities(self):
+        """Drop all cached identities - the gallery they were matched against changed."""
+        for camera in self._cameras():
+            if camera.identities is not None:
+                camera.identities.clear()
+    
+    def _current_track(self):
+        """
+        Track id of the face currently in view.
+        
+        Returns:
+            Track id, or None if the latest frame has no face
+        """
+        latest = self.feed.latest()
+        if latest is None or latest.face is None:
+            return None
+        return latest.track_id
+    
+    def _progress(self, status, progress=None, level=None):
+        """Report progress of the running job to the overlay."""
+        if self.job is not None:
+            self.job.report(status, progress, level)
+    
+    def _projection_for(self, db):
+        """
+        PCA projection for matching, or None to match in full dimension.
+        
+        Loaded from PCA_PATH, or fitted once on the gallery as soon as it is
+        large enough to support PCA_DIM components, then reused for every
+        rebuild so stored and query projections always agree.
+        """
+        if not PCA_DIM:
+            return None
+        if self._projection is None:
+            if os.path.exists(PCA_PATH):
+                self._projection = PCAProjection.load(PCA_PATH)
+                if not self._projection.calibrated:
+                    # Raw projected scores don't mean what FACE_SIM_THRESHOLD means
+                    print(f"[!] {PCA_PATH} has no score calibration - refitting on the gallery")
+                    self._projection = None
+            if self._projection is None:
+                if count_templates(db) < max(PCA_MIN_TRAIN, PCA_DIM):
+                    return None
+                templates = [np.atleast_2d(value) for value in db.values()]
+                labels = np.repeat(np.arange(len(templates)), [len(t) for t in templates])
+                self._projection = PCAProjection(PCA_DIM, PCA_WHITEN).fit(np.concatenate(templates),
+                                                                         labels=labels)
+                self._projection.save(PCA_PATH)
+                self._quantizer = None  # Codebooks were trained in the full dimension
+                print(f"[+] PCA projection fitted: {PCA_DIM}-D keeps "
+                      f"{self._projection.explained.sum():.1%} of embedding energy")
+        return self._projection
+    
+    def _build_gallery(self, db):
+        """Build the matching structure for GALLERY_MODE from a database dict."""
+        if self.store is not None:
+            return self.store.publish(db)  # Other processes switch on their next poll
+        projection = self._projection_for(db)
+        if GALLERY_SHARDS:
+            return self._build_sharded(db, projection)
+        if GALLERY_MODE == "binary":
+            return build_gallery(db, "binary", projection=projection,
+                                 bits=BINARY_BITS, shortlist=BINARY_SHORTLIST)
+        if GALLERY_MODE != "pq":
+            return build_gallery(db, GALLERY_MODE, projection=projection)
+        
+        # Codebooks trained on a handful of templates would quantize everyone
+        # enrolled later badly: search exactly until there is enough to train on
+        rows = count_templates(db)
+        if rows < PQ_MIN_TRAIN:
+            return build_gallery(db, "exact", projection=projection)
+        if self._pq_retrain_due(rows):
+            self._quantizer = None
+        
+        gallery = build_gallery(db, "pq", projection=projection, quantizer=self._quantizer,
+                                num_subspaces=PQ_SUBSPACES, num_centroids=PQ_CENTROIDS,
+                                rerank=PQ_RERANK, exact_path=PQ_EXACT_PATH)
+        quantizer = gallery.inner.quantizer if projection is not None else gallery.quantizer
+        if quantizer is not self._quantizer and quantizer.trained:
+            print(f"[+] PQ codebooks trained on {rows} templates")
+            self._quantizer, self._quantizer_rows = quantizer, rows
+        return gallery
+    
+    def _pq_retrain_due(self, rows):
+        """True if PQ codebooks should be (re)trained for a gallery of `rows` templates."""
+        return (GALLERY_MODE == "pq" and rows >= PQ_MIN_TRAIN
+                and (self._quantizer is None or rows >= 2 * self._quantizer_rows))
+    
+    def _build_sharded(self, db, projection):
+        """
+        Start the shard workers, or make the affected shards reload the saved
+        database. Shards build their own galleries, so PQ codebooks live in
+        RAM per shard rather than in PQ_EXACT_PATH.
+        """
+        if GALLERY_MODE == "binary":
+            options = {"bits": BINARY_BITS, "shortlist": BINARY_SHORTLIST}
+        elif GALLERY_MODE == "pq":
+            options = {"num_subspaces": PQ_SUBSPACES, "num_centroids": PQ_CENTROIDS,
+                       "rerank": PQ_RERANK}
+        else:
+            options = {}
+        options["projection"] = projection
+        
+        gallery = getattr(self, "gallery", None)
+        if not isinstance(gallery, ShardedGallery):
+            gallery = ShardedGallery(GALLERY_SHARDS, EMBEDDINGS_PATH, GALLERY_MODE, options,
+                                     start_method=SHARD_START_METHOD, timeout=SHARD_TIMEOUT)
+            print(f"[+] Gallery sharded across {GALLERY_SHARDS} worker processes")
+        elif projection is not gallery.options.get("projection"):
+            gallery.options = options
+            for i in range(gallery.num_shards):
+                gallery.restart(i)  # New projection: every shard rebuilds
+        else:
+            changed = {name for name in db.keys() | self.db.keys()
+                       if db.get(name) is not self.db.get(name)}
+            gallery.reload(changed)
+        return gallery
+    
+    def _update_gallery(self, db, upserts, removals=()):
+        """
+        Matching structure for `db`, derived from the current one by encoding
+        only the changed identities. The shared store applies the change to
+        its newest generation. Full builds remain for sharded and empty
+        galleries, when a PCA projection was just fitted and when PQ codebooks
+        are due for (re)training.
+        """
+        if self.store is not None:
+            return self.store.update(upserts, removals)
+        if GALLERY_SHARDS or len(self.gallery) == 0:
+            return self._build_gallery(db)
+        if self._pq_retrain_due(count_templates(db)):
+            return self._build_gallery(db)
+        if self._projection_for(db) is not getattr(self.gallery, "projection", None):
+            return self._build_gallery(db)
+        return self.gallery.updated(upserts, removals)
+    
+    def _on_db_change(self, db, version):
+        """
+        Apply a database saved by another process (runs on the watcher thread).
+        
+        Only the delta is encoded; recognition keeps using the old gallery
+        until the new one replaces it in a single assignment.
+        """
+        with self._db_lock:
+            if version != db_version():
+                return  # Saved again meanwhile (maybe by us) - next poll has it
+            upserts, removals = diff_db(self.db, db)
+            if not upserts and not removals:
+                return  # Our own save, or nothing that matters
+            self.gallery = self._update_gallery(db, upserts, removals)
+            self.db = db
+            self._forget_identities()
+        print(f"[+] Database updated: {len(upserts)} added/changed, "
+              f"{len(removals)} removed ({len(db)} users)")
+    
+    def _commit_user(self, name, embedding):
+        """
+        Add or replace a user (one or more templates) in the gallery atomically.
+        
+        Copy-on-write: a new dict is built, saved, then swapped in with a single
+        assignment, so recognition running concurrently always sees either
+        the old or the new gallery - never a half-written user.
+        """
+        with self._db_lock:
+            if self.store is not None:
+                # Our mapping may be a generation behind: apply the change to
+                # the current one under the store's cross-process writer lock
+                with self.store.writer():
+                    self.gallery = self.store.update({name: embedding})
+                    self.db = db_view(self.gallery)
+                    save_db({user: np.array(value) for user, value in self.db.items()})
+            else:
+                # Read-modify-write of the file under its cross-process lock:
+                # our copy may lag users saved by another kiosk
+                db = update_db({name: embedding})
+                upserts, removals = diff_db(self.db, db)
+                self.gallery = self._update_gallery(db, upserts, removals)
+                self.db = db
+            self._forget_identities()
+    
+    def _poll_shared_gallery(self):
+        """
+        Switch to a newer shared-gallery generation published by another
+        process. Costs one stat() per SHARED_POLL_INTERVAL; never waits for a
+        writer - if this process is publishing, the check is simply retried.
+        """
+        now = time.time()
+        if self.store is None or now - self._last_poll < SHARED_POLL_INTERVAL:
+            return
+        self._last_poll = now
+        if not self.store.changed():
+            return
+        if not self._db_lock.acquire(blocking=False):
+            self.store.forget_seen()  # Look again on the next poll
+            return
+        try:
+            if self.store.generation != self.gallery.generation:
+                self.gallery = self.store.load()
+                self.db = db_view(self.gallery)
+                self._forget_identities()
+                print(f"[+] Shared gallery generation {self.gallery.generation} "
+                      f"({len(self.db)} users)")
+        finally:
+            self._db_lock.release()
+    
     def _verify_for_action(self, punch_type):
         """
         Fast verification for action (punch-in/out).
-        Collects exactly CONSENSUS_FRAMES with detected faces, then STOPS.
-        No unnecessary looping - exits as soon as 3 frames collected.
+        Collects up to CONSENSUS_FRAMES with detected faces, then STOPS.
+        With SEQUENTIAL_CONSENSUS it exits as soon as the accept/reject outcome
+        can no longer change (same decision as waiting for all frames).
+        Gives up after VERIFY_TIME_BUDGET seconds.
+        
+        Fresh live-loop results (younger than RESULT_MAX_AGE) for the face in
+        view are counted first; new frames are taken from the live loop's
+        frame feed (detection already done) only if they don't already settle
+        the consensus. Runs as a background job - progress goes to the overlay.
         
         Returns:
             tuple: (name, face_score, liveness_score, final_confidence)
@@ -226,29 +787,61 @@ class FaceAttendanceSystem:
         scores = []
         lives = []
         frames_collected = 0
+        consensus = SequentialConsensus(CONSENSUS_FRAMES, CONSENSUS_THRESHOLD,
+                                        MIN_FRAMES_FOR_DECISION)
+        deadline = time.time() + VERIFY_TIME_BUDGET
         
         print(f"-> {punch_type}... Detecting face...")
+        self._progress(f"{punch_type}: detecting face...", 0.0)
         
-        # Collect exactly CONSENSUS_FRAMES with detected faces
-        while frames_collected < CONSENSUS_FRAMES:
-            ret, frame = self.cap.read()
+        # Reuse what the live loop just saw of the same tracked face
+        track_id = self._current_track()
+        if track_id is not None:
+            for result in self.recent.fresh(RESULT_MAX_AGE, track_id, limit=CONSENSUS_FRAMES):
+                if SEQUENTIAL_CONSENSUS and consensus.decided:
+                    break
+                name, face_score = recognize_single(result.embedding, self.gallery,
+                                                    threshold=FACE_SIM_THRESHOLD)
+                consensus.add(name)
+                names.append(name if name else "UNKNOWN")
+                scores.append(face_score)
+                lives.append(result.liveness)
+                frames_collected += 1
+            if frames_collected:
+                print(f"  Reused {frames_collected} recent frame(s)")
+        
+        # Collect up to CONSENSUS_FRAMES with detected faces from the live loop
+        seq = self.feed.seq
+        while consensus.remaining > 0:
+            if SEQUENTIAL_CONSENSUS and consensus.decided:
+                break  # Outcome fixed - remaining frames can't change it
             
-            if not ret:
-                print("✗ Camera read error")
+            time_left = deadline - time.time()
+            if time_left <= 0:
+                print(f"[-] Verification timed out after {VERIFY_TIME_BUDGET:.1f}s "
+                      f"({frames_collected}/{CONSENSUS_FRAMES} frames)")
                 return None, 0, 0, 0
             
-            # Detect face (FAST - skip if not found)
-            face, box = detect_face(frame, return_box=True)
-            if face is None:
-                continue  # Skip frames without faces
+            seq, item = self.feed.wait_next(seq, timeout=time_left)
+            if item is None:
+                if self.feed.closed:
+                    print("✗ Camera read error")
+                    return None, 0, 0, 0
+                continue
+            
+            if item.face is None or not item.detected:
+                continue  # Skip frames without a freshly detected face
             
             # Found a face - process it
             frames_collected += 1
             
-            # Get embedding and recognition
-            emb = get_embedding(face)
-            name, face_score = recognize_single(emb, self.db, threshold=FACE_SIM_THRESHOLD)
-            liveness_score = liveness(face)
+            # Get embedding and liveness concurrently, then recognition
+            emb, static_live = analyze_face(item.face)
+            name, face_score = recognize_single(emb, self.gallery, threshold=FACE_SIM_THRESHOLD)
+            liveness_score = fuse_liveness(static_live, item.temporal_score,
+                                           TEMPORAL_LIVE_WEIGHT)
+            consensus.add(name)
+            self.recent.add(item.track_id, item.box, emb, liveness_score)
             
             # Record result
             if name:
@@ -260,45 +853,22 @@ class FaceAttendanceSystem:
                 scores.append(face_score if face_score > 0 else 0.0)
                 lives.append(liveness_score)
             
-            # Show feedback (very brief) with professional UX
-            x, y, w, h = box
             label = name if name else "Unknown"
-            confidence = face_score * 0.7 + liveness_score * 0.3
-            is_confident = (name is not None and face_score >= FACE_SIM_THRESHOLD and liveness_score >= LIVENESS_THRESHOLD)
-            color = (0, 255, 0) if is_confident else (0, 165, 255)
-            
-            # Draw biometric frame (FaceID-style brackets)
-            draw_biometric_frame(frame, x, y, w, h, color, thickness=2)
-            
-            # Draw identity badge
-            if name:
-                draw_identity_badge(frame, x, y, w, h, label)
-            
-            # Draw confidence meter
-            meter_x = x + w // 2
-            meter_y = y + h + 60
-            draw_confidence_meter(frame, meter_x, meter_y, confidence, radius=28)
-            cv2.putText(frame, f"Frame {frames_collected}/{CONSENSUS_FRAMES}", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0,255,255), 2)
-            
-            cv2.imshow("Face Attendance System", frame)
-            cv2.waitKey(1)  # Process events, don't block
+            self._progress(f"{punch_type}: {label} - frame {frames_collected}/{CONSENSUS_FRAMES}",
+                           frames_collected / CONSENSUS_FRAMES)
         
-        # All 3 frames collected - analyze results
-        named_votes = [n for n in names if n != "UNKNOWN"]
-        if len(named_votes) < MIN_FRAMES_FOR_DECISION:
-            print(f"[-] Face not recognized - insufficient matches ({len(named_votes)}/{MIN_FRAMES_FOR_DECISION})")
+        # Decision is final - analyze results
+        final_name = consensus.result()
+        if final_name is None:
+            if consensus.total_votes + consensus.remaining < MIN_FRAMES_FOR_DECISION:
+                print(f"[-] Face not recognized - insufficient matches "
+                      f"({consensus.total_votes}/{MIN_FRAMES_FOR_DECISION})")
+            else:
+                print(f"[-] No consensus ({consensus.consensus_score:.0%} < {CONSENSUS_THRESHOLD:.0%})")
             return None, 0, 0, 0
         
-        # Get consensus
-        from collections import Counter
-        vote_counts = Counter(named_votes)
-        final_name, vote_count = vote_counts.most_common(1)[0]
-        
-        # Check if consensus is strong enough
-        consensus_score = vote_count / len(names)
-        if consensus_score < CONSENSUS_THRESHOLD:
-            print(f"[-] No consensus ({consensus_score:.0%} < {CONSENSUS_THRESHOLD:.0%})")
-            return None, 0, 0, 0
+        if consensus.remaining:
+            print(f"[+] Consensus reached after {frames_collected}/{CONSENSUS_FRAMES} frames")
         
         # Average scores from matching frames only
         matching_indices = [i for i, n in enumerate(names) if n == final_name]
@@ -311,84 +881,119 @@ class FaceAttendanceSystem:
         
         return final_name, avg_face_score, avg_liveness, final_confidence
     
-    def register(self):
-        """Register a new user by capturing multiple face samples."""
-        name = input("\nEnter user name: ").strip()
+    def register(self, name):
+        """
+        Register a new user by capturing multiple face samples.
+        
+        Runs as a background job: the name is typed on the overlay, samples
+        come from the live loop's frame feed, and the finished user is
+        committed to the gallery atomically.
+        
+        Candidate crops are screened cheaply (size, sharpness, liveness) and
+        near-duplicates are skipped, so only distinct crops are embedded - all
+        of them in one batched FaceNet pass.
         
+        Args:
+            name (str): User name
+        """
+        name = name.strip()
         if not name:
             print("[-] Invalid name")
+            self._progress("Invalid name", 1.0, "warn")
             return
         
-        if name in self.db:
-            overwrite = input(f"User '{name}' exists. Overwrite? (y/n): ").strip().lower()
-            if overwrite != 'y':
-                print("✗ Registration cancelled")
-                return
-        
-        print(f"\n-> Registering '{name}'... Look at camera steadily")
-        print(f"  Capturing {REG_SAMPLES} samples...")
+        print(f"\n-> Registering '{name}'... Look at camera, turn head slightly")
+        print(f"  Capturing up to {REG_SAMPLES} distinct samples...")
         
-        samples = []
-        cv2.namedWindow("Registration", cv2.WINDOW_AUTOSIZE)
+        selector = EnrollmentSelector(REG_SAMPLES, REG_MIN_SAMPLES, REG_DUP_SIMILARITY,
+                                      REG_MIN_FACE_SIZE, REG_MIN_SHARPNESS, REG_LIVENESS_MIN)
+        seq = self.feed.seq
         
-        while len(samples) < REG_SAMPLES:
-            ret, frame = self.cap.read()
-            if not ret:
-                print("[-] Camera read error")
-                cv2.destroyWindow("Registration")
+        while not selector.full:
+            # Enough candidates seen - finish with what we have
+            if selector.seen >= REG_CANDIDATES and selector.ready:
+                break
+            
+            # No usable samples coming (too far away, too dark, or a photo)
+            if selector.seen >= REG_MAX_CANDIDATES:
+                reason = selector.rejections.most_common(1)[0][0] if selector.rejections else "duplicate"
+                print(f"[-] Registration failed: {len(selector.selected)} distinct samples in "
+                      f"{selector.seen} face frames, {REG_MIN_SAMPLES} needed "
+                      f"(rejected: {dict(selector.rejections)})")
+                self._progress(f"Registration failed: too few usable samples ({reason})", 1.0, "warn")
                 return
             
-            face = detect_face(frame)
+            if self.job is not None and self.job.cancelled:
+                print("[-] Registration cancelled")
+                self._progress("Registration cancelled", level="warn")
+                return
             
-            # Show frame with sample count
-            display = frame.copy()
-            if face is not None:
-                samples.append(get_embedding(face))
-                color = (0, 255, 0)
-                status = "DETECTED"
-            else:
-                color = (0, 0, 255)
-                status = "NO FACE"
+            seq, item = self.feed.wait_next(seq, timeout=1.0)
+            if item is None:
+                if self.feed.closed:
+                    print("[-] Camera read error")
+                    return
+                continue
             
-            cv2.putText(
-                display,
-                f"Samples: {len(samples)}/{REG_SAMPLES}",
-                (20, 40),
-                cv2.FONT_HERSHEY_SIMPLEX,
-                1.0,
-                color,
-                2
-            )
-            cv2.putText(
-                display,
-                status,
-                (20, 80),
-                cv2.FONT_HERSHEY_SIMPLEX,
-                0.8,
-                color,
-                2
-            )
+            if item.face is not None and not item.detected:
+                continue  # Carried-over box, not checked to be the only face
+            if item.face is None:
+                self._progress(f"Registering {name}: NO FACE ({len(selector.selected)}/{REG_SAMPLES})",
+                               level="warn")
+                continue
             
-            cv2.imshow("Registration", display)
-            if cv2.waitKey(1) & 0xFF == ord('q'):
-                print("[-] Registration cancelled")
-                cv2.destroyWindow("Registration")
-                return
+            verdict = selector.add(item.face)
+            progress = len(selector.selected) / REG_SAMPLES
+            if selector.ready:
+                progress = max(progress, selector.seen / REG_CANDIDATES)
+            self._progress(f"Registering {name}: {len(selector.selected)}/{REG_SAMPLES}"
+                           f" ({verdict.replace('_', ' ')})",
+                           progress, "warn" if verdict == "low_quality" else "info")
         
-        cv2.destroyWindow("Registration")
-        
-        # Average embeddings
-        avg_embedding = np.mean(samples, axis=0)
-        self.db[name] = avg_embedding
-        save_db(self.db)
+        # Embed all selected crops in one batched forward pass
+        samples = selector.samples()
+        self._progress(f"Registering {name}: embedding {len(samples)} samples...", 1.0)
+        embeddings = embed(samples)
+        print(f"  {len(samples)} samples from {selector.seen} candidates "
+              f"({selector.rejected_duplicate} near-duplicates, "
+              f"{selector.rejected_quality} low quality skipped)")
+        self._enroll_user(name, samples, embeddings)
         
         print(f"[+] '{name}' registered successfully!")
+        self._progress(f"'{name}' registered", 1.0, "ok")
+    
+    def _enroll_user(self, name, samples, embeddings):
+        """
+        Store a user from selected crops and their embeddings: several
+        templates (k-means centroids) to cover pose/lighting, committed to the
+        gallery; the crops are kept so a model change can re-embed instead
+        of re-enrolling.
+        """
+        templates = kmeans_templates(embeddings, REG_TEMPLATES)
+        self._commit_user(name, templates)
+        
+        if RETAIN_CROPS:
+            try:
+                CropStore(CROP_PACK_PATH).add(name, samples, CROP_JPEG_QUALITY)
+            except (OSError, ValueError) as e:
+                print(f"[-] Could not retain enrollment crops: {e}")
+    
+    def _analyze_batch(self, faces):
+        """
+        Embeddings (queued together with the inference scheduler) and
+        single-frame liveness of several face crops.
+        
+        Returns:
+            tuple: (embeddings array, list of liveness scores)
+        """
+        analyzed = analyze_faces(faces)
+        return np.stack([emb for emb, _ in analyzed]), [live for _, live in analyzed]
     
     def attend(self, punch_type):
         """
         Fast consensus verification for punch-in/out.
         Uses only CONSENSUS_FRAMES (3) for ~100ms latency.
-        Shows real-time face detection with bounding box.
+        Runs as a background job; the result is shown on the overlay.
         
         Args:
             punch_type (str): "Punch-In" or "Punch-Out"
@@ -400,20 +1005,11 @@ class FaceAttendanceSystem:
             print("\n" + "="*70)
             print("Status: REJECTED - No valid identity detected")
             print("="*70 + "\n")
+            self._progress(f"{punch_type} REJECTED - no valid identity", 1.0, "warn")
             return
         
         # DECISION LOGIC - Check all thresholds
-        rejection_reason = None
-        
-        if face_score < FACE_SIM_THRESHOLD:
-            rejection_reason = (REJECTION_LOW_SIM,
-                              f"Face similarity {face_score:.3f} < {FACE_SIM_THRESHOLD}")
-        elif liveness_score < LIVENESS_THRESHOLD:
-            rejection_reason = (REJECTION_LOW_LIVE,
-                              f"Liveness {liveness_score:.3f} < {LIVENESS_THRESHOLD}")
-        elif final_confidence < FINAL_CONF_THRESHOLD:
-            rejection_reason = (REJECTION_LOW_CONF,
-                              f"Final confidence {final_confidence:.3f} < {FINAL_CONF_THRESHOLD}")
+        rejection_reason = self._rejection(face_score, liveness_score, final_confidence)
         
         # Determine status
         if rejection_reason is None:
@@ -453,10 +1049,60 @@ class FaceAttendanceSystem:
         # User feedback
         if status == "ACCEPTED":
             print(f"[+] {punch_type} marked for {name}")
+            self._progress(f"{punch_type} ACCEPTED - {name}", 1.0, "ok")
+            if self.autopunch is not None:
+                self.autopunch.manual(name, punch_type)  # Alternate rule follows manual punches
             # FIX #3: Set cooldown after successful punch
             self.last_action_time = time.time()
         else:
             print(f"[-] {punch_type} rejected - {rejection_category}")
+            self._progress(f"{punch_type} REJECTED - {rejection_category}", 1.0, "warn")
+    
+    def _rejection(self, face_score, liveness_score, final_confidence):
+        """
+        Check a verified identity's scores against all thresholds.
+        
+        Returns:
+            tuple: (category, detail) of the first failed threshold, or None
+        """
+        if face_score < FACE_SIM_THRESHOLD:
+            return (REJECTION_LOW_SIM,
+                    f"Face similarity {face_score:.3f} < {FACE_SIM_THRESHOLD}")
+        if liveness_score < LIVENESS_THRESHOLD:
+            return (REJECTION_LOW_LIVE,
+                    f"Liveness {liveness_score:.3f} < {LIVENESS_THRESHOLD}")
+        if final_confidence < FINAL_CONF_THRESHOLD:
+            return (REJECTION_LOW_CONF,
+                    f"Final confidence {final_confidence:.3f} < {FINAL_CONF_THRESHOLD}")
+        return None
+    
+    def _auto_punch(self, track_id, name, face_sim, live_score):
+        """
+        Vote one live-loop recognition result of a track (auto-punch mode) and
+        punch the track once its votes reach consensus and pass the thresholds.
+        
+        A failed consensus is not logged - the track simply keeps voting while
+        it stays in view. The log write runs on the worker pool, off the
+        pipeline thread.
+        """
+        if self.autopunch is None or track_id is None:
+            return
+        key = (self.camera_name, track_id)
+        decision = self.autopunch.add(key, name, face_sim, live_score)
+        if decision is None:
+            return
+        
+        name, face_score, liveness_score, punch_type = decision
+        final_confidence = EMB_WEIGHT * face_score + LIVE_WEIGHT * liveness_score
+        if self._rejection(face_score, liveness_score, final_confidence) is not None:
+            self.autopunch.rejected(key)
+            return
+        
+        self.autopunch.accepted(key, name, punch_type)
+        get_pool().submit(self._log_attendance, name, punch_type, face_score,
+                          liveness_score, final_confidence, "ACCEPTED")
+        print(f"[+] {punch_type} marked for {name} (auto, {self.camera_name})")
+        self.auto_result = (f"{punch_type} ACCEPTED - {name}", time.time())
     
     def _log_attendance(self, name, punch_type, face_score, liveness_score, 
                         final_confidence, status, rejection_reason=None):
@@ -477,151 +1123,1105 @@ class FaceAttendanceSystem:
         current_time = datetime.now()
         last_key = (name, punch_type)
         
-        # Check if punch was logged in last 60 seconds
-        if last_key in self.last_attendance:
-            time_diff = (current_time - self.last_attendance[last_key]).total_seconds()
-            if time_diff < 60 and status == "ACCEPTED":
-                print(f"⚠ {punch_type} for {name} already logged {time_diff:.0f}s ago - skipping duplicate")
-                return
-        
-        df = pd.read_csv(ATTENDANCE_CSV)
-        
-        new_record = {
-            "name": name,
-            "time": current_time.strftime("%Y-%m-%d %H:%M:%S"),
-            "punch_type": punch_type,
-            "face_score": round(face_score, 3),
-            "liveness_score": round(liveness_score, 3),
-            "final_confidence": round(final_confidence, 3),
-            "status": status,
-            "rejection_reason": rejection_reason if rejection_reason else ""
-        }
-        
-        df = pd.concat([df, pd.DataFrame([new_record])], ignore_index=True)
-        df.to_csv(ATTENDANCE_CSV, index=False)
-        
-        # Update last attendance timestamp
-        if status == "ACCEPTED":
-            self.last_attendance[last_key] = current_time
+        with self._csv_lock:
+            # Check if punch was logged in last 60 seconds (on any camera)
+            if last_key in self.last_attendance:
+                time_diff = (current_time - self.last_attendance[last_key]).total_seconds()
+                if time_diff < 60 and status == "ACCEPTED":
+                    print(f"⚠ {punch_type} for {name} already logged {time_diff:.0f}s ago - skipping duplicate")
+                    return
+            
+            df = pd.read_csv(ATTENDANCE_CSV)
+            
+            new_record = {
+                "name": name,
+                "time": current_time.strftime("%Y-%m-%d %H:%M:%S"),
+                "punch_type": punch_type,
+                "face_score": round(face_score, 3),
+                "liveness_score": round(liveness_score, 3),
+                "final_confidence": round(final_confidence, 3),
+                "status": status,
+                "rejection_reason": rejection_reason if rejection_reason else "",
+                "camera": self.camera_name
+            }
+            
+            df = pd.concat([df, pd.DataFrame([new_record])], ignore_index=True)
+            df.to_csv(ATTENDANCE_CSV, index=False)
+            
+            # Update last attendance timestamp
+            if status == "ACCEPTED":
+                self.last_attendance[last_key] = current_time
     
     def run(self):
-        """Main event loop with real-time face detection visualization."""
-        print("-> System running. Press keys or close window to interact.\n")
-        
-        # FIX #2: Skip frames to reduce FaceNet calls
-        FRAME_SKIP = 5
-        frame_count = 0
+        """
+        Main event loop with real-time face detection visualization.
         
-        # Initialize prediction variables to persist across frames
-        name = "Unknown"
-        face_sim = 0.0
-        live_score = 0.0
+        With a window, capture and inference run on a pipeline thread and this
+        thread only redraws the latest frame and results at DISPLAY_FPS, so
+        the preview stays smooth however long inference takes. Headless, the
+        pipeline runs here and nothing is drawn.
+        """
+        if self.headless:
+            print("-> System running headless. Send commands to the control channel.\n")
+        else:
+            print("-> System running. Press keys or close window to interact.\n")
         
+        self._stop = threading.Event()
+        pipeline = None
         try:
-            while True:
-                ret, frame = self.cap.read()
-                if not ret:
-                    print("[-] Camera read error")
-                    break
-                
-                frame_count += 1
-                
-                # FIX #2: Live frame-by-frame prediction with visual feedback
-                display_frame = frame.copy()
-                
-                # Detect face and get bounding box
-                face, box = detect_face(frame, return_box=True)
-                
-                if face is not None and box is not None:
-                    x, y, w, h = box
-                    
-                    # FIX #2: Only run FaceNet every FRAME_SKIP frames (every 5th frame)
-                    if frame_count % FRAME_SKIP == 0:
-                        # Get real-time prediction
-                        emb = get_embedding(face)
-                        name, face_sim = recognize_single(emb, self.db)
-                        live_score = liveness(face)
-                    
-                    # Calculate confidence
-                    final_confidence = face_sim * 0.7 + live_score * 0.3
-                    
-                    # Determine if confident
-                    is_confident = (name is not None and 
-                                   face_sim >= FACE_SIM_THRESHOLD and 
-                                   live_score >= LIVENESS_THRESHOLD)
-                    
-                    # FIX #4: Use professional UI instead of raw text
-                    box_color = (0, 255, 0) if is_confident else (0, 165, 255)
-                    
-                    # FIX #2: Draw biometric frame (FaceID-style brackets)
-                    draw_biometric_frame(display_frame, x, y, w, h, box_color, thickness=2)
-                    
-                    # FIX #5: Draw identity badge
-                    identity_text = name if name else "Unknown"
-                    draw_identity_badge(display_frame, x, y, w, h, identity_text)
-                    
-                    # FIX #3: Draw animated scanning line
-                    draw_scanning_line(display_frame, x, y, w, h, frame_count, box_color)
-                    
-                    # FIX #4: Draw confidence meter instead of raw numbers
-                    meter_x = x + w // 2
-                    meter_y = y + h + 55
-                    draw_confidence_meter(display_frame, meter_x, meter_y, final_confidence, radius=28)
-                    
-                else:
-                    # FIX #1: Soft status banner instead of alarming red text
-                    draw_status_banner(display_frame, "Searching for face...", "info")
-                
-                # Draw instructions at bottom
-                cv2.putText(display_frame, "Press [R]egister  [I]n  [O]ut  [Q]uit", 
-                           (10, display_frame.shape[0]-10), cv2.FONT_HERSHEY_SIMPLEX,
-                           0.5, (255, 255, 255), 1)
-                
-                # Display live feed
-                cv2.imshow("Face Attendance System", display_frame)
-                
-                # Handle keyboard input
-                key = cv2.waitKey(1) & 0xFF
-                
-                if key == ord('r') or key == ord('R'):
-                    self.register()
-                
-                elif key == ord('i') or key == ord('I'):
-                    # Check cooldown to prevent duplicate punches
-                    if time.time() - self.last_action_time >= self.COOLDOWN:
-                        self.attend("Punch-In")
-                    else:
-                        print(f"⏳ Please wait {self.COOLDOWN - (time.time() - self.last_action_time):.1f}s before next punch")
-                
-                elif key == ord('o') or key == ord('O'):
-                    # Check cooldown to prevent duplicate punches
-                    if time.time() - self.last_action_time >= self.COOLDOWN:
-                        self.attend("Punch-Out")
-                    else:
-                        print(f"⏳ Please wait {self.COOLDOWN - (time.time() - self.last_action_time):.1f}s before next punch")
-                
-                elif key == ord('q') or key == ord('Q'):
-                    print("\n[+] System shutdown initiated...")
-                    break
+            if self.headless:
+                self._pipeline()
+            else:
+                pipeline = threading.Thread(target=self._pipeline, name="pipeline", daemon=True)
+                pipeline.start()
+                self._display_loop()
         
         except KeyboardInterrupt:
             print("\n[-] Interrupted by user")
         
         finally:
+            self._stop.set()
+            if pipeline is not None:
+                pipeline.join(timeout=5.0)
             self.cleanup()
     
+    def _pipeline(self):
+        """Capture and inference, frame after frame, until stopped or the source ends."""
+        try:
+            while not self._stop.is_set():
+                if not self._step():
+                    break
+                self.stats.frame_done()
+                
+                # No copy, no drawing, no window: just the control channel
+                if self.headless and not self._serve_commands():
+                    break
+        finally:
+            self._stop.set()
+    
+    def _step(self):
+        """
+        Process one frame: tracking every frame, detection and embedding +
+        liveness on the frames the scheduler picks.
+        
+        Returns:
+            bool: False if the frame source has ended
+        """
+        with self.stats.measure("capture"):
+            ret, frame = self.cap.read()
+        if not ret:
+            print("[-] Camera read error")
+            return False
+        
+        self.frame_count += 1
+        self._poll_shared_gallery()
+        
+        # Nobody around: skip detection and recognition until something moves
+        if not self._awake(frame):
+            self._observe(None, None)
+            self.feed.publish(frame, None, None)
+            return True
+        
+        # Detect face and get bounding box
+        face, box, detected = self._detect(frame)
+        
+        # Feed temporal liveness every frame (cheap 64x64 update)
+        track_id, temporal_score = self._observe(face, box)
+        
+        # Hand the frame to the display and any running punch/registration job
+        self.feed.publish(frame, face, box, track_id, temporal_score, detected)
+        
+        # FIX #2: Only run FaceNet on the frames the scheduler picks
+        if face is not None and box is not None and self.scheduler.due("recognize", self.frame_count):
+            known = self._known_identity(track_id)
+            if known is not None:
+                self.prediction = known  # Same person on the same track: nothing to re-embed
+            else:
+                # Get real-time prediction (embedding + liveness concurrently)
+                with self.stats.measure("recognize"):
+                    emb, static_live = analyze_face(face)
+                    name, face_sim = recognize_single(emb, self.gallery)
+                    live_score = fuse_liveness(static_live, temporal_score,
+                                               TEMPORAL_LIVE_WEIGHT)
+                self.recent.add(track_id, box, emb, live_score, detected=detected)
+                if detected:  # Carried-over crops only update the display
+                    self._auto_punch(track_id, name, face_sim, live_score)
+                    self._remember_identity(track_id, box, name, face_sim, live_score)
+                self.prediction = (name, face_sim, live_score)  # One assignment: display-safe
+        
+        self._reschedule(self.stats.latency("detect"), self.stats.latency("recognize"),
+                         1.0 / self.cap.fps)
+        return True
+    
+    def _awake(self, frame):
+        """
+        Motion gate: True if this frame needs detection. A tracked face or a
+        running job keeps the pipeline awake even without motion.
+        """
+        if self.gate is None:
+            return True
+        with self.stats.measure("gate"):
+            return self.gate.update(frame, busy=self._last_box is not None or self._job_busy())
+    
+    def _detect(self, frame):
+        """
+        Face detection on the frames the scheduler picks, on the first frame
+        after the motion gate wakes up and on every frame while a job runs
+        (jobs only take detected faces). In between, the last detected box
+        is carried over and re-cropped from the new frame.
+        
+        Returns:
+            tuple: (face, box, detected) or (None, None, False)
+        """
+        woke = self.gate is not None and self.gate.woke
+        if woke or self._job_busy() or self.scheduler.due("detect", self.frame_count):
+            with self.stats.measure("detect"):
+                face, box = detect_face(frame, return_box=True)
+            self._last_box = box if face is not None else None
+            return face, box, face is not None
+        if self._last_box is None:
+            return None, None, False
+        x, y, w, h = self._last_box
+        return frame[y:y+h, x:x+w], self._last_box, False
+    
+    def _reschedule(self, detect_cost, recognize_cost, frame_period):
+        """Let the scheduler re-plan from measured latencies; log changed rates."""
+        if self.scheduler.tick(detect_cost, recognize_cost, frame_period):
+            print(f"[sched] {self.scheduler.describe()} - detect {detect_cost * 1000:.0f} ms, "
+                  f"recognize {recognize_cost * 1000:.0f} ms per frame")
+    
+    def _display_loop(self):
+        """Redraw the window at DISPLAY_FPS and handle keys until stopped."""
+        interval = 1.0 / DISPLAY_FPS
+        next_tick = time.perf_counter()
+        while not self._stop.is_set():
+            with self.stats.measure("render"):
+                img = self._compose()
+                if img is not None:
+                    cv2.imshow("Face Attendance System", img)
+            
+            # Sleep in waitKey until the next refresh (keys stay responsive)
+            next_tick = max(next_tick + interval, time.perf_counter())
+            delay = max(1, int((next_tick - time.perf_counter()) * 1000))
+            key = cv2.waitKey(delay) & 0xFF
+            self._display_ticks += 1
+            if not self._handle_key(key):
+                break
+    
+    def _compose(self):
+        """
+        Draw the latest frame and results into the preallocated display buffer.
+        
+        Returns:
+            np.ndarray: The display buffer, or None before the first frame
+        """
+        latest = self.feed.latest()
+        if latest is None:
+            return None
+        h, w = latest.frame.shape[:2]
+        size = (int(h * DISPLAY_SCALE), int(w * DISPLAY_SCALE), 3)
+        if self._display is None or self._display.shape != size:
+            self._display = np.empty(size, dtype=np.uint8)
+        scale = blit(latest.frame, self._display)
+        
+        box = scale_box(latest.box, scale) if latest.face is not None else None
+        name, face_sim, live_score = self.prediction
+        self._draw_detection(self._display, box, name, face_sim, live_score, self._display_ticks)
+        
+        # Draw instructions at bottom
+        cv2.putText(self._display, "Press [R]egister  [I]n  [O]ut  [Q]uit",
+                   (10, self._display.shape[0]-10), cv2.FONT_HERSHEY_SIMPLEX,
+                   0.5, (255, 255, 255), 1)
+        return self._display
+    
+    def _draw_detection(self, img, box, name, face_sim, live_score, frame_id):
+        """Draw the face box, identity and confidence (or the search banner) and job overlay."""
+        if box is not None:
+            x, y, w, h = box
+            
+            # Calculate confidence
+            final_confidence = face_sim * 0.7 + live_score * 0.3
+            
+            # Determine if confident
+            is_confident = (name is not None and 
+                           face_sim >= FACE_SIM_THRESHOLD and 
+                           live_score >= LIVENESS_THRESHOLD)
+            
+            # FIX #4: Use professional UI instead of raw text
+            box_color = (0, 255, 0) if is_confident else (0, 165, 255)
+            
+            # FIX #2: Draw biometric frame (FaceID-style brackets)
+            draw_biometric_frame(img, x, y, w, h, box_color, thickness=2)
+            
+            # FIX #5: Draw identity badge
+            identity_text = name if name else "Unknown"
+            draw_identity_badge(img, x, y, w, h, identity_text)
+            
+            # FIX #3: Draw animated scanning line
+            draw_scanning_line(img, x, y, w, h, frame_id, box_color)
+            
+            # FIX #4: Draw confidence meter instead of raw numbers
+            meter_x = x + w // 2
+            meter_y = y + h + 55
+            draw_confidence_meter(img, meter_x, meter_y, final_confidence, radius=28)
+            
+        else:
+            # FIX #1: Soft status banner instead of alarming red text
+            draw_status_banner(img, "Searching for face...", "info")
+        
+        # Job progress / registration name entry
+        self._draw_job_overlay(img)
+    
+    def _job_busy(self):
+        """True while a punch or registration job is running."""
+        return self.job is not None and self.job.running
+    
+    def _start_job(self, title, target, *args):
+        """Run a flow as a background job (one at a time)."""
+        self.job = BackgroundJob(title, target, *args).start()
+    
+    def _punch(self, punch_type):
+        """
+        Start a punch verification job if allowed.
+        
+        Returns:
+            tuple: (job, None), or (None, reason) if the punch was refused
+        """
+        if self._job_busy():
+            reason = f"{self.job.title} in progress"
+        # Check cooldown to prevent duplicate punches
+        elif time.time() - self.last_action_time >= self.COOLDOWN:
+            self._start_job(punch_type, self.attend, punch_type)
+            return self.job, None
+        else:
+            reason = f"Please wait {self.COOLDOWN - (time.time() - self.last_action_time):.1f}s before next punch"
+        print(f"⏳ {reason}")
+        return None, reason
+    
+    def _handle_key(self, key):
+        """
+        Handle one keypress from the live window.
+        
+        Returns:
+            bool: False if the system should shut down
+        """
+        if self.name_entry is not None:
+            self._handle_name_key(key)
+            return True
+        
+        if key == ord('r') or key == ord('R'):
+            if self._job_busy():
+                print(f"⏳ {self.job.title} in progress")
+            else:
+                self.name_entry = ""
+        
+        elif key == ord('i') or key == ord('I'):
+            self._punch("Punch-In")
+        
+        elif key == ord('o') or key == ord('O'):
+            self._punch("Punch-Out")
+        
+        elif key == 27 and self._job_busy():
+            self.job.cancel()
+        
+        elif key == ord('q') or key == ord('Q'):
+            print("\n[+] System shutdown initiated...")
+            return False
+        
+        return True
+    
+    def _serve_commands(self):
+        """
+        Execute queued control-channel commands; report CPU use now and then.
+        
+        Returns:
+            bool: False if the system should shut down
+        """
+        if time.time() - self._last_stats >= STATS_INTERVAL:
+            self._last_stats = time.time()
+            print(f"[stats] {self.stats.summary()[0]}")
+            for line in inference_report()[:1]:
+                print(f"[stats] {line}")
+            for camera in self._cameras():
+                if camera.gate is not None:
+                    print(f"[stats] {camera.camera_name}: "
+                          f"{camera.gate.report(self.stats.latency('detect'))}")
+                if camera.identities is not None:
+                    print(f"[stats] {camera.camera_name}: {camera.identities.report()}")
+            if self.autopunch is not None:
+                print(f"[stats] {self.autopunch.report()}")
+        for command in self.control.poll():
+            if not self._handle_command(command):
+                return False
+        return True
+    
+    def _handle_command(self, command):
+        """
+        Execute one control-channel command (headless counterpart of _handle_key).
+        
+        Punch commands are answered with the verification result once the
+        job finishes; registration is answered when it starts.
+        
+        Returns:
+            bool: False if the system should shut down
+        """
+        args = command.words[1:]
+        if command.name in ("in", "out"):
+            job, reason = self._punch("Punch-In" if command.name == "in" else "Punch-Out")
+            if job is not None:
+                command.reply(True, job=job)
+            else:
+                command.reply(False, reason)
+        
+        elif command.name == "register":
+            overwrite = "--overwrite" in args
+            name = " ".join(arg for arg in args if arg != "--overwrite").strip()
+            if not name:
+                command.reply(False, "usage: register NAME [--overwrite]")
+            elif self._job_busy():
+                command.reply(False, f"{self.job.title} in progress")
+            elif name in self.db and not overwrite:
+                command.reply(False, f"user '{name}' exists (add --overwrite)")
+            else:
+                self._start_job("Registration", self.register, name)
+                command.reply(True, f"registering '{name}' - look at the camera")
+        
+        elif command.name == "cancel":
+            if self._job_busy():
+                self.job.cancel()
+                command.reply(True, f"{self.job.title} cancelled")
+            else:
+                command.reply(False, "nothing running")
+        
+        elif command.name == "status":
+            command.reply(True, self._status_line())
+        
+        elif command.name == "quit":
+            print("\n[+] System shutdown initiated...")
+            command.reply(True, "shutting down")
+            return False
+        
+        else:
+            command.reply(False, f"unknown command '{command.name}'")
+        
+        return True
+    
+    def _cameras(self):
+        """Objects holding per-camera state (just this system for one camera)."""
+        return [self]
+    
+    def _status_line(self):
+        """One-line state for the control channel's status command."""
+        job = self.job.status if self._job_busy() else "idle"
+        latest = self.feed.latest()
+        face = "face in view" if latest is not None and latest.face is not None else "no face"
+        if self.gate is not None and not self.gate.active:
+            face += f" (detection idle, {self.gate.idle_fraction:.0%} of frames)"
+        if self.autopunch is not None:
+            job += f" (auto-punch, {self.autopunch.people_per_minute():.1f} people/min)"
+        return (f"{self.camera_name}: {job}, {face}, {len(self.db)} users, "
+                f"{self.scheduler.describe()}")
+    
+    def _handle_name_key(self, key):
+        """Overlay text entry for the registration name (replaces input())."""
+        if key == 255:
+            return  # No key pressed
+        
+        if self.pending_overwrite:
+            name = self.name_entry.strip()
+            self.name_entry = None
+            self.pending_overwrite = False
+            if key == ord('y') or key == ord('Y'):
+                self._start_job("Registration", self.register, name)
+            else:
+                print("✗ Registration cancelled")
+            return
+        
+        if key == 27:  # Esc
+            self.name_entry = None
+            print("✗ Registration cancelled")
+        elif key in (13, 10):  # Enter
+            name = self.name_entry.strip()
+            if not name:
+                print("[-] Invalid name")
+                self.name_entry = None
+            elif name in self.db:
+                self.pending_overwrite = True
+            else:
+                self.name_entry = None
+                self._start_job("Registration", self.register, name)
+        elif key in (8, 127):  # Backspace
+            self.name_entry = self.name_entry[:-1]
+        elif 32 <= key < 127:
+            self.name_entry += chr(key)
+    
+    def _draw_job_overlay(self, img):
+        """Draw registration name entry or the running job's progress."""
+        if self.name_entry is not None:
+            if self.pending_overwrite:
+                draw_status_banner(img, f"User '{self.name_entry.strip()}' exists. Overwrite? (y/n)", "warn")
+            else:
+                draw_status_banner(img, f"Name: {self.name_entry}_   [Enter] OK  [Esc] Cancel", "info")
+            return
+        
+        job = self.job
+        if job is None or (not job.running and job.finished_at is not None and
+                           time.time() - job.finished_at > JOB_RESULT_DISPLAY):
+            # No punch/registration to show: the last automatic punch, if recent
+            if self.auto_result is not None and time.time() - self.auto_result[1] <= JOB_RESULT_DISPLAY:
+                draw_status_banner(img, self.auto_result[0], "ok")
+            return
+        
+        draw_status_banner(img, job.status, job.level)
+        draw_progress_bar(img, job.progress)
+    
+    def _print_stats(self):
+        """Per-stage timing of the live loop, batching, and what headless mode saves."""
+        inference = inference_report()
+        if not self.stats.frames:
+            if inference:  # Service: no frames, only batched requests
+                print("\n" + "-"*60 + "\n" + "\n".join(inference) + "\n" + "-"*60)
+            return
+        print("\n" + "-"*60)
+        for line in self.stats.summary():
+            print(line)
+        print(f"Schedule: {self.scheduler.describe()}")
+        for line in inference:
+            print(line)
+        for camera in self._cameras():
+            if camera.gate is not None:
+                print(f"Motion gate {camera.camera_name}: "
+                      f"{camera.gate.report(self.stats.latency('detect'))}")
+            if camera.identities is not None:
+                print(f"Identities {camera.camera_name}: {camera.identities.report()}")
+        if self.autopunch is not None:
+            print(f"Auto-punch: {self.autopunch.report()}")
+        calls, _, cpu = self.stats.total("render")
+        if calls:
+            print(f"Display: {calls} redraws, {cpu / calls * 1000:.2f} ms CPU each, "
+                  f"{cpu / self.stats.elapsed:.1%} of a core (saved in headless mode)")
+        elif self.headless:
+            cost = self._sample_render_cost()
+            if cost is not None:
+                skipped = int(self.stats.elapsed * DISPLAY_FPS)
+                print(f"Display: off - {skipped} redraws at {DISPLAY_FPS} fps skipped, "
+                      f"{cost * 1000:.2f} ms CPU each (sampled, without the window), "
+                      f"{min(cost * DISPLAY_FPS, 1.0):.1%} of a core saved")
+        print("-"*60)
+    
+    def _sample_render_cost(self, redraws=10):
+        """
+        CPU seconds one redraw of the latest frames would cost, measured by
+        composing them a few times (headless mode never draws otherwise).
+        
+        Returns:
+            float: Seconds per redraw, or None if no frame was seen
+        """
+        started = time.thread_time()
+        for _ in range(redraws):
+            if self._compose() is None:
+                return None
+        return (time.thread_time() - started) / redraws
+    
     def cleanup(self):
         """Clean up resources."""
-        self.cap.release()
-        cv2.destroyAllWindows()
+        if self.control is not None:
+            self.control.stop()
+        self._print_stats()
+        self.feed.close()
+        if self._job_busy():
+            self.job.cancel()
+            self.job.join(timeout=2.0)
+        if self.watcher is not None:
+            self.watcher.stop()
+        if isinstance(self.gallery, ShardedGallery):
+            self.gallery.close()
+        if self.cap is not None:
+            self.cap.release()
+        if not self.headless:
+            cv2.destroyAllWindows()
         print("[+] All resources released")
         print("[+] Goodbye!\n")
 
 
+class CameraStation(FaceAttendanceSystem):
+    """
+    One camera of a MultiCameraSystem.
+    
+    Owns everything that is per stream - frame source, face tracks, temporal
+    liveness, recent results, frame feed, running job and typed name - and
+    reads the shared state (gallery, database, stats, scheduler, auto-punch,
+    attendance log and duplicate-punch memory) from the system it belongs to
+    through the read-only properties below, so punches and registrations run
+    exactly the single-camera code.
+    """
+    
+    def __init__(self, system, name, source, realtime=FRAME_REALTIME, loop=FRAME_LOOP):
+        """
+        Args:
+            system (MultiCameraSystem): Owner of the shared state
+            name (str): Camera name, logged with every punch
+            source (str): Frame source spec (see src/camera.py)
+            realtime (bool): Replay recordings at their frame rate
+            loop (bool): Restart recordings when they end
+        """
+        self.system = system
+        self.camera_name = name
+        self.cap = get_camera(source, realtime, loop)
+        self.tracker = FaceTracker(TRACK_IOU_THRESHOLD, TRACK_MAX_MISSED)
+        self.temporal = TemporalLiveness(TEMPORAL_WINDOW, TEMPORAL_CROP_SIZE,
+                                         TEMPORAL_MIN_FRAMES)
+        self.recent = RecentResults(RESULT_BUFFER_SIZE)
+        self.feed = FrameFeed()
+        self.job = None
+        self.name_entry = None
+        self.pending_overwrite = False
+        self.last_action_time = 0
+        
+        # Live-loop state drawn on this camera's tile (its frame is in the feed)
+        self.frame_count = 0
+        self._last_box = None
+        self.gate = make_motion_gate()
+        self.identities = make_identity_cache()
+        self.prediction = (None, 0.0, 0.0)  # (name, face_sim, live_score)
+        self.auto_result = None
+    
+    # Shared state, read from the system on every access so a gallery swap
+    # is seen by every camera. Read-only: stations never rebind it, and any
+    # other attribute a station lacks raises instead of reaching the system.
+    gallery = property(lambda self: self.system.gallery)
+    db = property(lambda self: self.system.db)
+    stats = property(lambda self: self.system.stats)
+    scheduler = property(lambda self: self.system.scheduler)
+    autopunch = property(lambda self: self.system.autopunch)
+    last_attendance = property(lambda self: self.system.last_attendance)
+    _csv_lock = property(lambda self: self.system._csv_lock)
+    
+    def _commit_user(self, name, embedding):
+        """Registrations on any camera go to the shared gallery."""
+        self.system._commit_user(name, embedding)
+    
+    def close(self):
+        """Stop this camera's job and release its source."""
+        self.feed.close()
+        if self._job_busy():
+            self.job.cancel()
+            self.job.join(timeout=2.0)
+        self.cap.release()
+
+
+class MultiCameraSystem(FaceAttendanceSystem):
+    """
+    Several cameras served by one process with one copy of the models.
+    
+    Each tick reads one frame from every camera and runs detection and
+    tracking per stream on the pipeline thread (the detector is shared). Faces due
+    for recognition are queued per stream and embedded, liveness-checked and
+    matched in one pooled batch, taken round-robin across streams. Keys act
+    on the selected camera ([1]-[9]); punches are logged with its name.
+    """
+    
+    def __init__(self, cameras, realtime=FRAME_REALTIME, loop=FRAME_LOOP, headless=HEADLESS,
+                 auto_punch=AUTO_PUNCH):
+        """
+        Args:
+            cameras (list): {"name": ..., "source": ...} per camera (CAMERAS)
+            realtime (bool): Replay recordings at their frame rate
+            loop (bool): Restart recordings when they end
+            headless (bool): No window; commands come from the control socket
+            auto_punch (bool): Punch recognized faces without a keypress
+        """
+        super().__init__(None, realtime, loop, headless, auto_punch)
+        self.camera_name = None
+        self.stations = []
+        self.active = 0  # Camera the keyboard acts on
+        # Guards stations/active: the pipeline drops cameras while the
+        # display thread draws them and routes keys
+        self._stations_lock = threading.Lock()
+        self._tiles = 0
+        self.batcher = FairBatcher(MULTI_BATCH_SIZE, MULTI_PENDING_PER_STREAM)
+        try:
+            for camera in cameras:
+                self.stations.append(CameraStation(self, camera["name"], camera["source"],
+                                                   realtime, loop))
+                print(f"[+] Camera '{camera['name']}' initialized ({camera['source']})")
+        except RuntimeError as e:
+            print(f"[-] Error: {e}")
+            self.cleanup()
+            raise
+    
+    def _print_controls(self):
+        """Print control instructions."""
+        super()._print_controls()
+        if self.headless:
+            print("   Name a camera last to target it, e.g. 'in cam2' (default: first camera)\n")
+        else:
+            print("  [1-9] -> Select the camera the keys act on\n")
+    
+    def _capture(self, station):
+        """
+        Read and detect one frame of a camera; queue its face for the pooled
+        recognition on the frames the scheduler picks.
+        
+        Returns:
+            bool: False if the camera's source has ended
+        """
+        with self.stats.measure("capture"):
+            ret, frame = station.cap.read()
+        if not ret:
+            return False
+        
+        station.frame_count += 1
+        if not station._awake(frame):
+            station._observe(None, None)
+            station.feed.publish(frame, None, None)
+            return True
+        face, box, detected = station._detect(frame)
+        track_id, temporal_score = station._observe(face, box)
+        station.feed.publish(frame, face, box, track_id, temporal_score, detected)
+        
+        if face is not None and self.scheduler.due("recognize", station.frame_count):
+            known = station._known_identity(track_id)
+            if known is not None:
+                station.prediction = known
+            else:
+                self.batcher.submit(station, (face, box, track_id, temporal_score, detected))
+        return True
+    
+    def _recognize_pending(self):
+        """
+        Embed, liveness-check and match one round-robin batch of queued faces
+        from all cameras: one forward pass and one gallery product in total.
+        """
+        batch = self.batcher.next_batch()
+        if not batch:
+            return
+        
+        faces = [item[0] for _, item in batch]
+        wall, cpu = time.perf_counter(), time.thread_time()
+        embeddings, lives = self._analyze_batch(faces)
+        matches = recognize_batch(embeddings, self.gallery)
+        
+        # Recorded per face, so the scheduler sees the batched cost of one face
+        wall, cpu = time.perf_counter() - wall, time.thread_time() - cpu
+        for _ in faces:
+            self.stats.add("recognize", wall / len(faces), cpu / len(faces))
+        
+        for (station, item), emb, (name, face_sim), static_live in zip(batch, embeddings,
+                                                                         matches, lives):
+            _, box, track_id, temporal_score, detected = item
+            live_score = fuse_liveness(static_live, temporal_score, TEMPORAL_LIVE_WEIGHT)
+            station.prediction = (name, face_sim, live_score)
+            station.recent.add(track_id, box, emb, live_score, detected=detected)
+            if detected:  # Carried-over crops only update the display
+                station._auto_punch(track_id, name, face_sim, live_score)
+                station._remember_identity(track_id, box, name, face_sim, live_score)
+    
+    def _cameras(self):
+        return self.stations
+    
+    def _drop_station(self, station):
+        """Stop serving a camera whose source ended."""
+        print(f"[-] Camera '{station.camera_name}': frame source ended")
+        with self._stations_lock:
+            self.stations.remove(station)
+            self.active = max(0, min(self.active, len(self.stations) - 1))
+        # Out of the display's sight before its feed and source are closed
+        self.batcher.remove(station)
+        station.close()
+    
+    def run(self):
+        """Main event loop: all cameras round-robin, one tiled window."""
+        print(f"-> Serving {len(self.stations)} cameras: "
+              f"{', '.join(station.camera_name for station in self.stations)}")
+        super().run()
+    
+    def _step(self):
+        """
+        One tick: a frame from every camera, then one pooled recognition batch.
+        
+        Returns:
+            bool: False once every camera's source has ended
+        """
+        self._poll_shared_gallery()
+        for station in list(self.stations):
+            if not self._capture(station):
+                self._drop_station(station)
+        if not self.stations:
+            return False
+        self._recognize_pending()
+        
+        # One tick detects and recognizes on every stream
+        streams = len(self.stations)
+        self._reschedule(streams * self.stats.latency("detect"),
+                         streams * self.stats.latency("recognize"),
+                         1.0 / max(station.cap.fps for station in self.stations))
+        return True
+    
+    def _compose(self):
+        """
+        Draw every camera's latest frame and results into its tile of the
+        preallocated window buffer.
+        
+        Returns:
+            np.ndarray: The display buffer, or None before the first frames
+        """
+        with self._stations_lock:
+            return self._compose_tiles(list(self.stations), self.active)
+    
+    def _compose_tiles(self, stations, active):
+        """Tile the given stations; called under the stations lock."""
+        latest = [station.feed.latest() for station in stations]
+        if not stations or any(item is None for item in latest):
+            return None
+        
+        cols = int(np.ceil(np.sqrt(len(stations))))
+        rows = int(np.ceil(len(stations) / cols))
+        h0, w0 = latest[0].frame.shape[:2]
+        tile_w = MULTI_TILE_WIDTH
+        tile_h = int(tile_w * h0 / w0)
+        size = (rows * tile_h, cols * tile_w, 3)
+        if self._display is None or self._display.shape != size or self._tiles != len(stations):
+            self._display = np.zeros(size, dtype=np.uint8)  # Unused grid cells stay black
+            self._tiles = len(stations)
+        
+        for i, (station, item) in enumerate(zip(stations, latest)):
+            r, c = divmod(i, cols)
+            tile = self._display[r*tile_h:(r+1)*tile_h, c*tile_w:(c+1)*tile_w]
+            scale = blit(item.frame, tile)
+            box = scale_box(item.box, scale) if item.face is not None else None
+            name, face_sim, live_score = station.prediction
+            station._draw_detection(tile, box, name, face_sim, live_score, self._display_ticks)
+            draw_tile_label(tile, i, station.camera_name, i == active)
+        return self._display
+    
+    def _handle_key(self, key):
+        """
+        Camera selection, or a keypress for the selected camera.
+        
+        Returns:
+            bool: False if the system should shut down
+        """
+        with self._stations_lock:
+            if not self.stations:
+                return False
+            station = self.stations[self.active]
+            if station.name_entry is None and ord('1') <= key <= ord('9'):
+                index = key - ord('1')
+                if index < len(self.stations):
+                    self.active = index
+                    print(f"[+] Camera '{self.stations[index].camera_name}' selected")
+                return True
+            return station._handle_key(key)
+    
+    def _handle_command(self, command):
+        """
+        Route a control-channel command to the camera named last on the line
+        (default: the first camera); status covers all cameras.
+        
+        Returns:
+            bool: False if the system should shut down
+        """
+        if command.name == "status":
+            command.reply(True, "; ".join(station._status_line() for station in self.stations))
+            return True
+        station = self.stations[0]
+        for candidate in self.stations:
+            if len(command.words) > 1 and command.words[-1] == candidate.camera_name:
+                station = candidate
+                command.words = command.words[:-1]
+        return station._handle_command(command)
+    
+    def cleanup(self):
+        """Clean up resources."""
+        for station in self.stations:
+            station.close()
+        super().cleanup()
+
+
+class ServiceSystem(FaceAttendanceSystem):
+    """
+    The recognition pipeline behind a local HTTP/WebSocket service instead of
+    a camera loop (protocol in src/service.py).
+    
+    Requests share the gallery, thresholds, attendance log and enrollment
+    path of the camera system. Detection runs per image on worker threads;
+    the faces of all concurrent requests are queued with the shared
+    inference scheduler, so a burst of requests costs a few batched forward
+    passes. The frames of a punch request and of a WebSocket session are a
+    sequence, so their faces are tracked and fed to temporal liveness like
+    camera frames; single /identify images get the single-frame score.
+    """
+    
+    def __init__(self, address=SERVICE_ADDRESS):
+        """
+        Args:
+            address (str): "host:port" or a Unix socket path to listen on
+        """
+        self.address = address
+        self.service = None
+        # No window, and the service replaces the control socket
+        super().__init__(None, headless=True, auto_punch=False, control=False)
+        self.camera_name = "service"
+    
+    def _print_controls(self):
+        """Print the endpoints."""
+        print(f"-> Endpoints on {self.address}:")
+        print("   GET  /health")
+        print("   POST /identify[?crop=1]              body: JPEG, or multipart with several")
+        print("   POST /punch?type=in|out[&crop=1]     consensus over the frames, then punch")
+        print("   POST /enroll?name=NAME[&overwrite=1] register from the frames")
+        print("   GET  /ws                             WebSocket: JPEG frames in, JSON out\n")
+    
+    def run(self):
+        """Serve until interrupted."""
+        try:
+            asyncio.run(self._serve())
+        except KeyboardInterrupt:
+            print("\n[+] System shutdown initiated...")
+        finally:
+            self.cleanup()
+    
+    async def _serve(self):
+        routes = {
+            ("GET", "/health"): self._health,
+            ("POST", "/identify"): self._identify,
+            ("POST", "/punch"): self._punch_request,
+            ("POST", "/enroll"): self._enroll_request,
+        }
+        self.service = await HttpService(self.address, routes, self._stream, SERVICE_MAX_BODY).start()
+        print(f"-> Service listening on {self.address}\n")
+        poller = asyncio.create_task(self._poll_forever()) if self.store is not None else None
+        try:
+            await self.service.serve_forever()
+        finally:
+            if poller is not None:
+                poller.cancel()
+            self.service.close()
+    
+    async def _poll_forever(self):
+        """Pick up shared-gallery generations published by other processes."""
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(SHARED_POLL_INTERVAL)
+            await loop.run_in_executor(None, self._poll_shared_gallery)
+    
+    async def _faces(self, images, crop=False):
+        """
+        Face of each image: detection on worker threads, or the image itself
+        when the caller sent crops.
+        
+        Returns:
+            list: (face, box) per image - (None, None) if no face was found
+        """
+        if crop:
+            return [(image, None) for image in images]
+        loop = asyncio.get_running_loop()
+        return await asyncio.gather(*(loop.run_in_executor(None, partial(detect_face, image,
+                                                                         return_box=True))
+                                      for image in images))
+    
+    async def _recognize(self, images, crop=False, motion=None):
+        """
+        Identify the face in each image.
+        
+        Args:
+            motion (tuple): (FaceTracker, TemporalLiveness) when the images are
+                            consecutive frames: liveness is then fused with the
+                            temporal score of the face's track
+        
+        Returns:
+            list: One result dict per image (face, box, name, similarity, liveness)
+        """
+        detections = await self._faces(images, crop)
+        faces = [face for face, _ in detections if face is not None]
+        analyzed = await asyncio.get_running_loop().run_in_executor(None, analyze_faces, faces)
+        matches = iter(recognize_batch(np.stack([emb for emb, _ in analyzed]), self.gallery,
+                                       threshold=FACE_SIM_THRESHOLD) if faces else [])
+        lives = iter(live for _, live in analyzed)
+        
+        results = []
+        for face, box in detections:
+            temporal_score = self._track_motion(motion, face, box) if motion else None
+            if face is None:
+                results.append({"face": False})
+                continue
+            name, face_sim = next(matches)
+            live_score = fuse_liveness(next(lives), temporal_score, TEMPORAL_LIVE_WEIGHT)
+            results.append({"face": True, "box": [int(v) for v in box] if box is not None else None,
+                            "name": name, "similarity": round(float(face_sim), 4),
+                            "liveness": round(float(live_score), 4)})
+        return results
+    
+    @staticmethod
+    def _motion():
+        """Fresh (tracker, temporal liveness) for one frame sequence."""
+        return (FaceTracker(TRACK_IOU_THRESHOLD, TRACK_MAX_MISSED),
+                TemporalLiveness(TEMPORAL_WINDOW, TEMPORAL_CROP_SIZE, TEMPORAL_MIN_FRAMES))
+    
+    @staticmethod
+    def _track_motion(motion, face, box):
+        """
+        Track one frame's face and update its temporal liveness (see _observe).
+        Crops carry no box and are taken as one face per sequence.
+        
+        Returns:
+            float: Temporal score, or None while the track warms up
+        """
+        tracker, temporal = motion
+        track_ids = tracker.update([box] if face is not None and box is not None else [])
+        for lost_id in tracker.lost:
+            temporal.reset(lost_id)
+        if face is None:
+            return None
+        return temporal.update(track_ids[0] if box is not None else "crop", face)
+    
+    async def _punch_results(self, punch_type, results):
+        """
+        Consensus over per-frame results, the usual thresholds, then the log.
+        
+        Returns:
+            dict: Decision (accepted, name, scores, reason)
+        """
+        frames = [result for result in results if result["face"]][-CONSENSUS_FRAMES:]
+        consensus = SequentialConsensus(CONSENSUS_FRAMES, CONSENSUS_THRESHOLD,
+                                        MIN_FRAMES_FOR_DECISION)
+        for result in frames:
+            consensus.add(result["name"])
+        name = consensus.result()
+        if name is None:
+            return {"accepted": False, "punch_type": punch_type, "frames": len(frames),
+                    "reason": f"no consensus over {len(frames)}/{CONSENSUS_FRAMES} face frames"}
+        
+        agreeing = [result for result in frames if result["name"] == name]
+        face_score = sum(result["similarity"] for result in agreeing) / len(agreeing)
+        liveness_score = sum(result["liveness"] for result in agreeing) / len(agreeing)
+        final_confidence = EMB_WEIGHT * face_score + LIVE_WEIGHT * liveness_score
+        rejection = self._rejection(face_score, liveness_score, final_confidence)
+        status = "ACCEPTED" if rejection is None else "REJECTED"
+        await asyncio.get_running_loop().run_in_executor(
+            None, self._log_attendance, name, punch_type, face_score, liveness_score,
+            final_confidence, status, rejection[0] if rejection else None)
+        print(f"[{'+' if rejection is None else '-'}] {punch_type} {status.lower()} for {name} (service)")
+        return {"accepted": rejection is None, "punch_type": punch_type, "name": name,
+                "face_score": round(face_score, 4), "liveness": round(liveness_score, 4),
+                "confidence": round(final_confidence, 4), "frames": len(frames),
+                "reason": rejection[1] if rejection else None}
+    
+    async def _health(self, request):
+        health = {
+            "status": "ok",
+            "users": len(self.db),
+            "requests": self.service.requests,
+            "mean_latency_ms": round(self.service.latency / max(self.service.requests, 1) * 1000, 1),
+        }
+        scheduler = get_scheduler()
+        _, p50, p95 = scheduler.delay_ms()
+        health.update(batches=scheduler.batches, mean_batch=round(scheduler.mean_batch, 2),
+                      queue_delay_p50_ms=round(p50, 2), queue_delay_p95_ms=round(p95, 2))
+        return HTTPStatus.OK, health
+    
+    async def _identify(self, request):
+        return HTTPStatus.OK, {"results": await self._recognize(request.images(), request.flag("crop"))}
+    
+    async def _punch_request(self, request):
+        punch_type = {"in": "Punch-In", "out": "Punch-Out"}.get(request.query.get("type", "").lower())
+        if punch_type is None:
+            raise HttpError(HTTPStatus.BAD_REQUEST, "type must be 'in' or 'out'")
+        results = await self._recognize(request.images(), request.flag("crop"), self._motion())
+        return HTTPStatus.OK, await self._punch_results(punch_type, results)
+    
+    async def _enroll_request(self, request):
+        name = request.query.get("name", "").strip()
+        if not name:
+            raise HttpError(HTTPStatus.BAD_REQUEST, "usage: /enroll?name=NAME")
+        if name in self.db and not request.flag("overwrite"):
+            raise HttpError(HTTPStatus.CONFLICT, f"user '{name}' exists (add overwrite=1)")
+        
+        detections = await self._faces(request.images(), request.flag("crop"))
+        selector = EnrollmentSelector(REG_SAMPLES, REG_MIN_SAMPLES, REG_DUP_SIMILARITY,
+                                      REG_MIN_FACE_SIZE, REG_MIN_SHARPNESS, REG_LIVENESS_MIN)
+        loop = asyncio.get_running_loop()
+        for face, _ in detections:
+            if face is not None and not selector.full:
+                await loop.run_in_executor(None, selector.add, face)
+        if not selector.ready:
+            raise HttpError(HTTPStatus.UNPROCESSABLE_ENTITY,
+                            f"{len(selector.selected)} usable samples in {len(detections)} "
+                            f"images, {REG_MIN_SAMPLES} needed")
+        
+        samples = selector.samples()
+        embeddings = await loop.run_in_executor(None, embed, samples)
+        await loop.run_in_executor(None, self._enroll_user, name, samples, embeddings)
+        print(f"[+] '{name}' registered via the service ({len(samples)} samples)")
+        return HTTPStatus.CREATED, {"name": name, "samples": len(samples), "images": len(detections)}
+    
+    async def _stream(self, request, ws):
+        """
+        WebSocket session: every binary message is a frame and is answered
+        with its identify result; the text message {"action": "punch",
+        "type": "in"|"out"} punches with the session's latest face frames.
+        """
+        crop = request.flag("crop")
+        recent = deque(maxlen=CONSENSUS_FRAMES)
+        motion = self._motion()  # The session's frames are one camera's stream
+        while True:
+            message = await ws.receive()
+            if message is None:
+                return
+            try:
+                if isinstance(message, bytes):
+                    result = (await self._recognize([decode_image(message)], crop, motion))[0]
+                    if result["face"]:
+                        recent.append(result)
+                    await ws.send_json(result)
+                    continue
+                
+                command = json.loads(message)
+                punch_type = {"in": "Punch-In", "out": "Punch-Out"}.get(str(command.get("type")).lower())
+                if command.get("action") != "punch" or punch_type is None:
+                    raise HttpError(HTTPStatus.BAD_REQUEST,
+                                    'expected {"action": "punch", "type": "in"|"out"}')
+                await ws.send_json(await self._punch_results(punch_type, list(recent)))
+                recent.clear()
+            except (HttpError, ValueError, AttributeError) as e:
+                await ws.send_json({"error": str(e)})
+
+
 def main():
     """Entry point."""
+    import argparse
+    parser = argparse.ArgumentParser(description="Face recognition attendance system")
+    parser.add_argument("--source", action="append", default=None,
+                        help="camera:N, video:PATH, images:DIR, stream:URL or synthetic "
+                             "(repeat for several cameras in one process)")
+    parser.add_argument("--fast", action="store_true",
+                        help="Replay recordings as fast as possible instead of in real time")
+    parser.add_argument("--loop", action="store_true", default=FRAME_LOOP,
+                        help="Restart recordings when they end")
+    parser.add_argument("--headless", action="store_true",
+                        help="No window or overlay; take commands from the control socket")
+    parser.add_argument("--auto", action="store_true",
+                        help="Touchless: punch recognized faces without a keypress")
+    parser.add_argument("--serve", action="store_true",
+                        help=f"No camera: HTTP/WebSocket recognition service on {SERVICE_ADDRESS}")
+    args = parser.parse_args()
+    
+    cameras = CAMERAS
+    if args.source:
+        cameras = [{"name": f"cam{i+1}", "source": source} for i, source in enumerate(args.source)]
+    realtime = FRAME_REALTIME and not args.fast
+    headless = HEADLESS or args.headless
+    auto_punch = AUTO_PUNCH or args.auto
+    
     try:
-        system = FaceAttendanceSystem()
+        if args.serve:
+            system = ServiceSystem()
+        elif len(cameras) > 1:
+            system = MultiCameraSystem(cameras, realtime, args.loop, headless, auto_punch)
+        else:
+            system = FaceAttendanceSystem(cameras[0]["source"] if cameras else FRAME_SOURCE,
+                                          realtime, args.loop, headless, auto_punch)
         system.run()
     except Exception as e:
         print(f"\n[-] Fatal error: {e}")
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Gallery Search Benchmark
+Compares compressed/accelerated gallery modes against exact matrix search
+on a synthetic face-like gallery (or the enrolled database): memory, query
+latency, recall@1, verification accuracy, the false-accept rate of
+impostor probes (identities that are not enrolled) and how many
+accept/reject decisions at FACE_SIM_THRESHOLD change.
+
+Usage:
+    python benchmark_gallery.py --identities 100000 --templates 3 --modes pq
+    python benchmark_gallery.py --modes float16,int8
+    python benchmark_gallery.py --db data/embeddings/embeddings.npy --modes int8
+    python benchmark_gallery.py --modes binary --bits 256 --shortlist 50,100,200
+    python benchmark_gallery.py --intrinsic-dim 96 --modes pca,pca+int8 --pca-dim 128
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '.'))
+
+from config import FACE_SIM_THRESHOLD
+from src.gallery import Gallery, QuantizedGallery, normalize
+
+
+def make_synthetic(num_identities, templates, dim, num_queries, noise=0.45, seed=0,
+                   intrinsic_dim=None):
+    """
+    Clustered unit vectors: each identity has a random center, its templates
+    and the probe queries are noisy copies of it. Probe noise varies per probe
+    so probe/template similarities straddle FACE_SIM_THRESHOLD (~0.7-0.9).
+    With intrinsic_dim, centers lie in a random subspace of that dimension
+    (like real embeddings, whose energy is concentrated in few directions).
+    Impostor probes are drawn the same way around centers never enrolled.
+
+    Returns:
+        tuple: (db dict, query matrix, true identity index per query,
+                impostor query matrix)
+    """
+    rng = np.random.default_rng(seed)
+    if intrinsic_dim:
+        basis = np.linalg.qr(rng.normal(size=(dim, intrinsic_dim)))[0].T
+        centers = normalize(rng.normal(size=(num_identities + num_queries, intrinsic_dim)) @ basis)
+    else:
+        centers = normalize(rng.normal(size=(num_identities + num_queries, dim)))
+    centers, outsiders = centers[:num_identities], centers[num_identities:]
+    spread = noise / np.sqrt(dim)
+
+    db = {}
+    for i in range(num_identities):
+        block = centers[i] + rng.normal(scale=spread, size=(templates, dim))
+        db[f"id{i:07d}"] = normalize(block).astype(np.float32)
+
+    truth = rng.integers(num_identities, size=num_queries)
+    probe_spread = spread * rng.uniform(0.5, 1.5, size=(num_queries, 1))
+    queries = normalize(centers[truth] + rng.normal(size=(num_queries, dim)) * probe_spread)
+    impostors = normalize(outsiders + rng.normal(size=(num_queries, dim)) * probe_spread)
+    return db, queries, truth, impostors
+
+
+def probes_from_db(path, num_queries, noise=0.3, seed=0):
+    """
+    Probes from an enrolled database: noisy copies of stored templates.
+    A tenth of the identities (at most num_queries) are held out of the
+    gallery and probed as impostors.
+
+    Returns:
+        tuple: (db dict, query matrix, true identity index per query,
+                impostor query matrix)
+    """
+    db = np.load(path, allow_pickle=True).item()
+    rng = np.random.default_rng(seed)
+    names = list(db)
+    held_out = set(rng.choice(len(names), min(num_queries, max(1, len(names) // 10)),
+                              replace=False).tolist())
+    outsiders = Gallery.from_db({names[i]: db[names[i]] for i in sorted(held_out)})
+    db = {name: value for i, name in enumerate(names) if i not in held_out}
+    gallery = Gallery.from_db(db)
+    dim = gallery.templates.shape[1]
+
+    def noisy(templates):
+        return normalize(templates + rng.normal(scale=noise / np.sqrt(dim), size=templates.shape))
+
+    truth = rng.integers(len(gallery), size=num_queries)
+    queries = noisy(np.stack([gallery.templates_of(gallery.names[i])[0] for i in truth]))
+    picks = rng.integers(len(outsiders), size=num_queries)
+    impostors = noisy(np.stack([outsiders.templates_of(outsiders.names[i])[0] for i in picks]))
+    return db, queries, truth, impostors
+
+
+def time_queries(gallery, queries):
+    """
+    Mean single-query latency (ms), top-1 identity index and score per query.
+    """
+    index = {name: i for i, name in enumerate(gallery.names)}
+    top1 = np.empty(len(queries), dtype=np.int64)
+    scores = np.empty(len(queries), dtype=np.float32)
+    start = time.perf_counter()
+    for row, query in enumerate(queries):
+        name, scores[row] = gallery.best(query)
+        top1[row] = index[name]
+    elapsed = time.perf_counter() - start
+    return 1000.0 * elapsed / len(queries), top1, scores
+
+
+def decision_changes(top1, scores, exact_top1, exact_scores, threshold):
+    """Fraction of queries whose accept/reject decision or identity changes."""
+    accept = scores >= threshold
+    exact_accept = exact_scores >= threshold
+    changed = (accept != exact_accept) | (accept & exact_accept & (top1 != exact_top1))
+    return float(np.mean(changed))
+
+
+def verified(top1, scores, truth, threshold):
+    """Fraction of probes accepted as their true identity."""
+    return float(np.mean((scores >= threshold) & (top1 == truth)))
+
+
+def false_accepts(gallery, impostors, threshold):
+    """Fraction of impostor probes (not enrolled) accepted as someone."""
+    return float(np.mean([score >= threshold for _, score in gallery.best_batch(impostors)]))
+
+
+def build_exact(exact, args):
+    return exact, exact.templates.nbytes
+
+
+def build_pq(exact, args):
+    from src.pq import PQGallery
+    gallery = PQGallery.from_gallery(exact, num_subspaces=args.pq_subspaces,
+                                     rerank=args.rerank, keep_exact=args.rerank > 0)
+    # Exact templates are only touched for re-ranking and would be memory-mapped
+    return gallery, gallery.nbytes
+
+
+def build_float16(exact, args):
+    gallery = QuantizedGallery.from_gallery(exact, "float16")
+    return gallery, gallery.nbytes
+
+
+def build_int8(exact, args):
+    gallery = QuantizedGallery.from_gallery(exact, "int8")
+    return gallery, gallery.nbytes
+
+
+def build_binary(exact, args, shortlist=None):
+    from src.binary_index import BinaryGallery
+    gallery = BinaryGallery.from_gallery(exact, bits=args.bits,
+                                         shortlist=shortlist or args.shortlist[0])
+    # Exact templates are only read for the shortlist
+    return gallery, gallery.nbytes
+
+
+def build_pca(exact, args, inner="exact"):
+    """Fit PCA on the gallery, then build `inner` over projected templates."""
+    from src.pca import PCAProjection, ProjectedGallery
+    labels = np.repeat(np.arange(len(exact)), np.diff(exact.offsets))
+    projection = PCAProjection(args.pca_dim, args.pca_whiten).fit(exact.templates, labels=labels)
+    projected = Gallery(exact.names, projection.transform(exact.templates), exact.offsets)
+    gallery, nbytes = MODES[inner](projected, args)
+    print(f"PCA {exact.templates.shape[1]} -> {projection.dim}-D keeps "
+          f"{projection.explained.sum():.1%} of energy")
+    return ProjectedGallery(gallery, projection), nbytes + projection.matrix.nbytes
+
+
+MODES = {
+    "exact": build_exact,
+    "pq": build_pq,
+    "float16": build_float16,
+    "int8": build_int8,
+    "binary": build_binary,
+    "pca": build_pca,
+}
+
+
+def build_mode(mode, exact, args):
+    """
+    Build a mode; 'pca+<mode>' builds <mode> over PCA-projected templates and
+    'binary@<n>' sets the shortlist size.
+    """
+    if mode.startswith("binary@"):
+        return build_binary(exact, args, shortlist=int(mode[len("binary@"):]))
+    if mode.startswith("pca+"):
+        return build_pca(exact, args, inner=mode[len("pca+"):])
+    return MODES[mode](exact, args)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark gallery search modes")
+    parser.add_argument("--identities", type=int, default=50000)
+    parser.add_argument("--templates", type=int, default=1, help="Templates per identity")
+    parser.add_argument("--dim", type=int, default=512)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--modes", default="pq",
+                        help=f"Comma list of {sorted(MODES)} or pca+<mode>")
+    parser.add_argument("--rerank", type=int, default=50, help="Exact re-rank depth (0 = off)")
+    parser.add_argument("--pq-subspaces", type=int, default=32)
+    parser.add_argument("--bits", type=int, default=256, help="Binary signature bits")
+    parser.add_argument("--shortlist", default="100",
+                        help="Binary shortlist size(s); a comma list benchmarks each")
+    parser.add_argument("--pca-dim", type=int, default=128)
+    parser.add_argument("--pca-whiten", action="store_true")
+    parser.add_argument("--intrinsic-dim", type=int, default=None,
+                        help="Synthetic centers span a subspace of this dimension")
+    parser.add_argument("--threshold", type=float, default=FACE_SIM_THRESHOLD,
+                        help="Similarity threshold for the decision-change report")
+    parser.add_argument("--db", help="Use an enrolled embeddings .npy instead of synthetic data")
+    args = parser.parse_args()
+    args.shortlist = [int(n) for n in args.shortlist.split(",")]
+
+    print("\n" + "="*70)
+    print("GALLERY SEARCH BENCHMARK")
+    print("="*70)
+    if args.db:
+        db, queries, truth, impostors = probes_from_db(args.db, args.queries)
+        print(f"Database: {args.db}  Identities: {len(db)}  Queries: {args.queries}")
+    else:
+        db, queries, truth, impostors = make_synthetic(args.identities, args.templates, args.dim,
+                                                       args.queries,
+                                                       intrinsic_dim=args.intrinsic_dim)
+        print(f"Identities: {args.identities}  Templates/id: {args.templates}  "
+              f"Dim: {args.dim}  Queries: {args.queries}")
+
+    exact = Gallery.from_db(db)
+    exact_ms, exact_top1, exact_scores = time_queries(exact, queries)
+
+    rows = [("exact", exact.templates.nbytes, 0.0, exact_ms, 1.0,
+             np.mean(exact_top1 == truth),
+             verified(exact_top1, exact_scores, truth, args.threshold),
+             false_accepts(exact, impostors, args.threshold), 0.0)]
+
+    modes = []
+    for mode in [m.strip() for m in args.modes.split(",") if m.strip()]:
+        if mode == "exact" or mode in modes:
+            continue  # The exact baseline row is always printed first
+        if mode == "binary" and len(args.shortlist) > 1:
+            modes.extend(f"binary@{n}" for n in args.shortlist)
+        else:
+            modes.append(mode)
+
+    for mode in modes:
+        start = time.perf_counter()
+        gallery, nbytes = build_mode(mode, exact, args)
+        build_s = time.perf_counter() - start
+        ms, top1, scores = time_queries(gallery, queries)
+        rows.append((mode, nbytes, build_s, ms, np.mean(top1 == exact_top1),
+                     np.mean(top1 == truth), verified(top1, scores, truth, args.threshold),
+                     false_accepts(gallery, impostors, args.threshold),
+                     decision_changes(top1, scores, exact_top1, exact_scores, args.threshold)))
+
+    print("\n" + "-"*107)
+    print(f"{'Mode':<12}{'Memory (MB)':>13}{'Build (s)':>11}{'Query (ms)':>12}"
+          f"{'Recall@1':>11}{'Accuracy':>11}{'Verified':>11}{'False acc':>13}{'Changed':>11}")
+    print("-"*107)
+    for mode, nbytes, build_s, ms, recall, accuracy, verify, far, changed in rows:
+        print(f"{mode:<12}{nbytes / 2**20:>13.2f}{build_s:>11.2f}{ms:>12.3f}"
+              f"{recall:>11.3f}{accuracy:>11.3f}{verify:>11.3f}{far:>13.2%}{changed:>11.2%}")
+    print("-"*107)
+    print("Recall@1:  top-1 identity agrees with exact matrix search")
+    print("Accuracy:  top-1 identity is the identity the probe was drawn from")
+    print("Verified:  probe accepted at the threshold as its true identity")
+    print("False acc: impostor probe (identity not enrolled) accepted at the threshold")
+    print(f"Changed:   accept/reject decision (or accepted identity) differs from exact "
+          f"at threshold {args.threshold}")
+    accepted = np.mean(exact_scores >= args.threshold)
+    print(f"           (exact search accepts {accepted:.1%} of probes at this threshold)\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -16,6 +16,11 @@ FINAL_CONF_THRESHOLD = 0.88    # Final confidence must exceed this for acceptanc
 CONSENSUS_FRAMES = 3           # Reduced from 7 for UX: ~100ms verification
 CONSENSUS_THRESHOLD = 0.67     # Require 2 out of 3 frames to match (67%)
 MIN_FRAMES_FOR_DECISION = 2    # Need minimum 2 valid detections from 3 frames
+SEQUENTIAL_CONSENSUS = True    # Stop as soon as the outcome can't change
+VERIFY_TIME_BUDGET = 3.0       # Max seconds per punch verification
+RESULT_BUFFER_SIZE = 30        # Recent live-loop results kept for punches
+RESULT_MAX_AGE = 1.0           # Seconds a live-loop result may be reused
+JOB_RESULT_DISPLAY = 3.0       # Seconds a punch/registration result stays on screen
 
 # ============================================================================
 # CONFIDENCE WEIGHTING
@@ -23,17 +28,204 @@ MIN_FRAMES_FOR_DECISION = 2    # Need minimum 2 valid detections from 3 frames
 EMB_WEIGHT = 0.65              # Face embedding similarity weight (65%)
 LIVE_WEIGHT = 0.35             # Liveness detection weight (35%)
 
+# ============================================================================
+# TEMPORAL LIVENESS (MICRO-MOTION)
+# Single crops can't tell a sharp printed photo from a live face; live faces
+# show small non-rigid motion across frames. Crops are buffered per tracked
+# face and scored from inter-frame residual motion after rigid alignment.
+# ============================================================================
+TEMPORAL_WINDOW = 15           # Crops kept per tracked face (ring buffer)
+TEMPORAL_CROP_SIZE = 64        # Aligned grayscale crop size (pixels)
+TEMPORAL_MIN_FRAMES = 4        # Crops needed before a temporal score exists
+TEMPORAL_LIVE_WEIGHT = 0.40    # Share of temporal score in fused liveness
+TRACK_IOU_THRESHOLD = 0.30     # Min box overlap to continue a face track
+TRACK_MAX_MISSED = 5           # Frames a track survives without detection
+
+# ============================================================================
+# FRAME SOURCE
+# 'camera:0' (webcam), 'video:<file>', 'images:<dir>', 'stream:<url>' or
+# 'synthetic[:WxH@FPS]'; overridable with --source on the command line
+# ============================================================================
+FRAME_SOURCE = "camera:0"
+FRAME_REALTIME = True          # Replay recordings at their frame rate (False = max speed)
+FRAME_LOOP = False             # Restart recordings when they end
+
+# ============================================================================
+# DISPLAY
+# With a screen attached, capture and inference run on their own thread; the
+# window is redrawn at DISPLAY_FPS from the latest frame and latest results
+# into a preallocated buffer, so the preview stays smooth during inference.
+# ============================================================================
+DISPLAY_FPS = 30               # Window refresh rate
+DISPLAY_SCALE = 1.0            # Preview size relative to the frame (e.g. 0.5)
+
+# ============================================================================
+# HEADLESS SERVICE
+# Display-less kiosks: no window, no overlay drawing, no per-frame frame copy.
+# Punches are triggered through a local control socket instead of keys, e.g.
+#   python -m src.control in        (see src/control.py for all commands)
+# ============================================================================
+HEADLESS = False               # Also enabled with --headless
+CONTROL_ADDRESS = "127.0.0.1:7870"  # "host:port" or a Unix socket path
+STATS_INTERVAL = 300.0         # Seconds between CPU-per-frame reports (headless)
+
+# ============================================================================
+# MULTI-CAMERA
+# One process serves several cameras with one copy of the models: each stream
+# runs its own detection and tracking, and the faces due for recognition on
+# all streams are pooled into shared batched embedding and matching calls,
+# served round-robin across streams. Punches are logged with the camera name.
+#   CAMERAS = [{"name": "north-1", "source": "camera:0"},
+#              {"name": "north-2", "source": "stream:rtsp://10.0.0.12/live"}]
+# Repeating --source on the command line does the same (cameras cam1..camN).
+# ============================================================================
+CAMERAS = []                   # Empty: single camera from FRAME_SOURCE
+MULTI_BATCH_SIZE = 8           # Max face crops per pooled embedding call
+MULTI_PENDING_PER_STREAM = 2   # Crops queued per stream (oldest dropped)
+MULTI_TILE_WIDTH = 480         # Width of each camera's tile in the window
+
+# ============================================================================
+# ADAPTIVE SCHEDULING
+# Detection and recognition (embedding + liveness) latencies are measured
+# online and their rates re-planned every SCHED_PERIOD frames: recognition
+# no more often than SCHED_TARGET_LATENCY needs, detection as often as
+# possible, both together within SCHED_CPU_BUDGET of each frame interval.
+# ============================================================================
+SCHED_ADAPTIVE = True          # False: detect every frame, recognize every FRAME_SKIP
+FRAME_SKIP = 5                 # Fixed (and initial) frames between recognitions
+SCHED_CPU_BUDGET = 0.6         # Max share of a frame interval for inference (0 = no cap)
+SCHED_TARGET_LATENCY = 0.4     # Seconds until a face in view is identified (0 = ASAP)
+SCHED_MAX_DETECT_INTERVAL = 3  # Frames between detections at most (box carried over)
+SCHED_MAX_RECOGNIZE_INTERVAL = 30
+SCHED_PERIOD = 30              # Frames between re-plans
+
+# ============================================================================
+# MOTION GATE
+# While nothing moves in front of the camera (and no face is tracked), frames
+# skip detection and recognition; a tiny downsampled grayscale frame is
+# compared with a slowly adapting background to wake up on the next motion.
+# ============================================================================
+MOTION_GATE = True
+MOTION_WIDTH = 64              # Width of the downsampled frame compared
+MOTION_PIXEL_DELTA = 12        # Grey-level change that counts a pixel as moving
+MOTION_MIN_AREA = 0.01         # Share of moving pixels that wakes the pipeline
+MOTION_IDLE_AFTER = 2.0        # Seconds without motion or face before idling
+MOTION_BG_RATE = 0.05          # Background adaptation per frame (lighting drift)
+
+# ============================================================================
+# TRACK IDENTITY CACHE
+# Once a track is confidently identified (similarity and liveness above their
+# thresholds), recognition for it is suspended and only re-verified at a low
+# rate. Losing the track or a sudden box jump drops the cached identity.
+# ============================================================================
+IDENTITY_CACHE = True
+IDENTITY_REVERIFY = 2.0        # Seconds between re-verifications of a known track
+IDENTITY_MAX_JUMP = 0.5        # Box centre shift per frame (x box width) that drops it
+IDENTITY_MAX_SCALE = 1.5       # Box area change per frame that drops it
+
+# ============================================================================
+# AUTO-PUNCH (TOUCHLESS)
+# Every tracked face whose live-loop results reach consensus and pass the
+# thresholds above is punched without a keypress, once per person per dedup
+# window; enable with --auto. The punch type comes from AUTO_PUNCH_RULE:
+# "alternate" (first of the day In, then Out/In) or "schedule" (time of day).
+# ============================================================================
+AUTO_PUNCH = False
+AUTO_PUNCH_RULE = "alternate"
+AUTO_PUNCH_SCHEDULE = [("00:00", "Punch-In"), ("12:00", "Punch-Out")]  # HH:MM from which a type applies
+AUTO_PUNCH_DEDUP = 120.0       # Seconds before the same person is auto-punched again
+
+# ============================================================================
+# RECOGNITION SERVICE (python app.py --serve)
+# Local HTTP/WebSocket interface: /health, /identify, /punch, /enroll, /ws.
+# Faces from concurrent requests share batched forward passes (INFER_*).
+# ============================================================================
+SERVICE_ADDRESS = "127.0.0.1:8765"  # host:port, or a Unix socket path
+SERVICE_MAX_BODY = 16 << 20    # Largest accepted request body (bytes)
+
+# ============================================================================
+# CONCURRENCY
+# Embedding and liveness run concurrently on a shared thread pool (both release
+# the GIL in native code). Keep at or below the number of physical cores.
+# ============================================================================
+WORKER_THREADS = 4             # Shared per-face analysis pool size
+
+# Every embedding request (live loop, cameras, jobs, service) is queued with
+# one inference scheduler that runs them in shared batched forward passes.
+INFER_MAX_BATCH = 16           # Crops per forward pass at most
+INFER_MAX_WAIT = 0.005         # Seconds the oldest crop waits for a fuller batch
+INFER_ADAPTIVE_WAIT = True     # Don't wait while requests come one at a time
+
 # ============================================================================
 # REGISTRATION & SAMPLING
 # ============================================================================
 STABLE_FRAMES = 5              # Frames required for stable detection
-REG_SAMPLES = 20               # Samples per user during registration
+REG_SAMPLES = 20               # Max distinct samples embedded per user
+REG_MIN_SAMPLES = 8            # Distinct samples needed to finish registration
+REG_CANDIDATES = 40            # Face frames examined before finishing early
+REG_MAX_CANDIDATES = 200       # Face frames examined before registration gives up
+REG_DUP_SIMILARITY = 0.97      # Crops more similar than this are near-duplicates
+REG_MIN_FACE_SIZE = 60         # Minimum face crop side (pixels)
+REG_MIN_SHARPNESS = 30.0       # Minimum Laplacian variance of a sample
 REG_LIVENESS_MIN = 0.75        # Minimum liveness score during registration
+REG_TEMPLATES = 3              # Templates (k-means centroids) stored per user
+RETAIN_CROPS = False           # Keep enrollment crops (face images!) so the gallery can be re-embedded
+CROP_PACK_PATH = "data/embeddings/crops.pack"
+CROP_JPEG_QUALITY = 90
+
+# ============================================================================
+# GALLERY SEARCH
+# 'exact': float32 template matrix (2 KB per 512-D template)
+# 'float16' / 'int8': reduced-precision templates (2x / ~4x smaller)
+# 'pq':    product-quantized codes (PQ_SUBSPACES bytes per template) scored
+#          with lookup tables, top PQ_RERANK identities re-scored exactly
+# 'binary': packed sign-bit signatures scanned by Hamming distance, the
+#          BINARY_SHORTLIST closest templates scored with exact cosine
+# ============================================================================
+GALLERY_MODE = "exact"
+PQ_SUBSPACES = 32              # Sub-vectors per template (bytes per code)
+PQ_CENTROIDS = 256             # Centroids per subspace (<= 256)
+PQ_RERANK = 50                 # Identities re-ranked with exact templates
+PQ_EXACT_PATH = "data/embeddings/pq_exact.npy"  # Memory-mapped exact templates
+PQ_MIN_TRAIN = 10000           # Templates before codebooks are trained (exact search until then);
+                               # retrained whenever the gallery doubles since the last training.
+                               # PQ shrinks the search structure only: the app still keeps the
+                               # float database in RAM for saving and incremental updates.
+BINARY_BITS = 256              # Signature bits per template (multiple of 64)
+BINARY_SHORTLIST = 100         # Templates scored exactly after the Hamming scan
+
+# Sharded gallery: identities partitioned across local worker processes, each
+# building a GALLERY_MODE gallery over its shard; queries are scattered to all
+# shards and the per-shard top-k merged
+GALLERY_SHARDS = 0             # Shard worker processes (0 = search in-process)
+SHARD_START_METHOD = "spawn"   # multiprocessing start method for shard workers
+SHARD_TIMEOUT = 30.0           # Seconds before an unresponsive shard is restarted
+
+# Shared gallery: templates published once as memory-mapped generations that
+# every recognition process on the box maps read-only (exact search only)
+SHARED_GALLERY = False
+SHARED_GALLERY_DIR = "data/embeddings/shared"
+SHARED_POLL_INTERVAL = 1.0     # Seconds between checks for a new generation
+
+# PCA projection applied before matching (composes with any GALLERY_MODE).
+# Fitted on the gallery once it holds PCA_MIN_TRAIN templates and saved to
+# PCA_PATH; a projection fitted on a reference set can be dropped there too:
+#   PCAProjection(PCA_DIM).fit(reference_embeddings, labels=identities).save(PCA_PATH)
+# Projection inflates similarities, so every fit also calibrates a map back to
+# the original score scale (FACE_SIM_THRESHOLD applies to mapped scores); an
+# uncalibrated PCA_PATH is refitted. Check changes with
+#   python benchmark_gallery.py --modes pca,pca+int8   (see False accept)
+PCA_DIM = 0                    # Projected dimension (0 = match in full 512-D)
+PCA_WHITEN = False             # Center and whiten before projecting
+PCA_MIN_TRAIN = 512            # Templates needed before fitting on the gallery
+PCA_PATH = "data/embeddings/pca.npz"
 
 # ============================================================================
 # DATABASE PATHS
 # ============================================================================
 EMBEDDINGS_PATH = "data/embeddings/embeddings.npy"
+DB_WATCH = True                # Pick up users enrolled by other kiosks/tools live
+DB_POLL_INTERVAL = 2.0         # Seconds between database change checks
 ATTENDANCE_CSV = "data/attendance.csv"
 
 # ============================================================================
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Gallery Migration
+Re-embeds every user from the enrollment crops retained in the crop pack
+(enrollments made with RETAIN_CROPS = True) with the current embedding
+model, e.g. after switching model weights or backend, so nobody has to
+re-enroll.
+
+Users without usable retained crops (enrolled before crops were kept, or
+whose crops fail to decode) keep their existing templates and are listed
+for re-enrollment; --drop-unmigrated removes them instead.
+
+Crops are decoded and embedded in batches across a pool of worker processes
+(each loads the model once). Finished users are checkpointed periodically;
+an interrupted run continues with --resume.
+
+Usage:
+    python migrate_embeddings.py --workers 4 --batch 64
+    python migrate_embeddings.py --resume
+    python migrate_embeddings.py --output data/embeddings/embeddings_v2.npy
+    python migrate_embeddings.py --drop-unmigrated
+"""
+
+import argparse
+import multiprocessing
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '.'))
+
+from config import CROP_PACK_PATH, EMBEDDINGS_PATH, REG_TEMPLATES
+from src.crop_store import CropStore, decode_crop
+from src.gallery import kmeans_templates
+
+
+# ============================================================================
+# WORKER PROCESS
+# ============================================================================
+
+_get_embeddings = None
+
+
+def _init_worker(threads):
+    """Load the embedding model once per worker process."""
+    global _get_embeddings
+    import torch
+    torch.set_num_threads(threads)  # Workers x threads <= cores
+    from src.embedding_model import get_embeddings
+    _get_embeddings = get_embeddings
+
+
+def _embed_chunk(pack_path, chunk):
+    """
+    Embed the crops of several users in one batched forward pass.
+
+    Args:
+        pack_path (str): Crop pack file
+        chunk (list): (name, locations) pairs
+
+    Returns:
+        list: (name, (n, D) embeddings) pairs
+    """
+    store = CropStore(pack_path)
+    faces, counts = [], []
+    for _, locations in chunk:
+        decoded = [decode_crop(jpeg) for jpeg in store.read(locations)]
+        decoded = [face for face in decoded if face is not None]
+        faces.extend(decoded)
+        counts.append(len(decoded))
+
+    embeddings = _get_embeddings(faces)
+    bounds = np.cumsum([0] + counts)
+    return [(name, embeddings[bounds[i]:bounds[i + 1]]) for i, (name, _) in enumerate(chunk)]
+
+
+# ============================================================================
+# COORDINATOR
+# ============================================================================
+
+def make_chunks(index, names, batch):
+    """Group users into chunks of about `batch` crops (a user is never split)."""
+    chunks, current, size = [], [], 0
+    for name in names:
+        locations = index[name]
+        if current and size + len(locations) > batch:
+            chunks.append(current)
+            current, size = [], 0
+        current.append((name, locations))
+        size += len(locations)
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def save_atomic(db, path):
+    """np.save a dict via a temporary file and rename."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        np.save(f, db)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-embed the gallery from retained crops")
+    parser.add_argument("--pack", default=CROP_PACK_PATH, help="Crop pack file")
+    parser.add_argument("--db", default=EMBEDDINGS_PATH, help="Current embedding database")
+    parser.add_argument("--output", default=EMBEDDINGS_PATH, help="Migrated database path")
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) // 2))
+    parser.add_argument("--threads", type=int, default=2, help="Torch threads per worker")
+    parser.add_argument("--batch", type=int, default=64, help="Crops per forward pass")
+    parser.add_argument("--templates", type=int, default=REG_TEMPLATES)
+    parser.add_argument("--checkpoint", default=None,
+                        help="Checkpoint file (default: <output>.partial.npy)")
+    parser.add_argument("--checkpoint-every", type=int, default=10, help="Chunks between checkpoints")
+    parser.add_argument("--resume", action="store_true", help="Continue from the checkpoint")
+    parser.add_argument("--all-crops", action="store_true",
+                        help="Also migrate pack users missing from the current database")
+    parser.add_argument("--drop-unmigrated", action="store_true",
+                        help="Remove users without usable crops instead of keeping their "
+                             "old templates")
+    args = parser.parse_args()
+    checkpoint = args.checkpoint or args.output + ".partial.npy"
+
+    print("\n" + "="*70)
+    print("GALLERY MIGRATION")
+    print("="*70)
+
+    index = CropStore(args.pack).index()
+    current = np.load(args.db, allow_pickle=True).item() if os.path.exists(args.db) else {}
+    names = sorted(index) if args.all_crops or not current else sorted(n for n in index if n in current)
+    missing = sorted(n for n in current if n not in index)
+
+    done = {}
+    if args.resume and os.path.exists(checkpoint):
+        done = np.load(checkpoint, allow_pickle=True).item()
+        print(f"Resuming: {len(done)} users already migrated")
+    todo = [n for n in names if n not in done]
+    total_crops = sum(len(index[n]) for n in todo)
+
+    print(f"Users with crops: {len(names)}  To migrate: {len(todo)}  Crops: {total_crops}")
+    print(f"Workers: {args.workers} x {args.threads} threads  Batch: {args.batch}")
+    if missing:
+        print(f"[-] {len(missing)} users have no retained crops and must re-enroll: "
+              f"{', '.join(missing[:10])}{' ...' if len(missing) > 10 else ''}")
+
+    chunks = make_chunks(index, todo, args.batch)
+    start = time.perf_counter()
+    crops_done = 0
+    chunks_done = 0
+
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(args.workers, mp_context=context, initializer=_init_worker,
+                             initargs=(args.threads,)) as pool:
+        pending = {}
+        queue = iter(chunks)
+        # Bounded in-flight chunks keep memory flat on huge galleries
+        for chunk in queue:
+            pending[pool.submit(_embed_chunk, args.pack, chunk)] = chunk
+            if len(pending) >= 2 * args.workers:
+                break
+
+        while pending:
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                chunk = pending.pop(future)
+                for name, embeddings in future.result():
+                    if len(embeddings):
+                        done[name] = kmeans_templates(embeddings, args.templates)
+                crops_done += sum(len(locations) for _, locations in chunk)
+                chunks_done += 1
+
+                if chunks_done % args.checkpoint_every == 0:
+                    save_atomic(done, checkpoint)
+
+                elapsed = time.perf_counter() - start
+                rate = crops_done / elapsed if elapsed > 0 else 0.0
+                eta = (total_crops - crops_done) / rate if rate > 0 else 0.0
+                print(f"  {crops_done}/{total_crops} crops  {len(done)} users  "
+                      f"{rate:.1f} crops/s  ETA {eta:.0f}s", flush=True)
+
+                next_chunk = next(queue, None)
+                if next_chunk is not None:
+                    pending[pool.submit(_embed_chunk, args.pack, next_chunk)] = next_chunk
+
+    elapsed = time.perf_counter() - start
+
+    # Nobody silently disappears: users without usable crops keep their old
+    # templates (from the previous model) unless dropping them was asked for
+    unmigrated = sorted(n for n in current if n not in done)
+    migrated = len(done)
+    if not args.drop_unmigrated:
+        for name in unmigrated:
+            done[name] = current[name]
+    if os.path.exists(args.output):
+        shutil.copy2(args.output, args.output + ".bak")
+    save_atomic(done, args.output)
+    if os.path.exists(checkpoint):
+        os.remove(checkpoint)
+
+    print("\n" + "-"*70)
+    print(f"Migrated {migrated} users to {args.output}")
+    if unmigrated:
+        action = "removed" if args.drop_unmigrated else "kept with their old templates"
+        print(f"[-] {len(unmigrated)} users without usable crops {action}; "
+              f"they must re-enroll to be recognized by the new model: "
+              f"{', '.join(unmigrated[:10])}{' ...' if len(unmigrated) > 10 else ''}")
+    if elapsed > 0 and crops_done:
+        print(f"Throughput: {crops_done / elapsed:.1f} crops/s, "
+              f"{len(todo) / elapsed:.1f} users/s ({elapsed:.1f}s)")
+    if os.path.exists(args.output + ".bak"):
+        print(f"Previous database kept at {args.output}.bak")
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+# Auto-Punch Module - Touchless punching at busy entrances
+#
+# A keypress followed by a blocking capture caps an entrance at a few people
+# per minute. In auto-punch mode the live loop's own recognition results are
+# voted per face track (same consensus rule as a manual punch); a track that
+# reaches consensus is punched without any interaction, at most once per
+# person per dedup window. The punch type comes from rules instead of a key:
+# alternating per person, or by time of day.
+
+import time
+from collections import deque
+from datetime import datetime
+
+from src.recognition import SequentialConsensus
+
+
+PUNCH_IN = "Punch-In"
+PUNCH_OUT = "Punch-Out"
+
+
+class PunchRules:
+    """
+    Chooses the punch type for an automatic punch.
+
+    "alternate": a person's first punch of the day is a Punch-In, then
+                 In/Out alternate.
+    "schedule":  by time of day, from (HH:MM, punch_type) entries - the latest
+                 entry at or before the current time applies.
+    """
+
+    def __init__(self, mode="alternate", schedule=(("00:00", PUNCH_IN), ("12:00", PUNCH_OUT))):
+        if mode not in ("alternate", "schedule"):
+            raise ValueError(f"Unknown auto-punch rule '{mode}'")
+        self.mode = mode
+        self.schedule = sorted((self._minutes(at), punch_type) for at, punch_type in schedule)
+        if mode == "schedule" and not self.schedule:
+            raise ValueError("Auto-punch schedule is empty")
+        self._last = {}  # name -> (date, punch_type) of the last accepted punch
+
+    @staticmethod
+    def _minutes(at):
+        hours, minutes = at.split(":")
+        return int(hours) * 60 + int(minutes)
+
+    def punch_type(self, name, now=None):
+        """Punch type for `name` at `now` (datetime, defaults to now)."""
+        now = now or datetime.now()
+        if self.mode == "schedule":
+            minute = now.hour * 60 + now.minute
+            current = self.schedule[-1][1]  # Before the first entry: yesterday's last
+            for start, punch_type in self.schedule:
+                if start <= minute:
+                    current = punch_type
+            return current
+
+        day, last = self._last.get(name, (None, None))
+        if day != now.date() or last != PUNCH_IN:
+            return PUNCH_IN
+        return PUNCH_OUT
+
+    def record(self, name, punch_type, now=None):
+        """Remember an accepted punch (also used to replay today's log at startup)."""
+        now = now or datetime.now()
+        self._last[name] = (now.date(), punch_type)
+
+
+class AutoPuncher:
+    """
+    Per-track consensus votes, dedup window and throughput counters.
+
+    Tracks are keyed by any hashable (e.g. (camera, track_id)), so one
+    instance can serve several cameras and dedup people across them.
+    """
+
+    def __init__(self, rules, frames=3, consensus_threshold=0.67, min_frames=2,
+                 dedup_window=120.0, rate_window=60.0):
+        """
+        Args:
+            rules (PunchRules): Punch type rules
+            frames (int): Recognition results voted per decision
+            consensus_threshold (float): Fraction of them that must agree
+            min_frames (int): Minimum results matching any identity
+            dedup_window (float): Seconds before the same person is punched again
+            rate_window (float): Seconds over which people/minute is measured
+        """
+        self.rules = rules
+        self.frames = frames
+        self.consensus_threshold = consensus_threshold
+        self.min_frames = min_frames
+        self.dedup_window = dedup_window
+        self.rate_window = rate_window
+        self._votes = {}       # key -> (SequentialConsensus, [(name, face_sim, live_score)])
+        self._first_seen = {}  # key -> time the track got its first vote
+        self._settled = set()  # Tracks punched (or deduped) - no more votes
+        self._punched = {}     # name -> time of the last automatic punch
+        self._recent = deque() # Punch times within rate_window
+        self.started = time.time()
+        self.punches = 0
+        self.rejections = 0
+        self.deduped = 0
+        self.peak_rate = 0.0
+        self.time_to_punch = []
+
+    def settled(self, key):
+        """True once a track needs no more recognition results."""
+        return key in self._settled
+
+    def add(self, key, name, face_sim, live_score, now=None):
+        """
+        Vote one recognition result of a track.
+
+        Returns:
+            tuple: (name, face_score, liveness_score, punch_type) once the track
+                   reaches consensus - averages over the agreeing results - or
+                   None (still voting, rejected, settled or deduplicated)
+        """
+        now = time.time() if now is None else now
+        if key in self._settled:
+            return None
+        if key not in self._votes:
+            self._votes[key] = (SequentialConsensus(self.frames, self.consensus_threshold,
+                                                    self.min_frames), [])
+            self._first_seen.setdefault(key, now)
+        consensus, results = self._votes[key]
+        consensus.add(name)
+        results.append((name, face_sim, live_score))
+        if not consensus.decided:
+            return None
+
+        del self._votes[key]  # Next result starts a fresh vote
+        winner = consensus.result()
+        if winner is None:
+            return None
+        if now - self._punched.get(winner, -float("inf")) < self.dedup_window:
+            self.deduped += 1
+            self._settled.add(key)
+            return None
+
+        agreeing = [(sim, live) for voted, sim, live in results if voted == winner]
+        face_score = sum(sim for sim, _ in agreeing) / len(agreeing)
+        liveness_score = sum(live for _, live in agreeing) / len(agreeing)
+        return winner, face_score, liveness_score, self.rules.punch_type(winner)
+
+    def accepted(self, key, name, punch_type, now=None):
+        """Record a logged automatic punch."""
+        now = time.time() if now is None else now
+        self._settled.add(key)
+        self._punched[name] = now
+        self.rules.record(name, punch_type)
+        self.punches += 1
+        self.time_to_punch.append(now - self._first_seen.get(key, now))
+        self._recent.append(now)
+        self.peak_rate = max(self.peak_rate, self.people_per_minute(now))
+
+    def manual(self, name, punch_type, now=None):
+        """
+        Record an accepted manual punch: the next automatic punch type
+        follows it, and the person is not punched again automatically
+        within the dedup window (they are likely still in view).
+        """
+        now = time.time() if now is None else now
+        self._punched[name] = now
+        self.rules.record(name, punch_type)
+
+    def rejected(self, key):
+        """A consensus failed the score thresholds: keep voting on the track."""
+        self.rejections += 1
+
+    def forget(self, key):
+        """The track was lost: the person may come back as a new track."""
+        self._votes.pop(key, None)
+        self._first_seen.pop(key, None)
+        self._settled.discard(key)
+
+    def people_per_minute(self, now=None):
+        """Automatic punches per minute over the last `rate_window` seconds."""
+        now = time.time() if now is None else now
+        while self._recent and now - self._recent[0] > self.rate_window:
+            self._recent.popleft()
+        return len(self._recent) * 60.0 / self.rate_window
+
+    def report(self, now=None):
+        """Throughput summary line."""
+        now = time.time() if now is None else now
+        minutes = max(now - self.started, 1.0) / 60
+        text = (f"{self.punches} auto-punches, {self.punches / minutes:.1f} people/min overall, "
+                f"{self.people_per_minute(now):.1f} now, peak {self.peak_rate:.1f}")
+        if self.time_to_punch:
+            ordered = sorted(self.time_to_punch)
+            text += f", median {ordered[len(ordered) // 2]:.1f}s to punch"
+        return text + f" ({self.rejections} rejected, {self.deduped} deduplicated)"
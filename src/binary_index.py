@@ -0,0 +1,191 @@
+# Binary Index Module - Two-stage search with packed sign-bit signatures
+#
+# Every template gets a compact binary signature: the sign bits of a random
+# Gaussian projection (SimHash), packed into uint64 words. For unit vectors
+# the fraction of differing bits estimates the angle between them, so a
+# Hamming scan (XOR + popcount over a few words per template) ranks the
+# gallery at a fraction of the cost of a float matrix product. Only the
+# shortlist of closest signatures is then scored with exact cosine.
+
+import numpy as np
+
+from src.gallery import Gallery, normalize
+
+_M1 = np.uint64(0x5555555555555555)
+_M2 = np.uint64(0x3333333333333333)
+_M4 = np.uint64(0x0F0F0F0F0F0F0F0F)
+_H01 = np.uint64(0x0101010101010101)
+
+
+def popcount(words):
+    """
+    Number of set bits of each uint64 word.
+
+    Uses np.bitwise_count (NumPy >= 2.0) or a branch-free SWAR fallback.
+
+    Args:
+        words (np.ndarray): uint64 array
+
+    Returns:
+        np.ndarray: Bit counts, same shape
+    """
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(words)
+    x = words - ((words >> np.uint64(1)) & _M1)
+    x = (x & _M2) + ((x >> np.uint64(2)) & _M2)
+    x = (x + (x >> np.uint64(4))) & _M4
+    return (x * _H01) >> np.uint64(56)
+
+
+def hamming_distances(signatures, query):
+    """
+    Hamming distance of one signature to many.
+
+    Args:
+        signatures (np.ndarray): (W, T) uint64 signatures, word-major so each
+                                 word is one contiguous XOR + popcount pass
+        query (np.ndarray): (W,) uint64 query signature
+
+    Returns:
+        np.ndarray: (T,) int32 distances
+    """
+    distances = np.zeros(signatures.shape[1], dtype=np.int32)
+    for word, value in zip(signatures, query):
+        distances += popcount(np.bitwise_xor(word, value))
+    return distances
+
+
+class SignHasher:
+    """
+    Random-hyperplane hasher: sign(x . r_i) for `bits` Gaussian directions r_i.
+    """
+
+    def __init__(self, dim, bits=256, seed=0):
+        """
+        Args:
+            dim (int): Embedding dimension
+            bits (int): Signature length (rounded up to a multiple of 64)
+            seed (int): Seed for the projection (must match between build and query)
+        """
+        self.bits = 64 * max(1, -(-bits // 64))
+        rng = np.random.default_rng(seed)
+        self.planes = rng.normal(size=(dim, self.bits)).astype(np.float32)
+
+    @property
+    def words(self):
+        """uint64 words per signature."""
+        return self.bits // 64
+
+    def signatures(self, vectors):
+        """
+        Packed sign-bit signatures.
+
+        Args:
+            vectors (np.ndarray): (N, D) vectors
+
+        Returns:
+            np.ndarray: (N, bits // 64) uint64 signatures
+        """
+        bits = np.atleast_2d(vectors) @ self.planes > 0
+        packed = np.packbits(bits, axis=1)
+        return np.ascontiguousarray(packed).view(np.uint64)
+
+    def estimated_cosine(self, distances):
+        """Cosine implied by Hamming distance: cos(pi * d / bits)."""
+        return np.cos(np.pi * np.asarray(distances, dtype=np.float32) / self.bits)
+
+
+class BinaryGallery(Gallery):
+    """
+    Gallery with a Hamming-distance prefilter over packed signatures.
+
+    Scoring: Hamming scan of all template signatures -> `shortlist` closest
+    templates scored with exact cosine. Identities outside the shortlist
+    keep their signature-based cosine estimate, capped so they never outrank
+    an exactly scored candidate. Same search interface as Gallery.
+    """
+
+    _ROW_AXES = {"templates": 0, "signatures": 1}
+
+    def __init__(self, names, templates, offsets, hasher, signatures, shortlist=100):
+        """
+        Args:
+            names (list): Identity names
+            templates (np.ndarray): (T, D) unit-norm templates (may be an np.memmap)
+            offsets (np.ndarray): Identity start rows (see Gallery)
+            hasher (SignHasher): Hasher used for `signatures`
+            signatures (np.ndarray): (T, W) uint64 template signatures
+                                     (stored word-major for the scan)
+            shortlist (int): Templates scored exactly per query
+        """
+        super().__init__(names, templates, offsets)
+        self.hasher = hasher
+        self.signatures = np.ascontiguousarray(np.asarray(signatures).T)
+        self.shortlist = shortlist
+        self._reindex()
+
+    @classmethod
+    def from_gallery(cls, gallery, bits=256, shortlist=100, seed=0):
+        """
+        Add binary signatures to an exact Gallery.
+
+        Args:
+            gallery (Gallery): Exact gallery
+            bits (int): Signature length
+            shortlist (int): Templates scored exactly per query
+            seed (int): Projection seed
+
+        Returns:
+            BinaryGallery: Two-stage gallery
+        """
+        if gallery.num_templates:
+            hasher = SignHasher(gallery.templates.shape[1], bits, seed)
+            signatures = hasher.signatures(gallery.templates)
+        else:
+            hasher, signatures = None, np.zeros((0, 1), dtype=np.uint64)
+        return cls(gallery.names, gallery.templates, gallery.offsets, hasher,
+                   signatures, shortlist)
+
+    def _reindex(self):
+        super()._reindex()
+        self._owner = np.repeat(np.arange(len(self.names)), np.diff(self.offsets))
+        self._single = self.num_templates == len(self.names)
+
+    def _encode_rows(self, templates):
+        return {"templates": templates,
+                "signatures": np.ascontiguousarray(self.hasher.signatures(templates).T)}
+
+    @property
+    def nbytes(self):
+        """Bytes scanned by the prefilter (signatures)."""
+        return self.signatures.nbytes
+
+    def hamming(self, query_signature):
+        """(T,) Hamming distance of one packed query signature to every template."""
+        return hamming_distances(self.signatures, query_signature)
+
+    def scores_batch(self, embeddings):
+        queries = normalize(np.atleast_2d(embeddings))
+        if len(self) == 0:
+            return np.zeros((len(queries), 0), dtype=np.float32)
+
+        signatures = self.hasher.signatures(queries)
+        s = min(self.shortlist, self.num_templates)
+        scores = np.empty((len(queries), len(self)), dtype=np.float32)
+        for row, query in enumerate(queries):
+            distances = self.hamming(signatures[row])
+            # Closest signature per identity (cosine estimate is monotone in distance)
+            if self._single:
+                nearest = distances
+            else:
+                nearest = np.minimum.reduceat(distances, self.offsets[:-1])
+            scores[row] = self.hasher.estimated_cosine(nearest)
+
+            # Sorted rows keep memory-mapped template reads sequential
+            candidates = np.sort(np.argpartition(distances, s - 1)[:s])
+            exact = np.asarray(self.templates[candidates]) @ query
+            owners = self._owner[candidates]
+            np.minimum(scores[row], exact.min(), out=scores[row])
+            scores[row, owners] = -np.inf
+            np.maximum.at(scores[row], owners, exact)
+        return scores
@@ -1,19 +1,291 @@
 # Camera Module - Initialize and manage camera input
+#
+# Frames can come from a webcam or from recordings, so every part of the
+# pipeline can be exercised, benchmarked and regression-tested without a
+# physical camera. All sources share the cv2.VideoCapture interface the app
+# already uses (read / isOpened / release) and are selected by a spec string:
+#
+#   camera:0                 webcam index
+#   video:clip.mp4           recorded video file (or just a video path)
+#   images:frames/           directory of images, in file-name order
+#   stream:rtsp://host/cam   network stream (rtsp://, http(s):// also work bare)
+#   synthetic[:WxH@FPS]      deterministic generated frames
+#
+# Recorded sources replay in real time (paced at their frame rate) or as fast
+# as possible; live sources are always real time.
+
+import os
+import time
 
 import cv2
+import numpy as np
+
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mov", ".mkv", ".m4v", ".webm")
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+
+
+class FrameSource:
+    """
+    Base frame source with optional real-time pacing.
+
+    Subclasses implement _next_frame() returning a BGR frame or None at the
+    end of the recording.
+    """
+
+    def __init__(self, fps=30.0, realtime=True, loop=False):
+        """
+        Args:
+            fps (float): Nominal frame rate (used for pacing)
+            realtime (bool): Pace frames at `fps` instead of as fast as possible
+            loop (bool): Restart recordings when they end
+        """
+        self.fps = fps if fps and fps > 0 else 30.0
+        self.realtime = realtime
+        self.loop = loop
+        self.frames_read = 0
+        self._start = None
+
+    def _next_frame(self):
+        raise NotImplementedError
+
+    def _rewind(self):
+        """Go back to the first frame; False if the source can't rewind."""
+        return False
+
+    def _pace(self):
+        if not self.realtime:
+            return
+        now = time.perf_counter()
+        if self._start is None:
+            self._start = now
+            return
+        delay = self._start + self.frames_read / self.fps - now
+        if delay > 0:
+            time.sleep(delay)
+        elif delay < -1.0:
+            self._start = now - self.frames_read / self.fps  # Fell behind: don't burst
+
+    def read(self):
+        """
+        Next frame, cv2.VideoCapture style.
+
+        Returns:
+            tuple: (True, frame) or (False, None) at the end of the source
+        """
+        frame = self._next_frame()
+        if frame is None and self.loop and self._rewind():
+            frame = self._next_frame()
+        if frame is None:
+            return False, None
+        self._pace()
+        self.frames_read += 1
+        return True, frame
+
+    def isOpened(self):
+        return True
+
+    def release(self):
+        pass
+
+
+class CaptureSource(FrameSource):
+    """
+    cv2.VideoCapture-backed source: webcam, video file or network stream.
+    """
+
+    def __init__(self, target, realtime=True, loop=False, live=False, reconnect=3):
+        """
+        Args:
+            target: Camera index, file path or stream URL
+            realtime (bool): Pace recordings at their native frame rate
+            loop (bool): Restart a file when it ends
+            live (bool): Live camera/stream (never paced or rewound)
+            reconnect (int): Reopen attempts after a stream read failure
+        """
+        self.target = target
+        self.live = live
+        self.reconnect = reconnect
+        self.cap = cv2.VideoCapture(target)
+        if live:
+            self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)  # Newest frame, not a backlog
+        fps = self.cap.get(cv2.CAP_PROP_FPS)
+        super().__init__(fps, realtime and not live, loop and not live)
+
+    def _next_frame(self):
+        ret, frame = self.cap.read()
+        attempts = self.reconnect if self.live and isinstance(self.target, str) else 0
+        while not ret and attempts > 0:
+            attempts -= 1
+            time.sleep(0.5)
+            self.cap.release()
+            self.cap = cv2.VideoCapture(self.target)
+            ret, frame = self.cap.read()
+        return frame if ret else None
+
+    def _rewind(self):
+        return self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def release(self):
+        self.cap.release()
+
+
+class ImageFolderSource(FrameSource):
+    """
+    Images of a directory replayed as a video, in file-name order.
+    """
+
+    def __init__(self, directory, fps=10.0, realtime=True, loop=False):
+        """
+        Args:
+            directory (str): Directory of .jpg/.png/.bmp frames
+            fps (float): Replay frame rate
+            realtime (bool): Pace frames at `fps`
+            loop (bool): Restart at the first image when done
+        """
+        super().__init__(fps, realtime, loop)
+        self.paths = sorted(
+            os.path.join(directory, f) for f in os.listdir(directory)
+            if f.lower().endswith(IMAGE_EXTENSIONS)
+        ) if os.path.isdir(directory) else []
+        self._position = 0
+
+    def _next_frame(self):
+        while self._position < len(self.paths):
+            frame = cv2.imread(self.paths[self._position])
+            self._position += 1
+            if frame is not None:
+                return frame
+        return None
+
+    def _rewind(self):
+        self._position = 0
+        return bool(self.paths)
+
+    def isOpened(self):
+        return bool(self.paths)
+
+
+class SyntheticSource(FrameSource):
+    """
+    Deterministic generated frames: a textured background and a face-like
+    pattern drifting across it. Frame i depends only on (seed, i), so runs
+    are exactly reproducible.
+    """
+
+    def __init__(self, width=640, height=480, fps=30.0, num_frames=None, seed=0,
+                 realtime=True, loop=False):
+        """
+        Args:
+            width (int): Frame width
+            height (int): Frame height
+            fps (float): Nominal frame rate
+            num_frames (int): Frames before the source ends (None = endless)
+            seed (int): Background seed
+            realtime (bool): Pace frames at `fps`
+            loop (bool): Restart after num_frames
+        """
+        super().__init__(fps, realtime, loop)
+        self.width = width
+        self.height = height
+        self.num_frames = num_frames
+        self._index = 0
+        rng = np.random.default_rng(seed)
+        noise = rng.integers(0, 255, size=(height // 8 + 1, width // 8 + 1, 3), dtype=np.uint8)
+        self._background = cv2.resize(noise, (width, height), interpolation=cv2.INTER_LINEAR)
+
+    def frame_at(self, index):
+        """The frame with the given index."""
+        frame = self._background.copy()
+        size = min(self.width, self.height) // 3
+        t = index / self.fps
+        cx = int(self.width / 2 + self.width / 6 * np.sin(0.5 * t))
+        cy = int(self.height / 2 + self.height / 12 * np.sin(0.8 * t))
+
+        # Face-like pattern: skin ellipse, eyes, nose, mouth
+        cv2.ellipse(frame, (cx, cy), (size // 2, int(size * 0.65)), 0, 0, 360,
+                    (140, 170, 210), -1)
+        for dx in (-size // 5, size // 5):
+            cv2.circle(frame, (cx + dx, cy - size // 6), size // 14, (40, 30, 30), -1)
+        cv2.line(frame, (cx, cy - size // 12), (cx, cy + size // 10), (110, 130, 170), 2)
+        cv2.ellipse(frame, (cx, cy + size // 4), (size // 6, size // 16), 0, 0, 180,
+                    (60, 60, 150), -1)
+        cv2.putText(frame, f"{index}", (10, self.height - 10), cv2.FONT_HERSHEY_SIMPLEX,
+                    0.5, (255, 255, 255), 1)
+        return frame
+
+    def _next_frame(self):
+        if self.num_frames is not None and self._index >= self.num_frames:
+            return None
+        frame = self.frame_at(self._index)
+        self._index += 1
+        return frame
+
+    def _rewind(self):
+        self._index = 0
+        return True
 
 
-def get_camera():
+def open_source(spec, realtime=True, loop=False):
     """
-    Initialize camera capture.
-    
+    Open a frame source from a spec string (see module header).
+
+    Args:
+        spec (str): Source spec, e.g. "camera:0", "video:clip.mp4", "synthetic"
+        realtime (bool): Pace recorded sources at their frame rate
+        loop (bool): Restart recorded sources when they end
+
     Returns:
-        cv2.VideoCapture: Camera object
-        
+        FrameSource: Source with the cv2.VideoCapture read/isOpened/release API
+    """
+    spec = str(spec).strip()
+    kind, _, arg = spec.partition(":")
+
+    if spec.startswith(("rtsp://", "rtmp://", "http://", "https://")):
+        kind, arg = "stream", spec
+    elif spec.isdigit():
+        kind, arg = "camera", spec
+    elif kind not in ("camera", "video", "images", "stream", "synthetic"):
+        # Bare path: decide by what is on disk
+        arg = spec
+        kind = "images" if os.path.isdir(spec) else "video"
+
+    if kind == "camera":
+        return CaptureSource(int(arg or 0), live=True)
+    if kind == "video":
+        return CaptureSource(arg, realtime=realtime, loop=loop)
+    if kind == "images":
+        return ImageFolderSource(arg, realtime=realtime, loop=loop)
+    if kind == "stream":
+        return CaptureSource(arg, live=True)
+
+    # synthetic[:WxH][@FPS]
+    size, _, fps = arg.partition("@")
+    width, _, height = size.partition("x")
+    return SyntheticSource(int(width or 640), int(height or 480), float(fps or 30.0),
+                           realtime=realtime, loop=loop)
+
+
+def get_camera(source="camera:0", realtime=True, loop=False):
+    """
+    Initialize frame capture.
+
+    Args:
+        source (str): Source spec (FRAME_SOURCE); default is webcam 0
+        realtime (bool): Pace recorded sources at their frame rate
+        loop (bool): Restart recorded sources when they end
+
+    Returns:
+        FrameSource: Object with the cv2.VideoCapture read/isOpened/release API
+
     Raises:
-        RuntimeError: If camera not accessible
+        RuntimeError: If the source is not accessible
     """
-    cap = cv2.VideoCapture(0)
+    cap = open_source(source, realtime, loop)
     if not cap.isOpened():
-        raise RuntimeError("Camera not accessible. Check permissions or try a different camera index.")
+        if isinstance(cap, CaptureSource) and cap.live and not isinstance(cap.target, str):
+            raise RuntimeError("Camera not accessible. Check permissions or try a different camera index.")
+        raise RuntimeError(f"Frame source not accessible: {source}")
     return cap
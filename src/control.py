@@ -0,0 +1,166 @@
+# Control Module - Punch triggers for headless kiosks
+#
+# Without a window there are no keypresses. A turnstile controller, a GPIO
+# button script or an operator's shell sends one text command per line to a
+# local socket instead:
+#
+#   in [camera]              punch in (reply when the verification finished)
+#   out [camera]             punch out
+#   register NAME [camera]   enroll (add "--overwrite" to replace a user)
+#   cancel [camera]          cancel the running job
+#   status                   what the system is doing
+#   quit                     shut down
+#
+# Commands are queued and executed by the live loop itself, so they go
+# through exactly the same paths as keypresses. The connection gets one reply
+# line per command: "OK <message>" or "ERR <message>".
+#
+# From a shell:  python -m src.control in
+
+import os
+import queue
+import socket
+import socketserver
+import sys
+import threading
+
+
+def parse_address(address):
+    """
+    "host:port" (TCP) or a filesystem path (Unix socket).
+
+    Returns:
+        tuple or str: (host, port) or the socket path
+    """
+    host, sep, port = str(address).rpartition(":")
+    if sep and port.isdigit() and os.sep not in host:
+        return host or "127.0.0.1", int(port)
+    return address
+
+
+class Command:
+    """
+    One command line waiting to be executed by the live loop.
+    """
+
+    def __init__(self, line):
+        self.line = line.strip()
+        self.words = self.line.split()
+        self.job = None
+        self._reply = None
+        self._done = threading.Event()
+
+    @property
+    def name(self):
+        return self.words[0].lower() if self.words else ""
+
+    def reply(self, ok, message="", job=None):
+        """
+        Answer the command.
+
+        Args:
+            ok (bool): Success
+            message (str): Reply text
+            job (BackgroundJob): If given, the reply is the job's final status
+        """
+        self.job = job
+        self._reply = f"{'OK' if ok else 'ERR'} {message}".strip()
+        self._done.set()
+
+    def wait(self, timeout=None):
+        """Reply line, or None if the loop didn't answer in time."""
+        if not self._done.wait(timeout):
+            return None
+        if self.job is not None:
+            self.job.join(timeout)
+            prefix = "ERR" if self.job.running or self.job.level == "warn" else "OK"
+            return f"{prefix} {self.job.status}"
+        return self._reply
+
+
+class ControlChannel:
+    """
+    Local line-oriented command socket served on a background thread.
+    """
+
+    def __init__(self, address, timeout=10.0):
+        """
+        Args:
+            address (str): "host:port" or a Unix socket path
+            timeout (float): Seconds a connection waits for each reply
+        """
+        self.address = parse_address(address)
+        self.timeout = timeout
+        self._queue = queue.Queue()
+        self._server = None
+
+    def start(self):
+        channel = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                for raw in self.rfile:
+                    command = Command(raw.decode("utf-8", errors="replace"))
+                    if not command.words:
+                        continue
+                    channel._queue.put(command)
+                    reply = command.wait(channel.timeout) or "ERR timed out"
+                    self.wfile.write((reply + "\n").encode("utf-8"))
+
+        if isinstance(self.address, tuple):
+            server_class = socketserver.ThreadingTCPServer
+        else:
+            server_class = socketserver.ThreadingUnixStreamServer
+            if os.path.exists(self.address):
+                os.remove(self.address)  # Stale socket from a previous run
+        server_class.daemon_threads = True
+        server_class.allow_reuse_address = True
+        self._server = server_class(self.address, Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True,
+                         name="control-channel").start()
+        return self
+
+    def poll(self):
+        """Commands received since the last call (never blocks)."""
+        commands = []
+        while True:
+            try:
+                commands.append(self._queue.get_nowait())
+            except queue.Empty:
+                return commands
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            if not isinstance(self.address, tuple) and os.path.exists(self.address):
+                os.remove(self.address)
+        for command in self.poll():
+            command.reply(False, "shutting down")
+
+
+def send(address, line, timeout=15.0):
+    """
+    Send one command and return the reply line (client side).
+
+    Args:
+        address (str): "host:port" or a Unix socket path
+        line (str): Command, e.g. "in" or "register Alice"
+        timeout (float): Seconds to wait for the reply
+    """
+    address = parse_address(address)
+    family = socket.AF_INET if isinstance(address, tuple) else socket.AF_UNIX
+    with socket.socket(family, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(address)
+        sock.sendall((line.strip() + "\n").encode("utf-8"))
+        return sock.makefile("r", encoding="utf-8").readline().strip()
+
+
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+    from config import CONTROL_ADDRESS
+    if len(sys.argv) < 2:
+        print("Usage: python -m src.control in|out|register NAME|cancel|status|quit [camera]")
+        sys.exit(2)
+    print(send(CONTROL_ADDRESS, " ".join(sys.argv[1:])))
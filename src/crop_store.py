@@ -0,0 +1,139 @@
+# Crop Store Module - Enrollment face crops retained in a pack file
+#
+# A gallery vector is only meaningful for the detector/embedding model that
+# produced it. Keeping the (JPEG-compressed) crops each user was enrolled
+# with lets the whole gallery be re-embedded after a model change instead of
+# asking every employee to re-enroll.
+#
+# Pack file: append-only sequence of records, each
+#   header  <4sQHHI>  magic, session id, name length, crop index, JPEG length
+#   name    UTF-8
+#   jpeg    encoded crop
+# A re-enrollment appends a new session; readers use each name's latest one.
+
+import os
+import struct
+import threading
+import time
+
+import cv2
+import numpy as np
+
+_MAGIC = b"FCRP"
+_HEADER = struct.Struct("<4sQHHI")
+
+
+class CropStore:
+    """
+    Append-only pack file of enrollment crops.
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            path (str): Pack file path (created on first add)
+        """
+        self.path = path
+        self._lock = threading.Lock()
+
+    def add(self, name, crops, quality=90):
+        """
+        Append one enrollment session for a user.
+
+        Args:
+            name (str): User name
+            crops (list): Face crops (BGR) that were embedded
+            quality (int): JPEG quality
+
+        Returns:
+            int: Session id (milliseconds since the epoch)
+        """
+        session = int(time.time() * 1000)
+        name_bytes = name.encode("utf-8")
+        chunks = []
+        for index, crop in enumerate(crops):
+            ok, jpeg = cv2.imencode(".jpg", crop, [cv2.IMWRITE_JPEG_QUALITY, quality])
+            if not ok:
+                raise ValueError(f"Could not encode crop {index} of '{name}'")
+            jpeg = jpeg.tobytes()
+            chunks.append(_HEADER.pack(_MAGIC, session, len(name_bytes), index, len(jpeg)))
+            chunks.append(name_bytes)
+            chunks.append(jpeg)
+
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            # One write per session: a crash leaves at most a torn tail, which
+            # is cut off before the next append
+            _, end = self._scan()
+            with open(self.path, "ab") as f:
+                if f.tell() > end:
+                    f.truncate(end)
+                f.write(b"".join(chunks))
+                f.flush()
+                os.fsync(f.fileno())
+        return session
+
+    def _scan(self):
+        """Walk record headers: ({name: (session, locations)}, end of last whole record)."""
+        latest = {}
+        end = 0
+        if not os.path.exists(self.path):
+            return latest, end
+        with open(self.path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            while True:
+                header = f.read(_HEADER.size)
+                if len(header) < _HEADER.size:
+                    break
+                magic, session, name_len, _, jpeg_len = _HEADER.unpack(header)
+                if magic != _MAGIC:
+                    break  # Torn write at the tail
+                name = f.read(name_len).decode("utf-8", errors="replace")
+                offset = f.tell()
+                if offset + jpeg_len > size:
+                    break
+                f.seek(jpeg_len, os.SEEK_CUR)
+                end = f.tell()
+                current = latest.get(name)
+                if current is None or session > current[0]:
+                    latest[name] = (session, [])
+                if latest[name][0] == session:
+                    latest[name][1].append((offset, jpeg_len))
+        return latest, end
+
+    def index(self):
+        """
+        Locate every user's latest enrollment session.
+
+        Returns:
+            dict: {name: [(offset, length), ...]} JPEG locations in the pack
+        """
+        latest, _ = self._scan()
+        return {name: locations for name, (_, locations) in latest.items()}
+
+    def read(self, locations):
+        """
+        Raw JPEG bytes at the given pack locations.
+
+        Args:
+            locations (list): (offset, length) pairs from index()
+
+        Returns:
+            list: JPEG bytes per crop
+        """
+        jpegs = []
+        with open(self.path, "rb") as f:
+            for offset, length in locations:
+                f.seek(offset)
+                jpegs.append(f.read(length))
+        return jpegs
+
+    def crops(self, name):
+        """Decoded crops (BGR) of a user's latest enrollment, or []."""
+        locations = self.index().get(name)
+        return [decode_crop(jpeg) for jpeg in self.read(locations)] if locations else []
+
+
+def decode_crop(jpeg):
+    """Decode JPEG bytes from the pack into a BGR image."""
+    return cv2.imdecode(np.frombuffer(jpeg, dtype=np.uint8), cv2.IMREAD_COLOR)
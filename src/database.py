@@ -2,6 +2,10 @@
 
 import numpy as np
 import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
 
 
 EMBEDDINGS_PATH = "data/embeddings/embeddings.npy"
@@ -12,7 +16,9 @@ def load_db():
     Load embedding database from disk.
     
     Returns:
-        dict: {name: embedding} pairs or empty dict if file doesn't exist
+        dict: {name: embedding} pairs or empty dict if file doesn't exist.
+              An embedding is either one (D,) vector or a (k, D) stack of
+              templates.
     """
     if os.path.exists(EMBEDDINGS_PATH):
         return np.load(EMBEDDINGS_PATH, allow_pickle=True).item()
@@ -23,9 +29,167 @@ def save_db(db):
     """
     Save embedding database to disk.
     
+    The file is written to a temporary path and atomically renamed, so a
+    reader (or a crash mid-write) never sees a half-written database.
+    
     Args:
         db (dict): {name: embedding} pairs
     """
     # Ensure directory exists
+    directory = os.path.dirname(EMBEDDINGS_PATH)
+    os.makedirs(directory, exist_ok=True)
+    # Unique temporary name: processes saving at once never share it
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=os.path.basename(EMBEDDINGS_PATH) + ".",
+                                    suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.save(f, db)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, EMBEDDINGS_PATH)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+@contextmanager
+def file_lock(path, timeout=30.0, stale_after=60.0):
+    """
+    Exclusive section across processes.
+    
+    The lock is a file created with O_EXCL, so it works on every platform;
+    a lock file older than `stale_after` seconds is left over from a crashed
+    holder and broken.
+    
+    Raises:
+        TimeoutError: Another process held the lock for `timeout` seconds
+    """
+    deadline = time.time() + timeout
+    while True:
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            try:
+                if time.time() - os.stat(path).st_mtime > stale_after:
+                    os.remove(path)
+                    continue
+            except FileNotFoundError:
+                continue  # Released meanwhile
+            if time.time() > deadline:
+                raise TimeoutError(f"Lock busy: {path}")
+            time.sleep(0.01)
+    with os.fdopen(fd, "w") as f:
+        f.write(str(os.getpid()))
+    try:
+        yield
+    finally:
+        os.remove(path)
+
+
+def update_db(upserts, removals=()):
+    """
+    Apply a change to the database file (read-modify-write).
+    
+    Under a lock shared by every process the file is reloaded first, so
+    users saved by other processes since this one last loaded it are kept.
+    
+    Args:
+        upserts (dict): {name: embedding} to add or replace
+        removals (iterable): Names to remove
+    
+    Returns:
+        dict: The database as saved
+    """
     os.makedirs(os.path.dirname(EMBEDDINGS_PATH), exist_ok=True)
-    np.save(EMBEDDINGS_PATH, db)
+    with file_lock(EMBEDDINGS_PATH + ".lock"):
+        db = load_db()
+        for name in removals:
+            db.pop(name, None)
+        db.update(upserts)
+        save_db(db)
+    return db
+
+
+def db_version():
+    """
+    Cheap change token of the database file: (inode, mtime, size), or None.
+    
+    save_db() replaces the file, so every save yields a new inode even when
+    the mtime resolution is coarse.
+    """
+    try:
+        st = os.stat(EMBEDDINGS_PATH)
+    except FileNotFoundError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+def diff_db(old, new):
+    """
+    Identities that differ between two databases.
+    
+    Args:
+        old (dict): Current {name: embedding} pairs
+        new (dict): Newly loaded {name: embedding} pairs
+    
+    Returns:
+        tuple: ({name: embedding} added or changed, [names] removed)
+    """
+    upserts = {}
+    for name, value in new.items():
+        current = old.get(name)
+        if current is None or not (current is value or np.array_equal(current, value)):
+            upserts[name] = value
+    removals = [name for name in old if name not in new]
+    return upserts, removals
+
+
+class DatabaseWatcher:
+    """
+    Background thread reporting database changes made by other processes
+    (another kiosk, an admin tool).
+    
+    Polls db_version() every `interval` seconds; on a change it loads the
+    database in the watcher thread and hands it to `on_change(db, version)`,
+    so the caller's hot path never reads or parses the file. A callback that
+    finds db_version() moved on since `version` should drop the (stale) load;
+    the next poll delivers the newer file.
+    """
+    
+    def __init__(self, on_change, interval=2.0):
+        """
+        Args:
+            on_change (callable): Called with the newly loaded database dict
+                                  and the version it was loaded at
+            interval (float): Seconds between polls
+        """
+        self.on_change = on_change
+        self.interval = interval
+        self.version = db_version()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="db-watcher", daemon=True)
+    
+    def start(self):
+        self._thread.start()
+        return self
+    
+    def stop(self):
+        self._stop.set()
+        self._thread.join(timeout=self.interval + 1.0)
+    
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            version = db_version()
+            if version == self.version:
+                continue
+            try:
+                db = load_db()
+            except (OSError, ValueError, EOFError) as e:
+                print(f"[-] Database reload failed: {e}")
+                continue  # Retry on the next poll
+            self.version = version
+            try:
+                self.on_change(db, version)
+            except Exception as e:
+                print(f"[-] Applying database change failed: {e}")
@@ -7,6 +7,7 @@ import os
 os.environ['TF_CPP_MIN_LOG_LEVEL'] = '3'
 
 import cv2
+import numpy as np
 import torch
 from facenet_pytorch import InceptionResnetV1
 import ssl
@@ -27,6 +28,12 @@ model = InceptionResnetV1(pretrained="vggface2").eval()
 sys.stderr = _stderr
 
 
+def _to_tensor(face):
+    """Resize a BGR crop to FaceNet input size and convert to a CHW tensor."""
+    face = cv2.resize(face, (160, 160))
+    return torch.tensor(face).permute(2, 0, 1).float()
+
+
 def get_embedding(face):
     """
     Generate 512-D FaceNet embedding from face image.
@@ -37,14 +44,31 @@ def get_embedding(face):
     Returns:
         np.ndarray: 512-D embedding vector
     """
-    # Resize to FaceNet input size
-    face = cv2.resize(face, (160, 160))
-    
-    # Convert to tensor and normalize
-    face_tensor = torch.tensor(face).permute(2, 0, 1).float().unsqueeze(0)
+    # Resize to FaceNet input size and convert to tensor
+    face_tensor = _to_tensor(face).unsqueeze(0)
     
     # Generate embedding
     with torch.no_grad():
         embedding = model(face_tensor).detach().numpy()[0]
     
     return embedding
+
+
+def get_embeddings(faces):
+    """
+    Generate FaceNet embeddings for several faces in one batched forward pass.
+    
+    Same preprocessing as get_embedding(), so results are interchangeable.
+    
+    Args:
+        faces (list): Face images (BGR)
+        
+    Returns:
+        np.ndarray: (N, 512) embedding matrix
+    """
+    if len(faces) == 0:
+        return np.zeros((0, 512), dtype=np.float32)
+    
+    batch = torch.stack([_to_tensor(face) for face in faces])
+    with torch.no_grad():
+        return model(batch).detach().numpy()
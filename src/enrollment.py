@@ -0,0 +1,146 @@
+# Enrollment Module - Diversity-aware selection of registration samples
+#
+# Consecutive camera frames of a person holding still are nearly identical, so
+# embedding every one of them costs a FaceNet pass each while adding almost no
+# information. Candidate crops are screened cheaply (size, sharpness,
+# liveness) and compared by a tiny grayscale signature; only distinct crops
+# are kept, and those are embedded together in one batch.
+
+from collections import Counter
+
+import cv2
+import numpy as np
+
+from src.liveness import liveness
+
+
+def crop_signature(face, size=16):
+    """
+    Tiny appearance signature of a face crop for near-duplicate detection.
+
+    Args:
+        face (np.ndarray): Face image (BGR)
+        size (int): Signature side length
+
+    Returns:
+        np.ndarray: Zero-mean, unit-norm vector of size*size values
+    """
+    gray = cv2.cvtColor(face, cv2.COLOR_BGR2GRAY)
+    small = cv2.resize(gray, (size, size), interpolation=cv2.INTER_AREA).astype(np.float32).ravel()
+    small -= small.mean()
+    return small / (np.linalg.norm(small) + 1e-6)
+
+
+def crop_sharpness(face):
+    """Laplacian variance of a face crop (higher = sharper)."""
+    gray = cv2.cvtColor(face, cv2.COLOR_BGR2GRAY)
+    return cv2.Laplacian(gray, cv2.CV_64F).var()
+
+
+class EnrollmentSelector:
+    """
+    Buffers candidate crops and keeps a diverse, good-quality subset.
+
+    A candidate is rejected if it is too small, too blurry or fails the
+    single-frame liveness check. A candidate whose signature is too similar
+    to an already-selected crop is held back as a spare (after passing the
+    same checks, liveness included); spares are only used to top up the
+    selection if too few distinct crops were seen.
+    """
+
+    def __init__(self, max_samples=20, min_samples=8, duplicate_similarity=0.97,
+                 min_face_size=60, min_sharpness=30.0, min_liveness=0.75):
+        """
+        Args:
+            max_samples (int): Stop once this many distinct crops are selected
+            min_samples (int): Crops required to complete enrollment
+            duplicate_similarity (float): Signature similarity above which a
+                                          crop counts as a near-duplicate
+            min_face_size (int): Minimum crop side length (pixels)
+            min_sharpness (float): Minimum Laplacian variance
+            min_liveness (float): Minimum single-frame liveness score
+        """
+        self.max_samples = max_samples
+        self.min_samples = min_samples
+        self.duplicate_similarity = duplicate_similarity
+        self.min_face_size = min_face_size
+        self.min_sharpness = min_sharpness
+        self.min_liveness = min_liveness
+
+        self.selected = []      # Distinct crops to embed
+        self._signatures = []   # Signatures of selected crops
+        self._spares = []       # (sharpness, crop) near-duplicates passing every check
+        self.seen = 0
+        self.rejected_quality = 0
+        self.rejected_duplicate = 0
+        self.rejections = Counter()  # Low-quality reason -> count
+
+    def add(self, face):
+        """
+        Offer one candidate crop.
+
+        Args:
+            face (np.ndarray): Face image (BGR)
+
+        Returns:
+            str: 'selected', 'duplicate' or 'low_quality'
+        """
+        self.seen += 1
+
+        h, w = face.shape[:2]
+        if min(h, w) < self.min_face_size:
+            return self._reject("too small")
+
+        sharpness = crop_sharpness(face)
+        if sharpness < self.min_sharpness:
+            return self._reject("blurry")
+
+        signature = crop_signature(face)
+        duplicate = bool(self._signatures) and float(
+            np.max(np.stack(self._signatures) @ signature)) >= self.duplicate_similarity
+        # Spares can only fill up to min_samples; skip liveness once enough are held
+        if duplicate and len(self._spares) >= self.min_samples:
+            self.rejected_duplicate += 1
+            return "duplicate"
+
+        # Liveness is the most expensive check - run it only on crops we keep
+        if liveness(face) < self.min_liveness:
+            return self._reject("liveness")
+
+        if duplicate:
+            self.rejected_duplicate += 1
+            self._spares.append((sharpness, face.copy()))
+            return "duplicate"
+        self.selected.append(face.copy())
+        self._signatures.append(signature)
+        return "selected"
+
+    def _reject(self, reason):
+        self.rejected_quality += 1
+        self.rejections[reason] += 1
+        return "low_quality"
+
+    @property
+    def full(self):
+        """True once max_samples distinct crops are selected."""
+        return len(self.selected) >= self.max_samples
+
+    @property
+    def ready(self):
+        """True if enough crops (including spares) exist to finish enrollment."""
+        return len(self.selected) + len(self._spares) >= self.min_samples
+
+    def samples(self):
+        """
+        Crops to embed: all distinct crops, topped up with the sharpest spares
+        if fewer than min_samples distinct crops were found.
+
+        Returns:
+            list: Face crops (BGR)
+        """
+        crops = list(self.selected)
+        missing = self.min_samples - len(crops)
+        if missing > 0:
+            spares = sorted(self._spares, key=lambda item: item[0], reverse=True)
+            crops.extend(crop for _, crop in spares[:missing])
+        return crops
@@ -0,0 +1,430 @@
+# Gallery Module - Multi-template identities in one flat matrix
+#
+# Each identity may hold several templates (e.g. k-means centroids of its
+# enrollment embeddings, covering pose and lighting variation). All templates
+# are L2-normalized and stacked into one (T, D) matrix; `offsets` marks where
+# each identity's rows start. Scoring a query is one matrix-vector product
+# followed by a segmented max per identity (np.maximum.reduceat).
+
+import copy
+
+import numpy as np
+
+
+def normalize(vectors):
+    """
+    L2-normalize vectors along the last axis.
+
+    Args:
+        vectors (np.ndarray): (D,) or (N, D) array
+
+    Returns:
+        np.ndarray: float32 array of unit vectors (zero vectors stay zero)
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def kmeans_templates(embeddings, k, iterations=20, seed=0):
+    """
+    Summarize enrollment embeddings as up to k cosine k-means centroids.
+
+    Args:
+        embeddings (np.ndarray): (N, D) enrollment embeddings
+        k (int): Maximum number of templates
+        iterations (int): Lloyd iterations
+        seed (int): Seed for the deterministic k-means++ initialization
+
+    Returns:
+        np.ndarray: (min(k, N), D) unit-norm templates
+    """
+    points = normalize(np.atleast_2d(embeddings))
+    n = len(points)
+    k = max(1, min(k, n))
+    if k == 1:
+        return normalize(points.mean(axis=0, keepdims=True))
+
+    # k-means++ seeding on cosine distance
+    rng = np.random.default_rng(seed)
+    centers = [points[rng.integers(n)]]
+    for _ in range(1, k):
+        dist = 1.0 - np.max(points @ np.stack(centers).T, axis=1)
+        dist = np.maximum(dist, 0.0)
+        if dist.sum() <= 0:
+            break
+        centers.append(points[rng.choice(n, p=dist / dist.sum())])
+    centers = np.stack(centers)
+
+    for _ in range(iterations):
+        assign = np.argmax(points @ centers.T, axis=1)
+        updated = np.stack([
+            points[assign == c].mean(axis=0) if np.any(assign == c) else centers[c]
+            for c in range(len(centers))
+        ])
+        updated = normalize(updated)
+        if np.allclose(updated, centers, atol=1e-6):
+            break
+        centers = updated
+
+    return centers
+
+
+class Gallery:
+    """
+    Read-only search structure over enrolled identities.
+
+    Built once from the {name: embedding(s)} database and replaced as a whole
+    when the database changes, so concurrent readers never see partial state.
+    updated() builds the replacement from the old gallery plus the changed
+    identities only.
+    """
+
+    # Per-template arrays and the axis their rows run along
+    _ROW_AXES = {"templates": 0}
+
+    def __init__(self, names, templates, offsets):
+        """
+        Args:
+            names (list): Identity names
+            templates (np.ndarray): (T, D) unit-norm templates, grouped by identity
+            offsets (np.ndarray): (len(names) + 1,) start row of each identity;
+                                  offsets[-1] == T. Every identity needs >= 1 row.
+        """
+        self.names = list(names)
+        self.templates = templates
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self._index = {name: i for i, name in enumerate(self.names)}
+
+    @classmethod
+    def from_db(cls, db):
+        """
+        Build a gallery from a {name: embedding} database.
+
+        Values may be a single (D,) embedding or a (k, D) stack of templates.
+
+        Args:
+            db (dict): {name: embedding(s)} pairs
+
+        Returns:
+            Gallery: Search structure over all identities
+        """
+        names = []
+        blocks = []
+        offsets = [0]
+        for name, value in db.items():
+            block = normalize(np.atleast_2d(value))
+            if len(block) == 0:
+                continue
+            names.append(name)
+            blocks.append(block)
+            offsets.append(offsets[-1] + len(block))
+
+        if blocks:
+            templates = np.ascontiguousarray(np.concatenate(blocks))
+        else:
+            templates = np.zeros((0, 0), dtype=np.float32)
+        return cls(names, templates, offsets)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name in self._index
+
+    @property
+    def num_templates(self):
+        """Total number of stored templates."""
+        return int(self.offsets[-1])
+
+    def templates_of(self, name):
+        """(k, D) templates of one identity."""
+        i = self._index[name]
+        return self.templates[self.offsets[i]:self.offsets[i + 1]]
+
+    def _template_scores(self, queries):
+        """(M, T) cosine similarity of unit queries to every template."""
+        return queries @ self.templates.T
+
+    def _encode_rows(self, templates):
+        """Per-template arrays (see _ROW_AXES) for new unit-norm templates."""
+        return {"templates": templates}
+
+    def _reindex(self):
+        """Refresh lookup state derived from names/offsets."""
+        self._index = {name: i for i, name in enumerate(self.names)}
+
+    def updated(self, upserts, removals=()):
+        """
+        New gallery with some identities added, replaced or removed.
+
+        Unchanged identities keep their stored rows as they are; only the
+        upserted templates are normalized and encoded. The old gallery is
+        left untouched, so readers can keep using it until it is swapped out.
+
+        Args:
+            upserts (dict): {name: embedding(s)} to add or replace
+            removals (iterable): Names to remove
+
+        Returns:
+            Gallery: Updated gallery of the same kind
+        """
+        drop = set(removals) | set(upserts)
+        keep = np.array([name not in drop for name in self.names], dtype=bool)
+        row_mask = np.repeat(keep, np.diff(self.offsets))
+
+        names = [name for name, kept in zip(self.names, keep) if kept]
+        counts = list(np.diff(self.offsets)[keep])
+        blocks = []
+        for name, value in upserts.items():
+            block = normalize(np.atleast_2d(value))
+            if len(block):
+                names.append(name)
+                counts.append(len(block))
+                blocks.append(block)
+        encoded = self._encode_rows(np.concatenate(blocks)) if blocks else {}
+
+        clone = copy.copy(self)
+        for attr, axis in self._ROW_AXES.items():
+            old = getattr(self, attr)
+            if old is None:
+                continue
+            parts = [np.compress(row_mask, old, axis=axis)] if row_mask.any() else []
+            if attr in encoded:
+                parts.append(encoded[attr])
+            setattr(clone, attr, np.concatenate(parts, axis=axis) if parts
+                    else np.compress(row_mask, old, axis=axis))
+        clone.names = names
+        clone.offsets = np.concatenate([[0], np.cumsum(counts, dtype=np.int64)])
+        clone._reindex()
+        return clone
+
+    def scores_batch(self, embeddings):
+        """
+        Best-template cosine similarity of each query to each identity.
+
+        Args:
+            embeddings (np.ndarray): (M, D) query embeddings
+
+        Returns:
+            np.ndarray: (M, len(self)) similarity matrix
+        """
+        queries = normalize(np.atleast_2d(embeddings))
+        if len(self) == 0:
+            return np.zeros((len(queries), 0), dtype=np.float32)
+        template_scores = self._template_scores(queries)
+        return np.maximum.reduceat(template_scores, self.offsets[:-1], axis=1)
+
+    def scores(self, embedding):
+        """
+        Best-template cosine similarity of one query to each identity.
+
+        Args:
+            embedding (np.ndarray): (D,) query embedding
+
+        Returns:
+            np.ndarray: (len(self),) similarities
+        """
+        return self.scores_batch(np.atleast_2d(embedding))[0]
+
+    def best(self, embedding):
+        """
+        Closest identity to a query.
+
+        Returns:
+            tuple: (name, similarity) or (None, 0.0) for an empty gallery
+        """
+        if len(self) == 0:
+            return None, 0.0
+        scores = self.scores(embedding)
+        i = int(np.argmax(scores))
+        return self.names[i], float(scores[i])
+
+    def best_batch(self, embeddings):
+        """
+        Closest identity to each of several queries (one matrix product).
+
+        Returns:
+            list: (name, similarity) per query
+        """
+        if len(self) == 0:
+            return [(None, 0.0)] * len(np.atleast_2d(embeddings))
+        scores = self.scores_batch(embeddings)
+        best = np.argmax(scores, axis=1)
+        return [(self.names[i], float(scores[row, i])) for row, i in enumerate(best)]
+
+    def top_k(self, embedding, k=5):
+        """
+        The k closest identities to a query, best first.
+
+        Returns:
+            list: (name, similarity) pairs
+        """
+        return self.top_k_batch(np.atleast_2d(embedding), k)[0]
+
+    def top_k_batch(self, embeddings, k=5):
+        """
+        The k closest identities to each of several queries.
+
+        Returns:
+            list: Per query, a best-first list of (name, similarity) pairs
+        """
+        if len(self) == 0:
+            return [[] for _ in range(len(np.atleast_2d(embeddings)))]
+        scores = self.scores_batch(embeddings)
+        k = min(k, scores.shape[1])
+        results = []
+        for row in scores:
+            top = np.argpartition(-row, k - 1)[:k]
+            top = top[np.argsort(-row[top])]
+            results.append([(self.names[i], float(row[i])) for i in top])
+        return results
+
+
+class QuantizedGallery(Gallery):
+    """
+    Gallery with reduced-precision template storage.
+
+    'float16' halves memory; 'int8' stores each unit-norm template as
+    symmetric int8 values with one float32 scale per vector (~4x smaller).
+    Scoring upcasts a small cache-sized chunk of rows at a time into a reused
+    float32 buffer for the matrix product. With int8 this reads 4x less
+    memory than the float32 scan and is typically faster; NumPy converts
+    float16 in software, so float16 saves memory but scores more slowly.
+    """
+
+    PRECISIONS = ("float16", "int8")
+    _ROW_AXES = {"data": 0, "scales": 0}
+
+    def __init__(self, names, data, offsets, precision, scales=None, chunk=512):
+        """
+        Args:
+            names (list): Identity names
+            data (np.ndarray): (T, D) float16 or int8 templates
+            offsets (np.ndarray): Identity start rows (see Gallery)
+            precision (str): 'float16' or 'int8'
+            scales (np.ndarray): (T,) float32 per-vector scales (int8 only)
+            chunk (int): Rows upcast per step during scoring
+        """
+        super().__init__(names, None, offsets)
+        self.data = data
+        self.precision = precision
+        self.scales = scales
+        self.chunk = chunk
+
+    @classmethod
+    def from_gallery(cls, gallery, precision="float16"):
+        """
+        Quantize the templates of an exact Gallery.
+
+        Args:
+            gallery (Gallery): Exact gallery
+            precision (str): 'float16' or 'int8'
+
+        Returns:
+            QuantizedGallery: Reduced-precision gallery
+        """
+        if precision not in cls.PRECISIONS:
+            raise ValueError(f"Unknown precision: {precision}")
+        data, scales = _quantize(gallery.templates, precision)
+        return cls(gallery.names, data, gallery.offsets, precision, scales)
+
+    @property
+    def nbytes(self):
+        """Resident bytes of templates (and scales)."""
+        return self.data.nbytes + (self.scales.nbytes if self.scales is not None else 0)
+
+    def _encode_rows(self, templates):
+        data, scales = _quantize(templates, self.precision)
+        return {"data": data, "scales": scales}
+
+    def templates_of(self, name):
+        i = self._index[name]
+        rows = slice(self.offsets[i], self.offsets[i + 1])
+        block = self.data[rows].astype(np.float32)
+        if self.scales is not None:
+            block *= self.scales[rows, None]
+        return block
+
+    def _template_scores(self, queries):
+        out = np.empty((len(queries), len(self.data)), dtype=np.float32)
+        buffer = np.empty((min(self.chunk, len(self.data)), self.data.shape[1]), dtype=np.float32)
+        for start in range(0, len(self.data), self.chunk):
+            block = self.data[start:start + self.chunk]
+            upcast = buffer[:len(block)]
+            np.copyto(upcast, block, casting="unsafe")
+            np.matmul(queries, upcast.T, out=out[:, start:start + len(block)])
+        if self.scales is not None:
+            out *= self.scales
+        return out
+
+
+def _quantize(templates, precision):
+    """(data, scales) of templates stored as float16 or per-vector int8."""
+    if precision == "float16":
+        return templates.astype(np.float16), None
+
+    # Symmetric per-vector int8: x ~= scale * q, q in [-127, 127]
+    max_abs = np.abs(templates).max(axis=1) if len(templates) else np.zeros(0)
+    scales = (np.maximum(max_abs, 1e-12) / 127.0).astype(np.float32)
+    data = np.clip(np.rint(templates / scales[:, None]), -127, 127).astype(np.int8)
+    return data, scales
+
+
+def count_templates(db):
+    """Number of templates in a {name: embedding(s)} database."""
+    return sum(len(np.atleast_2d(value)) for value in db.values())
+
+
+def as_gallery(db):
+    """
+    Accept either a Gallery or a {name: embedding} dict.
+
+    Passing a dict builds a temporary Gallery on every call; long-running
+    callers should build one with Gallery.from_db() and reuse it.
+    """
+    if isinstance(db, Gallery):
+        return db
+    return Gallery.from_db(db or {})
+
+
+def build_gallery(db, mode="exact", projection=None, **options):
+    """
+    Build the matching structure selected by GALLERY_MODE.
+
+    Args:
+        db (dict): {name: embedding(s)} pairs
+        mode (str): 'exact' (float32 matrix), 'float16', 'int8' (reduced
+                    precision), 'pq' (product-quantized) or 'binary'
+                    (Hamming prefilter + exact shortlist)
+        projection (PCAProjection): Optional fitted projection; templates are
+                                    stored projected and queries projected once
+        **options: Mode-specific options (e.g. quantizer, rerank for 'pq';
+                   bits, shortlist for 'binary')
+
+    Returns:
+        Gallery: Gallery or subclass with the same search interface
+    """
+    gallery = Gallery.from_db(db)
+    if projection is not None and gallery.num_templates:
+        gallery = Gallery(gallery.names, projection.transform(gallery.templates), gallery.offsets)
+    else:
+        projection = None
+
+    if mode == "exact":
+        pass
+    elif mode in QuantizedGallery.PRECISIONS:
+        gallery = QuantizedGallery.from_gallery(gallery, mode)
+    elif mode == "pq":
+        from src.pq import PQGallery
+        gallery = PQGallery.from_gallery(gallery, **options)
+    elif mode == "binary":
+        from src.binary_index import BinaryGallery
+        gallery = BinaryGallery.from_gallery(gallery, **options)
+    else:
+        raise ValueError(f"Unknown gallery mode: {mode}")
+
+    if projection is not None:
+        from src.pca import ProjectedGallery
+        gallery = ProjectedGallery(gallery, projection)
+    return gallery
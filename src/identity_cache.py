@@ -0,0 +1,123 @@
+# Identity Cache Module - Per-track identity to skip repeated recognition
+#
+# Once a tracked face has been confidently identified, embedding and
+# matching it again every few frames mostly re-confirms what we know. The
+# identity is kept per track instead: recognition for that track is
+# suspended apart from a low-rate re-verification, and the identity is
+# dropped as soon as the track is lost or its box jumps (a different face
+# may have taken over the track).
+
+import threading
+import time
+
+
+class TrackIdentity:
+    """Cached recognition result of one track."""
+
+    def __init__(self, name, face_sim, live_score, box, now):
+        self.name = name
+        self.face_sim = face_sim
+        self.live_score = live_score
+        self.box = box
+        self.verified_at = now
+
+    @property
+    def prediction(self):
+        return self.name, self.face_sim, self.live_score
+
+
+class IdentityCache:
+    """
+    Confident identities keyed by track id.
+
+    Thread-safe: the pipeline thread observes, looks up and stores while a
+    gallery change (watcher thread, enrollment job) clears the cache.
+    """
+
+    def __init__(self, reverify_after=2.0, max_jump=0.5, max_scale=1.5):
+        """
+        Args:
+            reverify_after (float): Seconds before a cached identity is re-checked
+            max_jump (float): Box centre shift between frames, in box widths,
+                              that drops the identity
+            max_scale (float): Box size change between frames that drops it
+        """
+        self.reverify_after = reverify_after
+        self.max_jump = max_jump
+        self.max_scale = max_scale
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.hits = 0           # Recognitions skipped
+        self.misses = 0         # Recognitions run (no identity, or re-verification)
+        self.invalidated = 0    # Identities dropped by box jumps or failed checks
+
+    def _jumped(self, old, new):
+        ox, oy, ow, oh = old
+        nx, ny, nw, nh = new
+        shift = ((nx + nw / 2 - ox - ow / 2) ** 2 + (ny + nh / 2 - oy - oh / 2) ** 2) ** 0.5
+        scale = max(nw * nh, 1) / max(ow * oh, 1)
+        return shift > self.max_jump * ow or not 1 / self.max_scale <= scale <= self.max_scale
+
+    def observe(self, track_id, box, lost=()):
+        """
+        Follow the boxes every frame: drop identities of lost tracks and of
+        tracks whose box jumped.
+
+        Args:
+            track_id: Track of this frame's face (or None)
+            box (tuple): Its box (x, y, w, h)
+            lost (list): Track ids the tracker dropped on this frame
+        """
+        with self._lock:
+            for lost_id in lost:
+                self._entries.pop(lost_id, None)
+            entry = self._entries.get(track_id)
+            if entry is None or box is None:
+                return
+            if self._jumped(entry.box, box):
+                self._entries.pop(track_id, None)
+                self.invalidated += 1
+            else:
+                entry.box = box
+
+    def lookup(self, track_id, now=None):
+        """
+        Cached identity of a track, unless it is due for re-verification.
+
+        Returns:
+            TrackIdentity or None: None means "run recognition"
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            entry = self._entries.get(track_id)
+            if entry is not None and now - entry.verified_at < self.reverify_after:
+                self.hits += 1
+                return entry
+            self.misses += 1
+            return None
+
+    def store(self, track_id, box, name, face_sim, live_score, confident, now=None):
+        """
+        Record a recognition result: a confident one (re)starts the cache for
+        the track, anything else drops it so recognition resumes every time.
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            if confident and track_id is not None:
+                self._entries[track_id] = TrackIdentity(name, face_sim, live_score, box, now)
+            elif self._entries.pop(track_id, None) is not None:
+                self.invalidated += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    @property
+    def hit_rate(self):
+        """Share of due recognitions answered from the cache."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def report(self):
+        return (f"{self.hit_rate:.0%} of recognitions served from track identities "
+                f"({self.hits} skipped, {self.misses} run, {self.invalidated} invalidated)")
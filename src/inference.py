@@ -0,0 +1,202 @@
+# Inference Module - Central micro-batching for the embedding model
+#
+# The live loop, every camera, punch and registration jobs and service
+# requests all need FaceNet embeddings. Running each crop as its own
+# batch-of-one forward pass wastes most of the model's throughput. All
+# callers instead queue crops with one InferenceScheduler; its thread forms a
+# batch of up to `max_batch` crops, waiting at most `max_wait` for the batch
+# to fill, runs a single forward pass and hands results back through futures.
+#
+# The wait is adaptive: while requests arrive one at a time (a single kiosk
+# with nobody else asking), a lone crop is run immediately instead of paying
+# max_wait for company that never comes. Crops that arrive while a forward
+# pass is running are batched together anyway.
+
+import atexit
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import Future
+
+import numpy as np
+
+
+class InferenceScheduler:
+    """
+    Queue of crops served by one batching thread, with batch size and
+    queueing delay metrics.
+    """
+
+    def __init__(self, infer, max_batch=16, max_wait=0.005, adaptive_wait=True):
+        """
+        Args:
+            infer (callable): List of crops -> array/list of results (same order)
+            max_batch (int): Crops per forward pass at most
+            max_wait (float): Seconds the oldest queued crop waits for a fuller batch
+            adaptive_wait (bool): Skip the wait while requests come one at a time
+        """
+        self.infer = infer
+        self.max_batch = max(1, int(max_batch))
+        self.max_wait = max_wait
+        self.adaptive_wait = adaptive_wait
+        self.batch_sizes = Counter()
+        self.delays = deque(maxlen=4096)  # Submit-to-batch-start per crop (seconds)
+        self.busy = 0.0                   # Seconds spent in forward passes
+        self._recent_batch = 1.0          # Moving average of batch sizes
+        self._pending = deque()           # (crop, future, submitted_at)
+        self._cond = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="inference", daemon=True)
+        self._thread.start()
+
+    def submit_many(self, crops):
+        """
+        Queue crops for embedding.
+
+        Returns:
+            list: One concurrent.futures.Future per crop
+        """
+        now = time.perf_counter()
+        futures = [Future() for _ in crops]
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Inference scheduler is closed")
+            self._pending.extend((crop, future, now) for crop, future in zip(crops, futures))
+            self._cond.notify()
+        return futures
+
+    def submit(self, crop):
+        """Queue one crop; returns its Future."""
+        return self.submit_many([crop])[0]
+
+    def run(self, crops):
+        """
+        Embed crops and wait for the results (blocking convenience).
+
+        Returns:
+            np.ndarray: One row per crop
+        """
+        if len(crops) == 0:
+            return np.asarray(self.infer([]))
+        return np.stack([future.result() for future in self.submit_many(crops)])
+
+    def _take_batch(self):
+        with self._cond:
+            while not self._pending and not self._closed:
+                self._cond.wait()
+            if not self._pending:
+                return None
+            wait = self.max_wait
+            if self.adaptive_wait and self._recent_batch < 1.1:
+                wait = 0.0  # Nobody to wait for lately
+            deadline = self._pending[0][2] + wait
+            while len(self._pending) < self.max_batch and not self._closed:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            return [self._pending.popleft() for _ in range(min(self.max_batch, len(self._pending)))]
+
+    def _run(self):
+        while True:
+            batch = self._take_batch()
+            if batch is None:
+                return
+            started = time.perf_counter()
+            try:
+                results = self.infer([crop for crop, _, _ in batch])
+            except Exception as e:
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                continue
+            self.busy += time.perf_counter() - started
+            self.batch_sizes[len(batch)] += 1
+            self._recent_batch = 0.8 * self._recent_batch + 0.2 * len(batch)
+            for (_, future, submitted), result in zip(batch, results):
+                self.delays.append(started - submitted)
+                future.set_result(result)
+
+    def close(self):
+        """Finish queued work and stop the batching thread."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join(timeout=5.0)
+
+    @property
+    def batches(self):
+        return sum(self.batch_sizes.values())
+
+    @property
+    def items(self):
+        return sum(size * count for size, count in self.batch_sizes.items())
+
+    @property
+    def mean_batch(self):
+        return self.items / self.batches if self.batches else 0.0
+
+    def delay_ms(self):
+        """Queueing delay over recent crops: (mean, p50, p95) in milliseconds."""
+        delays = np.array(self.delays)
+        if not len(delays):
+            return 0.0, 0.0, 0.0
+        return (float(delays.mean()) * 1000, float(np.percentile(delays, 50)) * 1000,
+                float(np.percentile(delays, 95)) * 1000)
+
+    def report(self):
+        """Printable summary lines."""
+        if not self.batches:
+            return []
+        mean, p50, p95 = self.delay_ms()
+        sizes = ", ".join(f"{size}x{count}" for size, count in sorted(self.batch_sizes.items()))
+        return [f"Inference: {self.items} crops in {self.batches} forward passes "
+                f"(mean batch {self.mean_batch:.1f}, {self.busy / self.items * 1000:.1f} ms/crop), "
+                f"queue delay mean {mean:.1f} ms, p50 {p50:.1f} ms, p95 {p95:.1f} ms",
+                f"  batch sizes: {sizes}"]
+
+
+_scheduler = None
+_settings = {"max_batch": 16, "max_wait": 0.005, "adaptive_wait": True}
+
+
+def configure_inference(max_batch, max_wait, adaptive_wait=True):
+    """
+    Set the shared scheduler's batching parameters (applied to a running
+    scheduler from its next batch on).
+    """
+    _settings.update(max_batch=max(1, int(max_batch)), max_wait=max_wait,
+                     adaptive_wait=adaptive_wait)
+    if _scheduler is not None:
+        with _scheduler._cond:
+            for name, value in _settings.items():
+                setattr(_scheduler, name, value)
+
+
+def get_scheduler():
+    """
+    Get the shared embedding scheduler, creating it on first use.
+
+    Returns:
+        InferenceScheduler: Scheduler running FaceNet batches
+    """
+    global _scheduler
+    if _scheduler is None:
+        from src.embedding_model import get_embeddings  # Loads the model
+        _scheduler = InferenceScheduler(get_embeddings, **_settings)
+        atexit.register(_scheduler.close)
+    return _scheduler
+
+
+def embed(faces):
+    """
+    FaceNet embeddings of several crops through the shared scheduler.
+
+    Returns:
+        np.ndarray: (N, 512) embedding matrix
+    """
+    return get_scheduler().run(faces)
+
+
+def inference_report():
+    """Summary lines of the shared scheduler ([] if it never ran)."""
+    return _scheduler.report() if _scheduler is not None else []
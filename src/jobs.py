@@ -0,0 +1,140 @@
+# Jobs Module - Background jobs fed by the live camera loop
+#
+# Punch verification and registration used to run inline in the key handler,
+# freezing the preview. The live loop now owns the camera and publishes every
+# frame (with its detection) to a FrameFeed; long-running flows run as
+# BackgroundJobs that consume the feed and report progress for the overlay.
+
+import threading
+import time
+from collections import namedtuple
+
+
+# One published frame: the live loop has already run detection and tracking.
+# `detected` is False when the face was re-cropped at the last detected box
+# instead of being found (and checked to be the only face) in this frame.
+FeedFrame = namedtuple(
+    "FeedFrame",
+    ["seq", "timestamp", "frame", "face", "box", "track_id", "temporal_score", "detected"],
+)
+
+
+class FrameFeed:
+    """
+    Latest-frame mailbox between the live loop (producer) and jobs (consumers).
+
+    Only the newest frame is kept: a slow consumer skips frames instead of
+    making the producer wait or buffering stale frames.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._latest = None
+        self.seq = 0
+        self.closed = False
+
+    def publish(self, frame, face, box, track_id=None, temporal_score=None, detected=True):
+        """Publish the current frame and its detection result."""
+        with self._cond:
+            self.seq += 1
+            self._latest = FeedFrame(self.seq, time.time(), frame, face, box,
+                                     track_id, temporal_score, detected)
+            self._cond.notify_all()
+
+    def latest(self):
+        """Most recently published frame, or None."""
+        with self._cond:
+            return self._latest
+
+    def wait_next(self, after_seq, timeout=None):
+        """
+        Wait for a frame newer than `after_seq`.
+
+        Args:
+            after_seq (int): Sequence number of the last frame consumed
+            timeout (float): Maximum seconds to wait (None = forever)
+
+        Returns:
+            tuple: (seq, FeedFrame) or (after_seq, None) on timeout/close
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: self.closed or self.seq > after_seq, timeout)
+            if self.seq > after_seq and self._latest is not None:
+                return self._latest.seq, self._latest
+            return after_seq, None
+
+    def close(self):
+        """Wake up all waiting consumers; no more frames will arrive."""
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+
+class BackgroundJob:
+    """
+    A flow (punch verification, registration) running on its own thread.
+
+    The job exposes a status line and a progress fraction that the live
+    loop draws on the overlay. Callers can request cancellation; the
+    running flow checks `cancelled` at convenient points.
+    """
+
+    def __init__(self, title, target, *args):
+        """
+        Args:
+            title (str): Short label shown on the overlay
+            target (callable): Function run on the background thread
+            *args: Arguments for `target`
+        """
+        self.title = title
+        self.status = f"{title}..."
+        self.level = "info"         # Banner level: 'info', 'warn' or 'ok'
+        self.progress = 0.0
+        self.cancelled = False
+        self.finished_at = None
+        self.error = None
+        self._thread = threading.Thread(target=self._run, args=(target, args),
+                                        name=f"job-{title}", daemon=True)
+
+    def _run(self, target, args):
+        try:
+            target(*args)
+        except Exception as e:
+            self.error = e
+            self.report(f"{self.title} failed: {e}", level="warn")
+            print(f"[-] {self.title} failed: {e}")
+        finally:
+            self.finished_at = time.time()
+
+    def start(self):
+        """Start the job thread and return self."""
+        self._thread.start()
+        return self
+
+    @property
+    def running(self):
+        """True while the job thread is alive."""
+        return self._thread.is_alive()
+
+    def report(self, status, progress=None, level=None):
+        """
+        Update the status shown on the overlay.
+
+        Args:
+            status (str): Status line
+            progress (float): Completion fraction 0.0 - 1.0 (unchanged if None)
+            level (str): Banner level (unchanged if None)
+        """
+        self.status = status
+        if progress is not None:
+            self.progress = max(0.0, min(1.0, progress))
+        if level is not None:
+            self.level = level
+
+    def cancel(self):
+        """Ask the job to stop at its next check."""
+        self.cancelled = True
+
+    def join(self, timeout=None):
+        """Wait for the job thread to finish."""
+        self._thread.join(timeout)
@@ -100,3 +100,178 @@ def liveness(face):
     except Exception as e:
         print(f"Liveness detection error: {e}")
         return 0.5  # Return neutral score on error
+
+
+# ============================================================================
+# TEMPORAL LIVENESS - Micro-motion across consecutive frames of a tracked face
+# ============================================================================
+#
+# A single still crop cannot tell a sharp printed photo from a live face. Live
+# faces show small non-rigid motion between frames (blinks, lip and skin
+# movement) while a photo or a screen held in front of the camera only moves
+# rigidly. We keep a ring buffer of aligned grayscale crops per track, remove
+# the rigid shift between consecutive crops with phase correlation, and keep
+# running statistics of the residual difference. Each new frame costs O(1)
+# work regardless of the window length.
+
+class _MotionBuffer:
+    """Ring buffer of aligned crops and residual-motion statistics for one track."""
+
+    def __init__(self, window, size):
+        self.crops = np.zeros((window, size, size), dtype=np.float32)
+        self.residuals = np.zeros(window, dtype=np.float64)
+        self.index = 0       # Next slot to write
+        self.count = 0       # Number of valid crops in the buffer
+        self.res_count = 0   # Number of residuals written in the window
+        self.res_sum = 0.0   # Running sum of residuals in the window
+        self.res_sq = 0.0    # Running sum of squared residuals in the window
+
+
+class TemporalLiveness:
+    """
+    Per-track micro-motion liveness scorer.
+
+    Call `update()` once per frame with the face crop of each tracked face; it
+    returns a temporal liveness score once enough frames have been seen, or
+    None while the buffer is still warming up.
+    """
+
+    def __init__(self, window=15, size=64, min_frames=4):
+        """
+        Args:
+            window (int): Number of recent crops kept per track
+            size (int): Side length crops are resized to before comparison
+            min_frames (int): Crops required before a score is produced
+        """
+        self.window = window
+        self.size = size
+        self.min_frames = max(2, min_frames)
+        self._buffers = {}
+        # Ignore a border band where the rigid-shift compensation wraps pixels
+        self._margin = max(2, size // 8)
+
+    def _prepare(self, face):
+        """Grayscale, resize and brightness-normalize a face crop."""
+        gray = cv2.cvtColor(face, cv2.COLOR_BGR2GRAY) if face.ndim == 3 else face
+        crop = cv2.resize(gray, (self.size, self.size), interpolation=cv2.INTER_AREA)
+        crop = crop.astype(np.float32)
+        # Zero-mean / unit-variance so lighting flicker is not mistaken for motion
+        return (crop - crop.mean()) / (crop.std() + 1e-6)
+
+    def update(self, track_id, face):
+        """
+        Add the current crop of a track and return its temporal score.
+
+        Args:
+            track_id: Key of the tracked face (e.g. FaceTracker id)
+            face (np.ndarray): Face image (BGR or grayscale)
+
+        Returns:
+            float or None: Temporal liveness score (0.0 - 1.0), or None if the
+                           track does not have enough frames yet
+        """
+        try:
+            crop = self._prepare(face)
+        except Exception as e:
+            print(f"Temporal liveness error: {e}")
+            return self.score(track_id)
+
+        buf = self._buffers.get(track_id)
+        if buf is None:
+            buf = _MotionBuffer(self.window, self.size)
+            self._buffers[track_id] = buf
+
+        if buf.count > 0:
+            prev = buf.crops[(buf.index - 1) % self.window]
+
+            # Remove rigid translation between frames, keep only local motion
+            (dx, dy), _ = cv2.phaseCorrelate(prev, crop)
+            shift = np.float32([[1, 0, -dx], [0, 1, -dy]])
+            aligned = cv2.warpAffine(crop, shift, (self.size, self.size),
+                                     borderMode=cv2.BORDER_REFLECT)
+
+            m = self._margin
+            residual = float(np.abs(aligned[m:-m, m:-m] - prev[m:-m, m:-m]).mean())
+
+            # Incremental window statistics: evict the oldest residual
+            # (the first crop's slot holds none until the buffer wraps)
+            if buf.res_count >= self.window:
+                old = buf.residuals[buf.index]
+                buf.res_sum -= old
+                buf.res_sq -= old * old
+            else:
+                buf.res_count += 1
+            buf.residuals[buf.index] = residual
+            buf.res_sum += residual
+            buf.res_sq += residual * residual
+
+        buf.crops[buf.index] = crop
+        buf.index = (buf.index + 1) % self.window
+        buf.count = min(buf.count + 1, self.window)
+
+        return self.score(track_id)
+
+    def score(self, track_id):
+        """
+        Temporal liveness score of a track from its current window.
+
+        Returns:
+            float or None: Score (0.0 - 1.0), or None if not enough frames
+        """
+        buf = self._buffers.get(track_id)
+        if buf is None or buf.count < self.min_frames:
+            return None
+
+        mean, std = self._window_stats(buf)
+
+        # Mean residual motion (units of normalized intensity)
+        if mean < 0.04:
+            motion_score = 0.2   # Frozen - printed photo or paused replay
+        elif mean < 0.08:
+            motion_score = 0.5
+        elif mean < 0.35:
+            motion_score = 0.95  # Natural micro-motion
+        else:
+            motion_score = 0.6   # Large motion - person moving, weak evidence
+
+        # Live micro-motion is irregular; a constant residual suggests noise only
+        variation = std / (mean + 1e-6)
+        if variation < 0.05:
+            variation_score = 0.4
+        elif variation < 0.15:
+            variation_score = 0.7
+        else:
+            variation_score = 0.9
+
+        return max(0.0, min(1.0, 0.75 * motion_score + 0.25 * variation_score))
+
+    @staticmethod
+    def _window_stats(buf):
+        """Mean and std of the residuals written in the window."""
+        n = buf.res_count
+        mean = buf.res_sum / n
+        return mean, np.sqrt(max(0.0, buf.res_sq / n - mean * mean))
+
+    def reset(self, track_id=None):
+        """Forget the buffer of one track, or of all tracks if None."""
+        if track_id is None:
+            self._buffers = {}
+        else:
+            self._buffers.pop(track_id, None)
+
+
+def fuse_liveness(static_score, temporal_score, temporal_weight=0.4):
+    """
+    Combine single-frame and temporal liveness into one score.
+
+    Args:
+        static_score (float): Score from `liveness()`
+        temporal_score (float or None): Score from `TemporalLiveness`
+        temporal_weight (float): Weight of the temporal component
+
+    Returns:
+        float: Fused liveness score (static score alone if no temporal score)
+    """
+    if temporal_score is None:
+        return static_score
+    return (1.0 - temporal_weight) * static_score + temporal_weight * temporal_score
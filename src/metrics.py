@@ -0,0 +1,89 @@
+# Metrics Module - Per-stage wall-clock and CPU time of the live loop
+#
+# Wall time says how long a stage made the frame wait; thread CPU time says
+# what it cost the box. Both are kept as running totals (for end-of-run
+# summaries) and as exponential moving averages (for decisions made online).
+
+import threading
+import time
+from contextlib import contextmanager
+
+
+class StageStats:
+    """
+    Wall and CPU time per named stage, per frame.
+    """
+
+    def __init__(self, alpha=0.1):
+        """
+        Args:
+            alpha (float): Weight of the newest sample in the moving averages
+        """
+        self.alpha = alpha
+        self.frames = 0
+        self.started = time.perf_counter()
+        self._totals = {}   # stage -> [calls, wall, cpu]
+        self._recent = {}   # stage -> moving-average wall seconds
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def measure(self, stage):
+        """Time the enclosed block as one call of `stage` (CPU of this thread)."""
+        wall, cpu = time.perf_counter(), time.thread_time()
+        try:
+            yield
+        finally:
+            self.add(stage, time.perf_counter() - wall, time.thread_time() - cpu)
+
+    def add(self, stage, wall, cpu=0.0):
+        """Record one call of a stage."""
+        with self._lock:
+            totals = self._totals.setdefault(stage, [0, 0.0, 0.0])
+            totals[0] += 1
+            totals[1] += wall
+            totals[2] += cpu
+            previous = self._recent.get(stage)
+            self._recent[stage] = wall if previous is None else previous + self.alpha * (wall - previous)
+
+    def frame_done(self):
+        """Count one processed frame."""
+        self.frames += 1
+
+    @property
+    def elapsed(self):
+        """Seconds since the stats were created."""
+        return time.perf_counter() - self.started
+
+    def total(self, stage):
+        """(calls, wall seconds, CPU seconds) of a stage so far."""
+        return tuple(self._totals.get(stage, (0, 0.0, 0.0)))
+
+    def latency(self, stage):
+        """Moving-average wall seconds per call of a stage (0.0 if never run)."""
+        return self._recent.get(stage, 0.0)
+
+    def cpu_per_frame(self, stage=None):
+        """Average CPU seconds per frame spent in one stage (or all stages)."""
+        if not self.frames:
+            return 0.0
+        if stage is None:
+            return sum(t[2] for t in self._totals.values()) / self.frames
+        return self._totals.get(stage, [0, 0.0, 0.0])[2] / self.frames
+
+    def summary(self):
+        """
+        One line per stage: calls, mean wall and CPU ms per call, CPU share.
+
+        Returns:
+            list: Printable lines
+        """
+        elapsed = self.elapsed
+        fps = self.frames / elapsed if elapsed > 0 else 0.0
+        total_cpu = sum(t[2] for t in self._totals.values())
+        lines = [f"{self.frames} frames in {elapsed:.1f}s ({fps:.1f} fps), "
+                 f"{self.cpu_per_frame() * 1000:.2f} ms CPU/frame in measured stages"]
+        for stage, (calls, wall, cpu) in sorted(self._totals.items()):
+            share = cpu / total_cpu if total_cpu > 0 else 0.0
+            lines.append(f"  {stage:<10} {calls:>7} calls  {wall / calls * 1000:8.2f} ms/call  "
+                         f"{cpu / calls * 1000:7.2f} ms CPU/call ({share:.0%} of CPU)")
+        return lines
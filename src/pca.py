@@ -0,0 +1,213 @@
+# PCA Module - Low-dimensional projection of face embeddings for matching
+#
+# FaceNet embeddings are 512-D, but most of their energy lies in far fewer
+# directions. A linear projection fitted on the enrolled gallery (or on a
+# reference set) maps every template to e.g. 128-D once, at gallery build
+# time; each query is projected once per search. Matching then reads 4x
+# less template memory per comparison.
+#
+# By default the projection keeps the top eigenvectors of the uncentered
+# second-moment matrix: the best rank-k approximation of the inner products.
+# Whitening (centered, unit variance per component) spreads identities further
+# apart. Either way, re-normalizing the projected vectors changes the score
+# scale - impostor similarities rise far more than genuine ones - so raw
+# projected scores cannot be compared with FACE_SIM_THRESHOLD. Every fitted
+# projection therefore also fits a monotone map from projected back to
+# original similarities on its training pairs, and ProjectedGallery reports
+# mapped scores: thresholds and final confidence keep their meaning.
+
+import os
+
+import numpy as np
+
+from src.gallery import Gallery, normalize
+
+
+class PCAProjection:
+    """
+    Linear projection D -> dim followed by L2 normalization.
+    """
+
+    def __init__(self, dim=128, whiten=False):
+        """
+        Args:
+            dim (int): Output dimension
+            whiten (bool): Center the data and scale each component to unit variance
+        """
+        self.dim = dim
+        self.whiten = whiten
+        self.mean = None        # (D,) subtracted before projecting
+        self.matrix = None      # (D, dim) projection
+        self.explained = None   # (dim,) fraction of energy per component
+        self.calibration = None  # (2, K) projected -> original similarity knots
+        self.num_train = 0
+
+    @property
+    def trained(self):
+        return self.matrix is not None
+
+    @property
+    def calibrated(self):
+        return self.calibration is not None
+
+    def fit(self, vectors, eps=1e-6, labels=None, num_pairs=20000, seed=0):
+        """
+        Fit the projection from eigenvectors of the (D, D) covariance, then
+        its score calibration (see _calibrate).
+
+        Args:
+            vectors (np.ndarray): (N, D) embeddings (N >= 2)
+            eps (float): Variance floor for whitening
+            labels (sequence): Identity of each vector, if known: same-identity
+                               pairs then calibrate the genuine score range
+            num_pairs (int): Random training pairs used for calibration
+            seed (int): Seed for the pair sample
+
+        Returns:
+            PCAProjection: self
+        """
+        x = normalize(np.atleast_2d(vectors)).astype(np.float64)
+        n, d = x.shape
+        if n < 2:
+            raise ValueError("PCA needs at least 2 training vectors")
+
+        mean = x.mean(axis=0) if self.whiten else np.zeros(d)
+        centered = x - mean
+        values, eigenvectors = np.linalg.eigh(centered.T @ centered / n)
+        values = np.maximum(values, 0.0)
+        total = max(values.sum(), 1e-12)
+        order = np.argsort(values)[::-1]
+        # Never keep more components than the data spans
+        k = min(self.dim, d, n - 1 if self.whiten else n)
+        values, basis = values[order[:k]], eigenvectors[:, order[:k]]
+
+        if self.whiten:
+            basis = basis / np.sqrt(values + eps)
+        self.dim = k
+        self.mean = mean.astype(np.float32)
+        self.matrix = np.ascontiguousarray(basis, dtype=np.float32)
+        self.explained = (values / total).astype(np.float32)
+        self.num_train = n
+        self._calibrate(x, labels, num_pairs, seed)
+        return self
+
+    def _calibrate(self, x, labels, num_pairs, seed, levels=257):
+        """
+        Fit the map from projected to original cosine similarity.
+
+        Random pairs of training vectors (mostly impostors), plus up to
+        `num_pairs` same-identity pairs when labels are known, are scored in
+        both spaces and matched quantile by quantile. The map is monotone, so
+        rankings are unchanged, and a projected score passes a threshold as
+        often as the original score of the same pair would.
+        """
+        rng = np.random.default_rng(seed)
+        n = len(x)
+        first = rng.integers(n, size=num_pairs)
+        second = rng.integers(n - 1, size=num_pairs)
+        second += second >= first  # Never a vector with itself
+        if labels is not None:
+            labels = np.asarray(labels)
+            same = [(i, j) for group in _groups(labels) for k, i in enumerate(group)
+                    for j in group[k + 1:]]
+            if len(same) > num_pairs:
+                same = [same[k] for k in rng.choice(len(same), num_pairs, replace=False)]
+            if same:
+                first = np.concatenate([first, [i for i, _ in same]])
+                second = np.concatenate([second, [j for _, j in same]])
+
+        projected = self.transform(x)
+        original = np.einsum("ij,ij->i", x[first], x[second])
+        mapped = np.einsum("ij,ij->i", projected[first], projected[second])
+        q = np.linspace(0.0, 1.0, levels)
+        # Pinned at +-1 so scores beyond the training range still map monotonically
+        self.calibration = np.stack([
+            np.concatenate([[-1.0], np.clip(np.quantile(mapped, q), -1.0, 1.0), [1.0]]),
+            np.concatenate([[-1.0], np.clip(np.quantile(original, q), -1.0, 1.0), [1.0]]),
+        ]).astype(np.float32)
+
+    def calibrate(self, scores):
+        """
+        Map projected cosine similarities to the original similarity scale.
+
+        Args:
+            scores (np.ndarray): Similarities between projected vectors
+
+        Returns:
+            np.ndarray: Similarities comparable with FACE_SIM_THRESHOLD
+        """
+        if self.calibration is None:
+            raise ValueError("PCA projection has no score calibration - refit it")
+        return np.interp(scores, self.calibration[0], self.calibration[1]).astype(np.float32)
+
+    def transform(self, vectors):
+        """
+        Project embeddings.
+
+        Args:
+            vectors (np.ndarray): (D,) or (N, D) embeddings
+
+        Returns:
+            np.ndarray: (dim,) or (N, dim) unit-norm float32 projections
+        """
+        x = normalize(vectors)
+        return normalize((x - self.mean) @ self.matrix)
+
+    def save(self, path):
+        """Save the projection to an .npz file."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        np.savez(path, mean=self.mean, matrix=self.matrix, explained=self.explained,
+                 whiten=self.whiten, num_train=self.num_train, calibration=self.calibration)
+
+    @classmethod
+    def load(cls, path):
+        """Load a projection saved with save()."""
+        data = np.load(path)
+        projection = cls(data["matrix"].shape[1], bool(data["whiten"]))
+        projection.mean = data["mean"]
+        projection.matrix = data["matrix"]
+        projection.explained = data["explained"]
+        projection.num_train = int(data["num_train"])
+        # Files saved before calibration existed carry none (refit them)
+        if "calibration" in data.files and data["calibration"].ndim == 2:
+            projection.calibration = data["calibration"]
+        return projection
+
+
+class ProjectedGallery(Gallery):
+    """
+    Gallery whose templates live in the projected space.
+
+    Wraps any gallery (exact, reduced-precision, PQ) built from projected
+    templates; queries are projected once, then searched by the inner gallery.
+    Scores are reported on the original similarity scale (see calibrate).
+    """
+
+    def __init__(self, inner, projection):
+        """
+        Args:
+            inner (Gallery): Gallery over projected templates
+            projection (PCAProjection): Projection used to build `inner`
+        """
+        super().__init__(inner.names, inner.templates, inner.offsets)
+        self.inner = inner
+        self.projection = projection
+
+    def templates_of(self, name):
+        return self.inner.templates_of(name)
+
+    def updated(self, upserts, removals=()):
+        projected = {name: self.projection.transform(np.atleast_2d(value))
+                     for name, value in upserts.items()}
+        return ProjectedGallery(self.inner.updated(projected, removals), self.projection)
+
+    def scores_batch(self, embeddings):
+        queries = self.projection.transform(np.atleast_2d(embeddings))
+        return self.projection.calibrate(self.inner.scores_batch(queries))
+
+
+def _groups(labels):
+    """Indices of each label that occurs more than once."""
+    order = np.argsort(labels, kind="stable")
+    _, starts, counts = np.unique(labels[order], return_index=True, return_counts=True)
+    return [order[start:start + count].tolist() for start, count in zip(starts, counts) if count > 1]
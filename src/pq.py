@@ -0,0 +1,364 @@
+# PQ Module - Product-quantized gallery for very large sites
+#
+# A 512-D float32 template costs 2 KB; a million multi-template identities
+# won't fit comfortably in kiosk RAM. Product quantization splits each vector
+# into M sub-vectors and stores, per sub-vector, the index of the nearest of K
+# learned centroids: with M=32, K=256 a template becomes 32 bytes (64x smaller).
+#
+# Queries are scored by asymmetric distance computation (ADC): the query is
+# kept in full precision, a (M, K) lookup table of query-centroid inner
+# products is built once, and each template's score is the sum of M table
+# lookups. The top candidate identities are then re-ranked with their exact
+# templates, which may live in a memory-mapped file instead of RAM.
+
+import io
+import os
+
+import numpy as np
+
+from src.gallery import Gallery, normalize
+
+
+def _kmeans(points, k, iterations, rng):
+    """Euclidean k-means (Lloyd) returning (k, d) centroids."""
+    centroids = points[rng.choice(len(points), size=k, replace=False)].copy()
+    for _ in range(iterations):
+        # ||x - c||^2 = ||x||^2 - 2 x.c + ||c||^2 (||x||^2 is constant per row)
+        dist = (centroids ** 2).sum(axis=1) - 2.0 * points @ centroids.T
+        assign = np.argmin(dist, axis=1)
+        counts = np.bincount(assign, minlength=k)
+        sums = np.stack([np.bincount(assign, weights=points[:, d], minlength=k)
+                         for d in range(points.shape[1])], axis=1)
+        filled = counts > 0
+        centroids[filled] = sums[filled] / counts[filled, None]
+    return centroids
+
+
+class ProductQuantizer:
+    """
+    Product quantizer with M subspaces of K centroids each (K <= 256, uint8 codes).
+    """
+
+    def __init__(self, num_subspaces=32, num_centroids=256):
+        """
+        Args:
+            num_subspaces (int): Number of sub-vectors M (must divide the dimension)
+            num_centroids (int): Centroids per subspace K (<= 256)
+        """
+        if num_centroids > 256:
+            raise ValueError("num_centroids must be <= 256 for uint8 codes")
+        self.num_subspaces = num_subspaces
+        self.num_centroids = num_centroids
+        self.codebooks = None   # (M, K, D/M) float32
+
+    @property
+    def trained(self):
+        return self.codebooks is not None
+
+    def fit(self, vectors, iterations=15, max_train=65536, seed=0):
+        """
+        Learn the sub-vector codebooks.
+
+        Args:
+            vectors (np.ndarray): (N, D) training vectors (unit norm)
+            iterations (int): k-means iterations per subspace
+            max_train (int): Maximum number of training vectors sampled
+            seed (int): Random seed
+
+        Returns:
+            ProductQuantizer: self
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        n, dim = vectors.shape
+        if dim % self.num_subspaces:
+            raise ValueError(f"Dimension {dim} not divisible by {self.num_subspaces} subspaces")
+
+        rng = np.random.default_rng(seed)
+        if n > max_train:
+            vectors = vectors[rng.choice(n, size=max_train, replace=False)]
+            n = max_train
+
+        k = min(self.num_centroids, n)
+        sub = dim // self.num_subspaces
+        self.num_centroids = k
+        self.codebooks = np.stack([
+            _kmeans(vectors[:, m * sub:(m + 1) * sub], k, iterations, rng)
+            for m in range(self.num_subspaces)
+        ]).astype(np.float32)
+        return self
+
+    def encode(self, vectors, chunk=65536):
+        """
+        Quantize vectors to PQ codes.
+
+        Args:
+            vectors (np.ndarray): (N, D) vectors
+            chunk (int): Rows encoded at a time (bounds temporary memory)
+
+        Returns:
+            np.ndarray: (N, M) uint8 codes
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        sub = self.codebooks.shape[2]
+        codes = np.empty((len(vectors), self.num_subspaces), dtype=np.uint8)
+        sq_norms = (self.codebooks ** 2).sum(axis=2)  # (M, K)
+        for start in range(0, len(vectors), chunk):
+            block = vectors[start:start + chunk]
+            for m in range(self.num_subspaces):
+                part = block[:, m * sub:(m + 1) * sub]
+                dist = sq_norms[m] - 2.0 * part @ self.codebooks[m].T
+                codes[start:start + chunk, m] = np.argmin(dist, axis=1)
+        return codes
+
+    def decode(self, codes):
+        """Reconstruct approximate (N, D) vectors from codes."""
+        parts = [self.codebooks[m][codes[:, m]] for m in range(self.num_subspaces)]
+        return np.concatenate(parts, axis=1)
+
+    def lookup_tables(self, queries):
+        """
+        ADC tables of query/centroid inner products.
+
+        Args:
+            queries (np.ndarray): (Q, D) query vectors
+
+        Returns:
+            np.ndarray: (Q, M, K) inner products
+        """
+        sub = self.codebooks.shape[2]
+        q = np.asarray(queries, dtype=np.float32).reshape(len(queries), self.num_subspaces, sub)
+        return np.einsum("qms,mks->qmk", q, self.codebooks)
+
+    def adc_scores(self, codes, tables):
+        """
+        Approximate inner products between queries and encoded vectors.
+
+        Args:
+            codes (np.ndarray): (N, M) uint8 codes
+            tables (np.ndarray): (Q, M, K) lookup tables
+
+        Returns:
+            np.ndarray: (Q, N) approximate scores
+        """
+        scores = np.zeros((len(tables), len(codes)), dtype=np.float32)
+        for m in range(self.num_subspaces):
+            # One gather per subspace: memory stays O(Q * N)
+            scores += tables[:, m, :][:, codes[:, m]]
+        return scores
+
+    def save(self, path):
+        """Save the codebooks to an .npz file."""
+        np.savez(path, codebooks=self.codebooks)
+
+    @classmethod
+    def load(cls, path):
+        """Load codebooks saved with save()."""
+        codebooks = np.load(path)["codebooks"]
+        pq = cls(codebooks.shape[0], codebooks.shape[1])
+        pq.codebooks = codebooks
+        return pq
+
+
+class PQGallery(Gallery):
+    """
+    Gallery storing PQ codes instead of float templates.
+
+    Scoring: ADC approximate scores -> per-identity max -> exact re-ranking of
+    the `rerank` best identities (if exact templates are available).
+    Same search interface as Gallery.
+
+    Exact templates are either held in RAM or memory-mapped from an .npy
+    file. A mapped file is append-only between full builds: `rows` gives the
+    file row of every template, updates append the new templates and drop
+    the rows of removed ones, and the file is compacted once most of it is
+    dead. Galleries still mapping the file keep seeing their own rows.
+    """
+
+    _ROW_AXES = {"codes": 0, "templates": 0, "rows": 0}
+
+    def __init__(self, names, codes, offsets, quantizer, exact_templates=None, rerank=50,
+                 rows=None, exact_path=None):
+        """
+        Args:
+            names (list): Identity names
+            codes (np.ndarray): (T, M) uint8 PQ codes grouped by identity
+            offsets (np.ndarray): Identity start rows (see Gallery)
+            quantizer (ProductQuantizer): Trained quantizer used for `codes`
+            exact_templates (np.ndarray): Optional unit-norm templates for
+                                          re-ranking: (T, D) in RAM, or with
+                                          `rows` the memory-mapped file
+            rerank (int): Identities re-scored exactly per query (0 = off)
+            rows (np.ndarray): (T,) file row of each template (mapped file only)
+            exact_path (str): Path of the mapped file (mapped file only)
+        """
+        super().__init__(names, exact_templates if rows is None else None, offsets)
+        self.codes = codes
+        self.quantizer = quantizer
+        self.rerank = rerank
+        self.rows = rows
+        self.exact_file = exact_templates if rows is not None else None
+        self.exact_path = exact_path
+
+    @classmethod
+    def from_gallery(cls, gallery, quantizer=None, num_subspaces=32, num_centroids=256,
+                     rerank=50, keep_exact=True, exact_path=None):
+        """
+        Compress an exact Gallery.
+
+        Args:
+            gallery (Gallery): Exact gallery
+            quantizer (ProductQuantizer): Trained quantizer (trained on the
+                                          gallery templates if None)
+            num_subspaces (int): M, when training a new quantizer
+            num_centroids (int): K, when training a new quantizer
+            rerank (int): Identities re-scored exactly per query
+            keep_exact (bool): Keep the exact templates for re-ranking
+            exact_path (str): If set, exact templates are written to this .npy
+                              file and memory-mapped instead of kept in RAM
+
+        Returns:
+            PQGallery: Compressed gallery
+        """
+        if quantizer is None:
+            quantizer = ProductQuantizer(num_subspaces, num_centroids)
+        if not quantizer.trained and gallery.num_templates:
+            quantizer.fit(gallery.templates)
+        if gallery.num_templates:
+            codes = quantizer.encode(gallery.templates)
+        else:
+            codes = np.zeros((0, quantizer.num_subspaces), dtype=np.uint8)
+        exact = gallery.templates if keep_exact else None
+        if exact is not None and exact_path and gallery.num_templates:
+            _write_exact(exact_path, lambda out: np.copyto(out, exact), exact.shape)
+            rows = np.arange(len(exact), dtype=np.int64)
+            return cls(gallery.names, codes, gallery.offsets, quantizer,
+                       np.load(exact_path, mmap_mode="r"), rerank, rows, exact_path)
+        return cls(gallery.names, codes, gallery.offsets, quantizer, exact, rerank)
+
+    def _encode_rows(self, templates):
+        # New identities use the existing codebooks
+        encoded = {"codes": self.quantizer.encode(templates)}
+        if self.rows is not None:
+            encoded["rows"] = _append_exact(self.exact_path, templates)
+        elif self.templates is not None:
+            encoded["templates"] = templates
+        return encoded
+
+    def updated(self, upserts, removals=()):
+        clone = super().updated(upserts, removals)
+        if self.rows is None:
+            return clone
+
+        # Map the grown file; rewrite it once less than half of it is live
+        clone.exact_file = np.load(self.exact_path, mmap_mode="r")
+        if len(clone.exact_file) > 2 * max(len(clone.rows), 1024):
+            source, rows = clone.exact_file, clone.rows
+
+            def copy_live(out, chunk=4096):
+                for start in range(0, len(rows), chunk):
+                    out[start:start + chunk] = source[rows[start:start + chunk]]
+
+            _write_exact(self.exact_path, copy_live, (len(rows), source.shape[1]))
+            clone.rows = np.arange(len(rows), dtype=np.int64)
+            clone.exact_file = np.load(self.exact_path, mmap_mode="r")
+        return clone
+
+    @property
+    def has_exact(self):
+        """True if exact templates are available for re-ranking."""
+        return self.rows is not None or self.templates is not None
+
+    def _exact_block(self, i):
+        """(k, D) exact templates of identity i."""
+        start, end = self.offsets[i], self.offsets[i + 1]
+        if self.rows is not None:
+            return self.exact_file[self.rows[start:end]]
+        return np.asarray(self.templates[start:end])
+
+    def templates_of(self, name):
+        i = self._index[name]
+        if self.has_exact:
+            return self._exact_block(i)
+        return self.quantizer.decode(self.codes[self.offsets[i]:self.offsets[i + 1]])
+
+    @property
+    def nbytes(self):
+        """Resident bytes of the compressed codes (excluding exact templates)."""
+        return self.codes.nbytes + self.quantizer.codebooks.nbytes
+
+    def scores_batch(self, embeddings):
+        queries = normalize(np.atleast_2d(embeddings))
+        if len(self) == 0:
+            return np.zeros((len(queries), 0), dtype=np.float32)
+
+        tables = self.quantizer.lookup_tables(queries)
+        approx = self.quantizer.adc_scores(self.codes, tables)
+        scores = np.maximum.reduceat(approx, self.offsets[:-1], axis=1)
+
+        if not self.has_exact or self.rerank <= 0:
+            return scores
+
+        # Exact re-ranking of the best candidates only. Other identities keep
+        # their ADC estimate, capped so they never outrank a verified candidate.
+        r = min(self.rerank, len(self))
+        for row, query in enumerate(queries):
+            candidates = np.argpartition(-scores[row], r - 1)[:r]
+            exact = np.array([np.max(self._exact_block(i) @ query) for i in candidates],
+                             dtype=np.float32)
+            np.minimum(scores[row], exact.min(), out=scores[row])
+            scores[row, candidates] = exact
+        return scores
+
+
+def _write_exact(path, fill, shape):
+    """
+    Write a (T, D) float32 .npy file through `fill(out)` on a writable
+    mapping, beside the target and renamed over it: galleries still mapping
+    the old file keep reading the old inode instead of a truncated one.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    out = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=np.float32, shape=shape)
+    fill(out)
+    out.flush()
+    del out
+    os.replace(tmp_path, path)
+
+
+def _append_exact(path, templates):
+    """
+    Append rows to a float32 .npy file in place and grow the shape in its
+    header. Rows already in the file (mapped by other galleries) are not
+    touched; NumPy pads .npy headers so the row count can grow in place.
+
+    Returns:
+        np.ndarray: File rows of the appended templates
+    """
+    templates = np.ascontiguousarray(templates, dtype=np.float32)
+    with open(path, "r+b") as f:
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+        header_size = f.tell()
+        if fortran_order or dtype != np.float32 or shape[1:] != templates.shape[1:]:
+            raise ValueError(f"{path} does not hold float32 rows of this dimension")
+
+        header = io.BytesIO()
+        fields = {"descr": np.lib.format.dtype_to_descr(dtype), "fortran_order": False,
+                  "shape": (shape[0] + len(templates), templates.shape[1])}
+        if version == (1, 0):
+            np.lib.format.write_array_header_1_0(header, fields)
+        else:
+            np.lib.format.write_array_header_2_0(header, fields)
+        if header.tell() != header_size:
+            raise ValueError(f"{path}: .npy header cannot grow in place")
+
+        # Rows past the header's count are leftovers of an interrupted append
+        f.seek(header_size + shape[0] * templates.shape[1] * 4)
+        f.write(templates.tobytes())
+        f.flush()
+        f.seek(0)
+        f.write(header.getvalue())
+    return np.arange(shape[0], shape[0] + len(templates), dtype=np.int64)
@@ -7,10 +7,170 @@
 # SOLUTION: Collect embeddings from multiple frames (5-7), check if majority
 # frames match the same identity with high confidence. This provides robustness
 # against single-frame spoofing or transient false matches.
+#
+# Matching goes through src.gallery.Gallery: identities may hold several
+# templates and are scored with one matrix product + per-identity max.
 
-from scipy.spatial.distance import cosine
 from collections import Counter
 
+from src.gallery import as_gallery
+
+
+def _best_match(embedding, gallery):
+    """
+    Closest identity, clamped like the original linear scan (best_score
+    starts at 0.0, so non-positive similarities never name anyone).
+    """
+    name, score = gallery.best(embedding)
+    if name is None or score <= 0.0:
+        return None, 0.0
+    return name, score
+
+
+def meets_consensus(votes, total_frames, consensus_threshold):
+    """
+    True if `votes` of `total_frames` frames reach the consensus threshold.
+
+    The original batch rule (vote share >= consensus_threshold, as floats),
+    shared by SequentialConsensus and recognize_consensus so the two always
+    decide alike.
+    """
+    if total_frames <= 0:
+        return False
+    return votes / total_frames >= consensus_threshold
+
+
+class SequentialConsensus:
+    """
+    Incremental consensus vote over a fixed number of frames.
+    
+    Gives exactly the same accept/reject decision as counting votes after all
+    `total_frames` frames, but reports as soon as the outcome can no longer
+    change: either the leading identity already has enough votes and nobody
+    can overtake it, or no identity can still reach the required vote count.
+    
+    Decision rule (after all frames): at least `min_total_votes` frames must
+    match some identity, and the most common identity wins if its share of
+    all frames reaches consensus_threshold (see meets_consensus). Ties go to
+    the identity voted for first.
+    """
+    
+    def __init__(self, total_frames, consensus_threshold, min_total_votes=1):
+        """
+        Args:
+            total_frames (int): Frames the decision is defined over
+            consensus_threshold (float): Fraction of frames that must agree
+            min_total_votes (int): Minimum frames matching any identity
+        """
+        self.total_frames = total_frames
+        self.consensus_threshold = consensus_threshold
+        self.min_total_votes = min_total_votes
+        self.votes = Counter()   # Insertion order = first-vote order (tie-break)
+        self.frames = 0
+        
+        # Smallest vote count for the winner (same comparison as the batch
+        # decision, so rounding cannot change the outcome)
+        self.required_votes = total_frames + 1
+        for count in range(1, total_frames + 1):
+            if meets_consensus(count, total_frames, consensus_threshold):
+                self.required_votes = count
+                break
+    
+    @property
+    def remaining(self):
+        """Frames still to come before the full decision."""
+        return max(0, self.total_frames - self.frames)
+    
+    def add(self, name):
+        """
+        Record one frame.
+        
+        Args:
+            name (str or None): Identity voted for, or None for no match
+        """
+        self.frames += 1
+        if name is not None:
+            self.votes[name] += 1
+    
+    def leader(self):
+        """
+        Current leading identity.
+        
+        Returns:
+            tuple: (name, vote_count) or (None, 0) if there are no votes
+        """
+        if not self.votes:
+            return None, 0
+        return self.votes.most_common(1)[0]
+    
+    @property
+    def total_votes(self):
+        """Frames that matched any identity so far."""
+        return sum(self.votes.values())
+    
+    @property
+    def consensus_score(self):
+        """Fraction of all frames supporting the current leader."""
+        _, count = self.leader()
+        return count / self.total_frames if self.total_frames else 0.0
+    
+    @property
+    def decided(self):
+        """True once more frames cannot change the decision."""
+        if self.remaining == 0:
+            return True
+        return self._certain_winner() is not None or self._impossible()
+    
+    def result(self):
+        """
+        Decision from the votes so far.
+        
+        Returns:
+            str or None: Accepted identity, or None if rejected (or not
+                         decided yet)
+        """
+        winner = self._certain_winner()
+        if winner is not None:
+            return winner
+        if self.remaining > 0:
+            return None
+        
+        # All frames in: plain batch decision
+        name, count = self.leader()
+        if (name is not None and count >= self.required_votes
+                and self.total_votes >= self.min_total_votes):
+            return name
+        return None
+    
+    def _certain_winner(self):
+        """Leader that has enough votes and can no longer be overtaken."""
+        name, count = self.leader()
+        if name is None or count < self.required_votes:
+            return None
+        if self.total_votes < self.min_total_votes:
+            return None
+        
+        order = list(self.votes)
+        for other, other_count in self.votes.items():
+            if other == name:
+                continue
+            reachable = other_count + self.remaining
+            # A tie would go to whichever identity was voted for first
+            if reachable > count or (reachable == count and order.index(other) < order.index(name)):
+                return None
+        
+        # An identity not voted for yet can only tie, and loses the tie
+        if self.remaining > count:
+            return None
+        return name
+    
+    def _impossible(self):
+        """True if no identity (voted or not) can still be accepted."""
+        if self.total_votes + self.remaining < self.min_total_votes:
+            return True
+        best_reachable = max(self.votes.values(), default=0) + self.remaining
+        return best_reachable < self.required_votes
+
 
 def recognize_single(embedding, db, threshold=0.75):
     """
@@ -18,26 +178,19 @@ def recognize_single(embedding, db, threshold=0.75):
     
     Args:
         embedding (np.ndarray): Query face embedding
-        db (dict): Database of {name: embedding} pairs
+        db (Gallery or dict): Gallery, or database of {name: embedding(s)} pairs
         threshold (float): Minimum similarity required for match
         
     Returns:
         tuple: (best_match_name, similarity_score)
                Returns (None, similarity_score) if no match exceeds threshold
     """
-    best_name = None
-    best_score = 0.0
-    
-    if not db:
+    gallery = as_gallery(db)
+    if len(gallery) == 0:
         return None, 0.0
     
-    for name, db_embedding in db.items():
-        # Calculate cosine similarity (1 - distance)
-        similarity = 1 - cosine(embedding, db_embedding)
-        
-        if similarity > best_score:
-            best_score = similarity
-            best_name = name
+    # Cosine similarity against every template, best template per identity
+    best_name, best_score = _best_match(embedding, gallery)
     
     # Only return a match if it exceeds the threshold
     # This prevents false positives by requiring high confidence
@@ -47,7 +200,34 @@ def recognize_single(embedding, db, threshold=0.75):
         return None, best_score
 
 
-def recognize_consensus(embeddings_list, db, threshold=0.75, consensus_threshold=0.60):
+def recognize_batch(embeddings, db, threshold=0.75):
+    """
+    Single-frame recognition of several faces with one gallery call.
+
+    Same result per face as recognize_single, but all queries are scored in
+    one batched matrix product (e.g. faces pooled from several cameras).
+
+    Args:
+        embeddings (np.ndarray): (n, D) query embeddings
+        db (Gallery or dict): Gallery, or database of {name: embedding(s)} pairs
+        threshold (float): Minimum similarity required for match
+
+    Returns:
+        list: (name or None, similarity_score) per query
+    """
+    gallery = as_gallery(db)
+    if len(embeddings) == 0:
+        return []
+    results = []
+    for name, score in gallery.best_batch(embeddings):
+        if name is None or score <= 0.0:
+            name, score = None, 0.0
+        results.append((name, score) if score >= threshold else (None, score))
+    return results
+
+
+def recognize_consensus(embeddings_list, db, threshold=0.75, consensus_threshold=0.60,
+                        early_exit=False):
     """
     Multi-frame consensus recognition.
     
@@ -57,9 +237,13 @@ def recognize_consensus(embeddings_list, db, threshold=0.75, consensus_threshold
     
     Args:
         embeddings_list (list): List of embeddings from consecutive frames
-        db (dict): Database of {name: embedding} pairs
+        db (Gallery or dict): Gallery, or database of {name: embedding(s)} pairs
         threshold (float): Minimum similarity per frame
         consensus_threshold (float): Fraction of frames that must agree (0.6 = 60%)
+        early_exit (bool): Stop evaluating frames once the decision can no longer
+                           change. The accepted identity is the same as with a
+                           full pass; frame_matches and avg_similarity then only
+                           cover the frames actually evaluated.
         
     Returns:
         tuple: (final_name, avg_similarity, consensus_score, frame_matches)
@@ -68,24 +252,18 @@ def recognize_consensus(embeddings_list, db, threshold=0.75, consensus_threshold
                consensus_score: Fraction of frames supporting final decision (0.0-1.0)
                frame_matches: List of (name, similarity) for each frame
     """
-    if not embeddings_list or not db:
+    gallery = as_gallery(db)
+    if not embeddings_list or len(gallery) == 0:
         return None, 0.0, 0.0, []
     
     frame_matches = []
     identity_votes = []  # Collect identities that pass threshold
     similarities = []    # Collect all similarity scores for averaging
+    consensus = SequentialConsensus(len(embeddings_list), consensus_threshold)
     
     # Analyze each frame
     for emb in embeddings_list:
-        best_name = None
-        best_score = 0.0
-        
-        for name, db_embedding in db.items():
-            similarity = 1 - cosine(emb, db_embedding)
-            
-            if similarity > best_score:
-                best_score = similarity
-                best_name = name
+        best_name, best_score = _best_match(emb, gallery)
         
         frame_matches.append((best_name, best_score))
         similarities.append(best_score)
@@ -93,6 +271,12 @@ def recognize_consensus(embeddings_list, db, threshold=0.75, consensus_threshold
         # Vote for identity only if it exceeds threshold
         if best_score >= threshold:
             identity_votes.append(best_name)
+            consensus.add(best_name)
+        else:
+            consensus.add(None)
+        
+        if early_exit and consensus.decided:
+            break
     
     # Calculate consensus: Did majority of frames vote for same identity?
     if not identity_votes:
@@ -109,7 +293,7 @@ def recognize_consensus(embeddings_list, db, threshold=0.75, consensus_threshold
     avg_similarity = sum(similarities) / len(similarities)
     
     # Require >= consensus_threshold (e.g., 60% of frames must agree)
-    if consensus_score >= consensus_threshold:
+    if meets_consensus(vote_count, len(embeddings_list), consensus_threshold):
         return top_identity, avg_similarity, consensus_score, frame_matches
     else:
         # Even though some frames matched, consensus wasn't strong enough
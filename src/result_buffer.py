@@ -0,0 +1,84 @@
+# Result Buffer Module - Time-stamped ring buffer of recent per-frame analysis
+#
+# The live loop already detects faces and computes embeddings/liveness; keeping
+# its recent results lets a punch decide immediately from what was just seen
+# instead of capturing fresh frames from scratch.
+
+import threading
+import time
+from collections import deque, namedtuple
+
+
+# One analysed frame: when it was seen, which track, where, and what we found.
+# `detected` is False for a crop re-cut at the last detected box (no detection
+# on that frame, so nothing checked it is still the only face).
+FrameResult = namedtuple(
+    "FrameResult",
+    ["timestamp", "track_id", "box", "embedding", "liveness", "detected"],
+)
+
+
+class RecentResults:
+    """
+    Thread-safe ring buffer of the most recent FrameResults.
+
+    Old entries fall off automatically once `maxlen` results are stored;
+    `fresh()` additionally filters by age so stale results are never reused.
+    """
+
+    def __init__(self, maxlen=30):
+        """
+        Args:
+            maxlen (int): Maximum number of results kept
+        """
+        self._results = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+
+    def add(self, track_id, box, embedding, liveness_score, timestamp=None, detected=True):
+        """
+        Store the analysis of one frame.
+
+        Args:
+            track_id: Track the face belongs to
+            box (tuple): Face box (x, y, w, h)
+            embedding (np.ndarray): Face embedding
+            liveness_score (float): Liveness score of the frame
+            timestamp (float): Capture time (defaults to now)
+            detected (bool): The face was detected in this frame
+        """
+        result = FrameResult(timestamp if timestamp is not None else time.time(),
+                             track_id, box, embedding, liveness_score, detected)
+        with self._lock:
+            self._results.append(result)
+
+    def fresh(self, max_age, track_id=None, limit=None):
+        """
+        Detected results younger than `max_age` seconds, oldest first.
+        Carried-over crops are never reused for a decision.
+
+        Args:
+            max_age (float): Maximum age in seconds
+            track_id: Only return results of this track (None = any track)
+            limit (int): Return at most this many of the newest results
+
+        Returns:
+            list: FrameResult entries
+        """
+        cutoff = time.time() - max_age
+        with self._lock:
+            results = [r for r in self._results
+                       if r.detected and r.timestamp >= cutoff and
+                       (track_id is None or r.track_id == track_id)]
+        if limit is not None:
+            results = results[-limit:] if limit > 0 else []
+        return results
+
+    def latest(self):
+        """Most recent result, or None if the buffer is empty."""
+        with self._lock:
+            return self._results[-1] if self._results else None
+
+    def clear(self):
+        """Drop all stored results."""
+        with self._lock:
+            self._results.clear()
@@ -0,0 +1,110 @@
+# Scheduler Module - Adaptive detection / recognition rates
+#
+# A fixed FRAME_SKIP is too aggressive on a fast desktop and too lax on a
+# small kiosk. The live loop instead measures how long detection and
+# recognition (embedding + liveness) take and re-plans how often each runs:
+#
+#   - CPU budget: detection + recognition may use at most SCHED_CPU_BUDGET of
+#     every frame interval (the rest is left for capture, tracking, the
+#     display and punch jobs). This is a hard cap.
+#   - Latency target: a face in view should be identified within
+#     SCHED_TARGET_LATENCY seconds. Recognition runs no more often than that
+#     needs, saving CPU on fast machines.
+#
+# Detection runs as often as the budget allows. On frames it skips, the last
+# detected box is carried over, which keeps tracking and temporal liveness fed.
+
+import math
+
+
+class AdaptiveScheduler:
+    """
+    Chooses detection and recognition intervals (in frames) from measured
+    per-stage latencies.
+    """
+
+    def __init__(self, cpu_budget=0.6, target_latency=0.5, max_detect_interval=3,
+                 max_recognize_interval=30, period=30, adaptive=True, recognize_interval=5):
+        """
+        Args:
+            cpu_budget (float): Max share of a frame interval for detection +
+                                recognition (0 = no cap)
+            target_latency (float): Seconds until a face is identified
+                                    (0 = recognize as often as the budget allows)
+            max_detect_interval (int): Upper bound on frames between detections
+            max_recognize_interval (int): Upper bound on frames between recognitions
+            period (int): Frames between re-plans
+            adaptive (bool): False keeps the fixed intervals
+            recognize_interval (int): Initial (or fixed) recognition interval
+        """
+        self.cpu_budget = cpu_budget
+        self.target_latency = target_latency
+        self.max_detect_interval = max(1, int(max_detect_interval))
+        self.max_recognize_interval = max(1, int(max_recognize_interval))
+        self.period = max(1, int(period))
+        self.adaptive = adaptive
+        self.detect_interval = 1
+        self.recognize_interval = max(1, int(recognize_interval))
+        self.over_budget = False
+        self._ticks = 0
+
+    def due(self, stage, frame_index):
+        """True if `stage` ("detect" or "recognize") should run on this frame."""
+        interval = self.detect_interval if stage == "detect" else self.recognize_interval
+        return frame_index % interval == 0
+
+    def plan(self, detect_cost, recognize_cost, frame_period):
+        """
+        Intervals for the given per-frame costs.
+
+        Args:
+            detect_cost (float): Seconds one detection pass takes (all streams)
+            recognize_cost (float): Seconds one recognition pass takes (all streams)
+            frame_period (float): Seconds between frames
+
+        Returns:
+            tuple: (detect_interval, recognize_interval, over_budget)
+        """
+        budget = self.cpu_budget * frame_period if self.cpu_budget > 0 else math.inf
+
+        # Least frequent recognition that still meets the latency target
+        if self.target_latency > 0:
+            slack = self.target_latency - recognize_cost
+            latest = max(1, int(slack // frame_period)) if slack > 0 else 1
+        else:
+            latest = 1
+
+        # Detect as often as possible while recognition still fits the budget
+        for detect in range(1, self.max_detect_interval + 1):
+            remaining = budget - detect_cost / detect
+            if remaining <= 0:
+                continue
+            needed = max(1, math.ceil(recognize_cost / remaining)) if recognize_cost > 0 else 1
+            recognize = max(needed, min(latest, self.max_recognize_interval))
+            if recognize <= self.max_recognize_interval:
+                return detect, recognize, False
+
+        # Even the slowest rates exceed the budget
+        return self.max_detect_interval, self.max_recognize_interval, True
+
+    def tick(self, detect_cost, recognize_cost, frame_period):
+        """
+        Count one frame; re-plan every `period` frames once both stages have
+        been measured.
+
+        Returns:
+            bool: True if the intervals changed
+        """
+        self._ticks += 1
+        if not self.adaptive or self._ticks % self.period or not (detect_cost and recognize_cost):
+            return False
+        plan = self.plan(detect_cost, recognize_cost, frame_period)
+        changed = plan[:2] != (self.detect_interval, self.recognize_interval)
+        self.detect_interval, self.recognize_interval, self.over_budget = plan
+        return changed
+
+    def describe(self):
+        """Chosen rates, for logs and the status command."""
+        text = (f"detect every {self.detect_interval}, "
+                f"recognize every {self.recognize_interval} frame(s)")
+        return text + " (over CPU budget)" if self.over_budget else text
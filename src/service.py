@@ -0,0 +1,288 @@
+# Service Module - Local HTTP/WebSocket interface for other programs
+#
+# Door controllers, HR tools and web front-ends need recognition without a
+# camera window. A small asyncio server (standard library only) exposes the
+# system on a local address:
+#
+#   GET  /health                       liveness of the service, gallery size, batching stats
+#   POST /identify[?crop=1]            who is in the image(s)
+#   POST /punch?type=in|out[&crop=1]   consensus over the frames, then punch
+#   POST /enroll?name=N[&overwrite=1]  register a user from the frames
+#   GET  /ws                           WebSocket: binary JPEG frames in, JSON results out
+#
+# Request bodies are a JPEG (or PNG) image, or multipart/form-data with one
+# image per part. With crop=1 the images already are face crops and
+# detection is skipped. Faces from concurrent requests share batched
+# forward passes through the inference scheduler (src/inference.py).
+
+import asyncio
+import base64
+import email.parser
+import email.policy
+import hashlib
+import json
+import struct
+import time
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+import cv2
+import numpy as np
+
+from src.control import parse_address
+
+
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC11B73"
+
+
+class HttpError(Exception):
+    """Request failed; answered with `status` and a JSON {"error": message}."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class Request:
+    """
+    One parsed HTTP request.
+    """
+
+    def __init__(self, method, target, headers, body=b""):
+        url = urlsplit(target)
+        self.method = method.upper()
+        self.path = url.path.rstrip("/") or "/"
+        self.query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        self.headers = headers
+        self.body = body
+
+    def flag(self, name):
+        """True for ?name=1 / true / yes."""
+        return self.query.get(name, "").lower() in ("1", "true", "yes")
+
+    def images(self):
+        """
+        Decode the image(s) in the body.
+
+        Returns:
+            list: BGR images, one per part
+
+        Raises:
+            HttpError: No body, or a part that is not a decodable image
+        """
+        content_type = self.headers.get("content-type", "")
+        if content_type.startswith("multipart/"):
+            message = email.parser.BytesParser(policy=email.policy.HTTP).parsebytes(
+                b"Content-Type: " + content_type.encode() + b"\r\n\r\n" + self.body)
+            blobs = [part.get_payload(decode=True) for part in message.iter_parts()]
+        else:
+            blobs = [self.body]
+        blobs = [blob for blob in blobs if blob]
+        if not blobs:
+            raise HttpError(HTTPStatus.BAD_REQUEST, "no image in request body")
+        return [decode_image(blob) for blob in blobs]
+
+
+def decode_image(blob):
+    """JPEG/PNG bytes to a BGR image (HttpError 400 if undecodable)."""
+    image = cv2.imdecode(np.frombuffer(blob, np.uint8), cv2.IMREAD_COLOR)
+    if image is None:
+        raise HttpError(HTTPStatus.BAD_REQUEST, "body is not a JPEG/PNG image")
+    return image
+
+
+class WebSocket:
+    """
+    Server side of an upgraded connection (RFC 6455; no extensions).
+    """
+
+    def __init__(self, reader, writer, max_size=16 << 20):
+        self.reader = reader
+        self.writer = writer
+        self.max_size = max_size
+        self.closed = False
+
+    async def receive(self):
+        """
+        Next complete message (pings are answered, fragments joined).
+
+        Returns:
+            str or bytes: Text or binary message, or None once the peer closed
+        """
+        message, kind = b"", None
+        while not self.closed:
+            head = await self.reader.readexactly(2)
+            fin, opcode = head[0] & 0x80, head[0] & 0x0F
+            length = head[1] & 0x7F
+            if length == 126:
+                length = struct.unpack("!H", await self.reader.readexactly(2))[0]
+            elif length == 127:
+                length = struct.unpack("!Q", await self.reader.readexactly(8))[0]
+            if len(message) + length > self.max_size:
+                await self._send(0x8, struct.pack("!H", 1009))  # Message too big
+                self.closed = True
+                break
+            mask = await self.reader.readexactly(4) if head[1] & 0x80 else None
+            payload = await self.reader.readexactly(length)
+            if mask:
+                payload = (np.frombuffer(payload, np.uint8) ^
+                           np.resize(np.frombuffer(mask, np.uint8), length)).tobytes()
+
+            if opcode == 0x8:    # Close
+                await self._send(0x8, payload[:2])
+                self.closed = True
+            elif opcode == 0x9:  # Ping
+                await self._send(0xA, payload)
+            elif opcode in (0x0, 0x1, 0x2):
+                if opcode:
+                    kind = opcode
+                message += payload
+                if fin:
+                    return message.decode("utf-8") if kind == 0x1 else message
+        return None
+
+    async def send_json(self, data):
+        await self._send(0x1, json.dumps(data).encode())
+
+    async def _send(self, opcode, payload):
+        length = len(payload)
+        if length < 126:
+            head = struct.pack("!BB", 0x80 | opcode, length)
+        elif length < 1 << 16:
+            head = struct.pack("!BBH", 0x80 | opcode, 126, length)
+        else:
+            head = struct.pack("!BBQ", 0x80 | opcode, 127, length)
+        self.writer.write(head + payload)
+        await self.writer.drain()
+
+
+class HttpService:
+    """
+    Minimal HTTP/1.1 server (keep-alive, Content-Length bodies) routing to
+    async handlers that return JSON-serializable data.
+    """
+
+    def __init__(self, address, routes, websocket=None, max_body=16 << 20):
+        """
+        Args:
+            address (str): "host:port" or a Unix socket path
+            routes (dict): {(method, path): async handler(request) -> (status, data)}
+            websocket (callable): async handler(request, ws) for GET /ws, or None
+            max_body (int): Largest accepted request body (bytes)
+        """
+        self.address = address
+        self.routes = routes
+        self.websocket = websocket
+        self.max_body = max_body
+        self.requests = 0
+        self.latency = 0.0  # Seconds summed over requests
+        self._server = None
+
+    async def start(self):
+        address = parse_address(self.address)
+        if isinstance(address, tuple):
+            self._server = await asyncio.start_server(self._connection, *address)
+        else:
+            self._server = await asyncio.start_unix_server(self._connection, address)
+        return self
+
+    async def serve_forever(self):
+        async with self._server:
+            await self._server.serve_forever()
+
+    def close(self):
+        if self._server is not None:
+            self._server.close()
+
+    async def _read_request(self, reader):
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except asyncio.IncompleteReadError:
+            return None
+        except asyncio.LimitOverrunError:
+            raise HttpError(HTTPStatus.BAD_REQUEST, "request header too large")
+        lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, target, _ = lines[0].split(" ", 2)
+        except ValueError:
+            raise HttpError(HTTPStatus.BAD_REQUEST, "malformed request line")
+        headers = {}
+        for line in lines[1:]:
+            key, sep, value = line.partition(":")
+            if sep:
+                headers[key.strip().lower()] = value.strip()
+        if "chunked" in headers.get("transfer-encoding", ""):
+            raise HttpError(HTTPStatus.LENGTH_REQUIRED, "send a Content-Length body")
+        try:
+            length = int(headers.get("content-length", 0) or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            raise HttpError(HTTPStatus.BAD_REQUEST, "invalid Content-Length")
+        if length > self.max_body:
+            raise HttpError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "request body too large")
+        body = await reader.readexactly(length) if length else b""
+        return Request(method, target, headers, body)
+
+    async def _connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await self._read_request(reader)
+                except HttpError as e:
+                    await self._respond(writer, e.status, {"error": str(e)}, keep_alive=False)
+                    break
+                if request is None:
+                    break
+                if (request.path == "/ws" and self.websocket is not None and
+                        request.headers.get("upgrade", "").lower() == "websocket"):
+                    await self._upgrade(request, reader, writer)
+                    break
+
+                started = time.perf_counter()
+                status, data = await self._dispatch(request)
+                self.requests += 1
+                self.latency += time.perf_counter() - started
+                keep_alive = request.headers.get("connection", "").lower() != "close"
+                await self._respond(writer, status, data, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except asyncio.CancelledError:
+            pass  # Service shutting down with the client still connected
+        finally:
+            writer.close()
+
+    async def _dispatch(self, request):
+        handler = self.routes.get((request.method, request.path))
+        if handler is None:
+            if any(path == request.path for _, path in self.routes):
+                return HTTPStatus.METHOD_NOT_ALLOWED, {"error": f"{request.method} not allowed"}
+            return HTTPStatus.NOT_FOUND, {"error": f"no endpoint {request.path}"}
+        try:
+            return await handler(request)
+        except HttpError as e:
+            return e.status, {"error": str(e)}
+        except Exception as e:
+            print(f"[-] Service error on {request.path}: {e}")
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(e)}
+
+    async def _respond(self, writer, status, data, keep_alive=True):
+        status = HTTPStatus(status)
+        body = json.dumps(data).encode()
+        head = (f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                f"Content-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode() + body)
+        await writer.drain()
+
+    async def _upgrade(self, request, reader, writer):
+        key = request.headers.get("sec-websocket-key", "")
+        accept = base64.b64encode(hashlib.sha1((key + WS_GUID).encode()).digest()).decode()
+        writer.write((f"HTTP/1.1 101 Switching Protocols\r\n"
+                      f"Upgrade: websocket\r\nConnection: Upgrade\r\n"
+                      f"Sec-WebSocket-Accept: {accept}\r\n\r\n").encode())
+        await writer.drain()
+        await self.websocket(request, WebSocket(reader, writer, self.max_body))
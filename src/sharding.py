@@ -0,0 +1,268 @@
+# Sharding Module - Gallery partitioned across local worker processes
+#
+# Each identity belongs to exactly one shard (stable hash of its name). A
+# shard worker process loads the embedding database, keeps only its own
+# identities and builds a local gallery (any GALLERY_MODE) over them. A query
+# is scattered to every shard at once; each returns only its top-k
+# candidates, and the coordinator merges them into the global top-k.
+#
+# Workers hold no state that isn't on disk, so any one of them can be
+# restarted (or reloaded after an enrollment) without touching the others.
+# Local processes stand in for per-host shard servers: the coordinator only
+# talks to them through message passing.
+
+import multiprocessing
+import os
+import threading
+import zlib
+
+import numpy as np
+
+from src.gallery import Gallery, build_gallery
+
+
+class ShardError(RuntimeError):
+    """A shard worker failed, died or did not answer in time."""
+
+
+def shard_of(name, num_shards):
+    """Shard index owning an identity (stable across processes and runs)."""
+    return zlib.crc32(name.encode("utf-8")) % num_shards
+
+
+def _load_shard(path, index, num_shards, mode, options):
+    """Build the local gallery of one shard from the database file."""
+    db = np.load(path, allow_pickle=True).item() if os.path.exists(path) else {}
+    own = {name: value for name, value in db.items() if shard_of(name, num_shards) == index}
+    return build_gallery(own, mode, **options)
+
+
+def _shard_main(conn, path, index, num_shards, mode, options):
+    """
+    Shard worker loop: answers ('top_k', queries, k), ('scores', queries),
+    ('templates', name), ('reload',) and ('stop',) requests over a pipe.
+    """
+    gallery = None
+    request = ("reload",)
+    while True:
+        op = request[0]
+        try:
+            if op == "stop":
+                break
+            if op == "reload":
+                gallery = _load_shard(path, index, num_shards, mode, options)
+                reply = gallery.names
+            elif op == "top_k":
+                reply = gallery.top_k_batch(request[1], request[2])
+            elif op == "scores":
+                reply = gallery.scores_batch(request[1])
+            elif op == "templates":
+                reply = np.asarray(gallery.templates_of(request[1]))
+            else:
+                raise ValueError(f"Unknown request: {op}")
+            conn.send(("ok", reply))
+        except Exception as e:
+            conn.send(("error", f"{type(e).__name__}: {e}"))
+
+        try:
+            request = conn.recv()
+        except (EOFError, OSError):
+            break  # Coordinator went away
+    conn.close()
+
+
+class _Shard:
+    """Coordinator-side handle of one worker process."""
+
+    def __init__(self, process, conn):
+        self.process = process
+        self.conn = conn
+        self.names = []
+
+
+class ShardedGallery(Gallery):
+    """
+    Gallery whose identities live in worker processes.
+
+    Same search interface as Gallery (best, best_batch, top_k, scores_batch);
+    only names are kept in the coordinator. A shard that dies or times out is
+    restarted once and the request retried.
+    """
+
+    def __init__(self, num_shards, path, mode="exact", options=None,
+                 start_method="spawn", timeout=30.0):
+        """
+        Args:
+            num_shards (int): Number of worker processes
+            path (str): Embedding database (.npy) the shards load from
+            mode (str): GALLERY_MODE used inside each shard
+            options (dict): build_gallery options for each shard
+            start_method (str): multiprocessing start method
+            timeout (float): Seconds to wait for a shard reply
+        """
+        super().__init__([], None, [0])
+        self.num_shards = num_shards
+        self.path = path
+        self.mode = mode
+        self.options = dict(options or {})
+        self.timeout = timeout
+        self._context = multiprocessing.get_context(start_method)
+        self._lock = threading.RLock()  # One scatter-gather round at a time per pipe
+        self._shards = [None] * num_shards
+
+        # Start all workers first so they load their shards in parallel
+        for i in range(num_shards):
+            self._shards[i] = self._spawn(i)
+        for i in range(num_shards):
+            self._shards[i].names = self._receive(i)
+        self._refresh_names()
+
+    def _spawn(self, index):
+        parent, child = self._context.Pipe()
+        process = self._context.Process(
+            target=_shard_main, name=f"gallery-shard-{index}", daemon=True,
+            args=(child, self.path, index, self.num_shards, self.mode, self.options))
+        process.start()
+        child.close()
+        return _Shard(process, parent)
+
+    def _receive(self, index):
+        shard = self._shards[index]
+        try:
+            if not shard.conn.poll(self.timeout):
+                raise ShardError(f"Shard {index} did not answer within {self.timeout:.0f}s")
+            status, reply = shard.conn.recv()
+        except (EOFError, OSError) as e:
+            raise ShardError(f"Shard {index} is down: {e}") from e
+        if status != "ok":
+            raise ShardError(f"Shard {index}: {reply}")
+        return reply
+
+    def _send(self, index, request):
+        try:
+            self._shards[index].conn.send(request)
+        except (BrokenPipeError, OSError) as e:
+            raise ShardError(f"Shard {index} is down: {e}") from e
+
+    def _refresh_names(self):
+        self.names = [name for shard in self._shards for name in shard.names]
+        self.offsets = np.arange(len(self.names) + 1, dtype=np.int64)
+        self._index = {name: i for i, name in enumerate(self.names)}
+
+    def _scatter(self, request):
+        """Send one request to every shard and gather the replies in shard order."""
+        with self._lock:
+            failed = []
+            for i in range(self.num_shards):
+                try:
+                    self._send(i, request)
+                except ShardError:
+                    failed.append(i)
+
+            replies = [None] * self.num_shards
+            for i in range(self.num_shards):
+                if i in failed:
+                    continue
+                try:
+                    replies[i] = self._receive(i)
+                except ShardError:
+                    failed.append(i)
+
+            # Restart failed shards independently and retry them once
+            for i in failed:
+                self.restart(i)
+                self._send(i, request)
+                replies[i] = self._receive(i)
+            return replies
+
+    def restart(self, index):
+        """
+        Replace one shard worker with a fresh process (reloaded from disk).
+
+        Args:
+            index (int): Shard index
+        """
+        with self._lock:
+            old = self._shards[index]
+            old.conn.close()
+            if old.process.is_alive():
+                old.process.terminate()
+            old.process.join(timeout=self.timeout)
+            self._shards[index] = self._spawn(index)
+            self._shards[index].names = self._receive(index)
+            self._refresh_names()
+
+    def reload(self, names=None):
+        """
+        Make shards re-read the database after it was saved.
+
+        Args:
+            names (iterable): Changed identities - only their shards reload
+                              (None = all shards)
+        """
+        if names is None:
+            indices = range(self.num_shards)
+        else:
+            indices = sorted({shard_of(name, self.num_shards) for name in names})
+        with self._lock:
+            for i in indices:
+                self._send(i, ("reload",))
+            for i in indices:
+                self._shards[i].names = self._receive(i)
+            self._refresh_names()
+
+    def close(self):
+        """Stop all shard workers."""
+        with self._lock:
+            for shard in self._shards:
+                try:
+                    shard.conn.send(("stop",))
+                except (BrokenPipeError, OSError):
+                    pass
+            for shard in self._shards:
+                shard.process.join(timeout=2.0)
+                if shard.process.is_alive():
+                    shard.process.terminate()
+                shard.conn.close()
+
+    @property
+    def num_templates(self):
+        return len(self.names)
+
+    def updated(self, upserts, removals=()):
+        """
+        Shards read the saved database themselves: reload the owning shards
+        in place (the database file must already hold the change).
+        """
+        self.reload(set(upserts) | set(removals))
+        return self
+
+    def templates_of(self, name):
+        i = shard_of(name, self.num_shards)
+        with self._lock:
+            self._send(i, ("templates", name))
+            return self._receive(i)
+
+    def scores_batch(self, embeddings):
+        queries = np.atleast_2d(np.asarray(embeddings, dtype=np.float32))
+        blocks = self._scatter(("scores", queries))
+        if not self.names:
+            return np.zeros((len(queries), 0), dtype=np.float32)
+        return np.concatenate(blocks, axis=1)
+
+    def top_k_batch(self, embeddings, k=5):
+        queries = np.atleast_2d(np.asarray(embeddings, dtype=np.float32))
+        per_shard = self._scatter(("top_k", queries, k))
+        merged = []
+        for row in range(len(queries)):
+            candidates = [pair for results in per_shard for pair in results[row]]
+            candidates.sort(key=lambda pair: pair[1], reverse=True)
+            merged.append(candidates[:k])
+        return merged
+
+    def best(self, embedding):
+        top = self.top_k_batch(embedding, 1)[0]
+        return top[0] if top else (None, 0.0)
+
+    def best_batch(self, embeddings):
+        return [top[0] if top else (None, 0.0) for top in self.top_k_batch(embeddings, 1)]
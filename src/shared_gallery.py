@@ -0,0 +1,222 @@
+# Shared Gallery Module - One published copy of the gallery for all processes
+#
+# Several recognition processes on one box (e.g. one per camera) would each
+# hold a private copy of every template. Instead, the gallery is published
+# into a directory as numbered generations:
+#
+#   gen-000007.npy    (T, D) float32 unit-norm templates
+#   gen-000007.json   names + identity offsets
+#   CURRENT           "7"
+#
+# Readers memory-map the current generation read-only, so every process
+# shares the same physical pages through the OS page cache. A publisher
+# writes a complete new generation next to the old one and then atomically
+# replaces CURRENT; readers notice the switch (one stat per poll) and map the
+# new generation. Readers never take a lock: a reader keeps using the
+# generation it mapped, which stays valid even after the publisher unlinks the
+# files. Writers (in any process) serialize on a lock file and apply their
+# change to the current generation, never to a possibly stale mapping.
+
+import json
+import os
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+
+from src.database import file_lock
+from src.gallery import Gallery
+
+
+class SharedGalleryStore:
+    """
+    Publisher and reader of generation-numbered gallery snapshots.
+    """
+
+    def __init__(self, directory, keep=3):
+        """
+        Args:
+            directory (str): Directory holding the generations
+            keep (int): Generations kept on disk (older ones are unlinked)
+        """
+        self.directory = directory
+        self.keep = keep
+        self._current_path = os.path.join(directory, "CURRENT")
+        self._lock_path = os.path.join(directory, "WRITER.lock")
+        self._seen_stat = None
+        self._thread_lock = threading.RLock()
+        self._depth = 0  # Nesting of writer() in this process
+        os.makedirs(directory, exist_ok=True)
+
+    def _paths(self, generation):
+        stem = os.path.join(self.directory, f"gen-{generation:06d}")
+        return stem + ".npy", stem + ".json"
+
+    @property
+    def generation(self):
+        """Currently published generation, or None if nothing was published."""
+        try:
+            with open(self._current_path) as f:
+                return int(f.read().strip())
+        except (FileNotFoundError, ValueError):
+            return None
+
+    @contextmanager
+    def writer(self, timeout=30.0, stale_after=60.0):
+        """
+        Exclusive writer section across processes (re-entrant in one process).
+
+        Raises:
+            TimeoutError: Another writer held the lock for `timeout` seconds
+        """
+        with self._thread_lock:
+            if self._depth > 0:
+                self._depth += 1
+                try:
+                    yield self
+                finally:
+                    self._depth -= 1
+                return
+            with file_lock(self._lock_path, timeout, stale_after):
+                self._depth = 1
+                try:
+                    yield self
+                finally:
+                    self._depth = 0
+
+    def update(self, upserts, removals=()):
+        """
+        Apply a change to the current generation and publish the result.
+
+        Under the writer lock the newest generation is reloaded first, so
+        users published by other processes since this one last polled are
+        kept.
+
+        Args:
+            upserts (dict): {name: embedding(s)} to add or replace
+            removals (iterable): Names to remove
+
+        Returns:
+            Gallery: The new generation, memory-mapped
+        """
+        with self.writer():
+            db = db_view(self.load())
+            for name in removals:
+                db.pop(name, None)
+            db.update(upserts)
+            return self.publish(db)
+
+    def publish(self, db):
+        """
+        Publish a {name: embedding(s)} database as a new generation,
+        replacing whatever is current (use update() to change single users).
+
+        Args:
+            db (dict): Complete database (values may be memory-mapped views
+                       of the previous generation)
+
+        Returns:
+            Gallery: The new generation, memory-mapped
+        """
+        with self.writer():
+            return self._publish(db)
+
+    def _publish(self, db):
+        gallery = Gallery.from_db(db)
+        generation = (self.generation or 0) + 1
+        while True:
+            # Claim the generation number (skipping files left by a crashed writer)
+            npy_path, json_path = self._paths(generation)
+            try:
+                fd = os.open(json_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                break
+            except FileExistsError:
+                generation += 1
+
+        with os.fdopen(fd, "w") as f:
+            json.dump({"names": gallery.names, "offsets": gallery.offsets.tolist()}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        tmp_path = npy_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            np.save(f, np.asarray(gallery.templates, dtype=np.float32))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, npy_path)
+
+        # The atomic switch: readers see either the old or the new generation
+        tmp_path = self._current_path + f".{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(str(generation))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self._current_path)
+
+        self._collect(generation)
+        return self.load(generation)
+
+    def _collect(self, generation):
+        """Unlink generations older than the newest `keep`."""
+        for old in range(max(0, generation - self.keep - 10), generation - self.keep + 1):
+            for path in self._paths(old):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass  # Already gone, or still open on a platform that forbids it
+
+    def load(self, generation=None):
+        """
+        Memory-map one generation (default: the current one).
+
+        Returns:
+            Gallery: Gallery whose templates are a read-only np.memmap,
+                     or an empty Gallery if nothing was published
+        """
+        for _ in range(5):
+            generation = self.generation if generation is None else generation
+            if generation is None:
+                return Gallery.from_db({})
+            npy_path, json_path = self._paths(generation)
+            try:
+                with open(json_path) as f:
+                    meta = json.load(f)
+                if meta["names"]:
+                    templates = np.load(npy_path, mmap_mode="r")
+                else:
+                    templates = np.zeros((0, 0), dtype=np.float32)  # Empty files can't be mapped
+            except (FileNotFoundError, ValueError):
+                generation = None  # Collected or superseded under us - reread CURRENT
+                continue
+            gallery = Gallery(meta["names"], templates, meta["offsets"])
+            gallery.generation = generation
+            return gallery
+        raise RuntimeError(f"Could not load a gallery generation from {self.directory}")
+
+    def changed(self):
+        """
+        Cheap poll: True if CURRENT was replaced since the last call.
+
+        One stat() per call; CURRENT is replaced (new inode), never rewritten.
+        """
+        try:
+            st = os.stat(self._current_path)
+            stat = (st.st_ino, st.st_mtime_ns)
+        except FileNotFoundError:
+            stat = None
+        if stat == self._seen_stat:
+            return False
+        self._seen_stat = stat
+        return True
+
+    def forget_seen(self):
+        """Make the next changed() call report True."""
+        self._seen_stat = None
+
+
+def db_view(gallery):
+    """
+    {name: (k, D) templates} dict over a gallery without copying: values are
+    slices of its (possibly memory-mapped) template matrix.
+    """
+    return {name: gallery.templates[gallery.offsets[i]:gallery.offsets[i + 1]]
+            for i, name in enumerate(gallery.names)}
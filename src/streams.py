@@ -0,0 +1,90 @@
+# Streams Module - Fair sharing of batched inference across camera streams
+#
+# One process can serve several cameras with a single copy of the models.
+# Each stream runs detection on its own frames; the face crops that are due
+# for recognition are pooled and embedded/matched in one batched call per
+# tick. When more crops are due than one batch holds, streams are served
+# round-robin so a busy camera can't starve a quiet one, and each stream
+# keeps only its newest few crops (an old crop is not worth embedding).
+
+from collections import deque
+
+
+class FairBatcher:
+    """
+    Per-stream queues drained round-robin into fixed-size batches.
+    """
+
+    def __init__(self, batch_size=8, per_stream=2):
+        """
+        Args:
+            batch_size (int): Maximum items per batch
+            per_stream (int): Items queued per stream; older ones are dropped
+        """
+        self.batch_size = max(1, int(batch_size))
+        self.per_stream = max(1, int(per_stream))
+        self._queues = {}  # stream -> deque, in first-seen order
+        self._next = 0     # Position of the stream served first next time
+        self.served = {}
+        self.dropped = {}
+
+    def submit(self, stream, item):
+        """
+        Queue an item for a stream.
+
+        Args:
+            stream: Hashable stream key
+            item: Payload returned by next_batch()
+        """
+        queue = self._queues.get(stream)
+        if queue is None:
+            queue = self._queues[stream] = deque()
+            self.served[stream] = 0
+            self.dropped[stream] = 0
+        if len(queue) >= self.per_stream:
+            queue.popleft()
+            self.dropped[stream] += 1
+        queue.append(item)
+
+    def remove(self, stream):
+        """Forget a stream and anything it still has queued."""
+        streams = list(self._queues)
+        if stream in self._queues:
+            if streams.index(stream) < self._next:
+                self._next -= 1
+            del self._queues[stream]
+
+    def __len__(self):
+        return sum(len(queue) for queue in self._queues.values())
+
+    def next_batch(self):
+        """
+        Take up to batch_size items, one per stream in turn.
+
+        The stream after the last one served is first in the next batch, so
+        over successive batches every stream gets an equal share.
+
+        Returns:
+            list: (stream, item) pairs, oldest item of each stream first
+        """
+        streams = list(self._queues)
+        batch = []
+        if not streams:
+            return batch
+        start = self._next % len(streams)
+        order = streams[start:] + streams[:start]
+        last = None
+        while len(batch) < self.batch_size:
+            took = False
+            for stream in order:
+                queue = self._queues[stream]
+                if queue and len(batch) < self.batch_size:
+                    batch.append((stream, queue.popleft()))
+                    self.served[stream] += 1
+                    last = stream
+                    took = True
+            if not took:
+                break
+        if last is not None:
+            self._next = streams.index(last) + 1
+        return batch
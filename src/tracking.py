@@ -0,0 +1,117 @@
+# Tracking Module - Lightweight IoU tracker for associating faces across frames
+#
+# Per-face state (temporal liveness buffers, identity caches) needs a stable key
+# that survives from one frame to the next. MTCNN gives us boxes only, so we
+# associate them greedily by Intersection-over-Union with the previous boxes.
+
+
+def iou(box_a, box_b):
+    """
+    Intersection-over-Union of two (x, y, w, h) boxes.
+
+    Args:
+        box_a (tuple): First box (x, y, w, h)
+        box_b (tuple): Second box (x, y, w, h)
+
+    Returns:
+        float: IoU in range 0.0 - 1.0
+    """
+    ax, ay, aw, ah = box_a
+    bx, by, bw, bh = box_b
+
+    ix = max(0, min(ax + aw, bx + bw) - max(ax, bx))
+    iy = max(0, min(ay + ah, by + bh) - max(ay, by))
+    inter = ix * iy
+    union = aw * ah + bw * bh - inter
+
+    return inter / union if union > 0 else 0.0
+
+
+class Track:
+    """State of a single tracked face."""
+
+    def __init__(self, track_id, box):
+        self.id = track_id
+        self.box = box
+        self.hits = 1      # Frames this track was matched to a detection
+        self.missed = 0    # Consecutive frames without a matching detection
+
+
+class FaceTracker:
+    """
+    Greedy IoU tracker.
+
+    Each update matches new detections to existing tracks (highest IoU first).
+    Unmatched detections start new tracks; tracks unmatched for more than
+    `max_missed` frames are dropped and reported in `self.lost`.
+    """
+
+    def __init__(self, iou_threshold=0.3, max_missed=5):
+        """
+        Args:
+            iou_threshold (float): Minimum IoU to continue an existing track
+            max_missed (int): Frames a track may go undetected before it is dropped
+        """
+        self.iou_threshold = iou_threshold
+        self.max_missed = max_missed
+        self.tracks = {}
+        self.lost = []
+        self._next_id = 1
+
+    def update(self, boxes):
+        """
+        Associate detections of the current frame with tracks.
+
+        Args:
+            boxes (list): Detected boxes (x, y, w, h) for this frame
+
+        Returns:
+            list: Track id for each box, in the same order as `boxes`
+        """
+        self.lost = []
+
+        # Score every (track, detection) pair and match greedily
+        pairs = []
+        for track_id, track in self.tracks.items():
+            for i, box in enumerate(boxes):
+                overlap = iou(track.box, box)
+                if overlap >= self.iou_threshold:
+                    pairs.append((overlap, track_id, i))
+        pairs.sort(reverse=True)
+
+        ids = [None] * len(boxes)
+        matched_tracks = set()
+        for _, track_id, i in pairs:
+            if track_id in matched_tracks or ids[i] is not None:
+                continue
+            track = self.tracks[track_id]
+            track.box = boxes[i]
+            track.hits += 1
+            track.missed = 0
+            matched_tracks.add(track_id)
+            ids[i] = track_id
+
+        # Age unmatched tracks and drop stale ones
+        for track_id in list(self.tracks):
+            if track_id in matched_tracks:
+                continue
+            track = self.tracks[track_id]
+            track.missed += 1
+            if track.missed > self.max_missed:
+                del self.tracks[track_id]
+                self.lost.append(track_id)
+
+        # Start new tracks for unmatched detections
+        for i, box in enumerate(boxes):
+            if ids[i] is None:
+                track = Track(self._next_id, box)
+                self._next_id += 1
+                self.tracks[track.id] = track
+                ids[i] = track.id
+
+        return ids
+
+    def reset(self):
+        """Drop all tracks (reported in `self.lost`)."""
+        self.lost = list(self.tracks)
+        self.tracks = {}
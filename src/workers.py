@@ -0,0 +1,86 @@
+# Workers Module - Shared thread pool for concurrent per-face analysis
+#
+# Embedding (PyTorch) and liveness (OpenCV/NumPy) are independent and both
+# spend most of their time in native code that releases the GIL, so running
+# them on a thread pool overlaps them on multi-core machines. One pool is
+# shared by every caller to avoid oversubscribing the CPU. Embeddings go
+# through the shared inference scheduler (src/inference.py), which batches
+# crops from all callers into common forward passes.
+
+import atexit
+from concurrent.futures import ThreadPoolExecutor
+
+from src.inference import get_scheduler
+from src.liveness import liveness
+
+
+_pool = None
+_pool_size = 4
+
+
+def configure_pool(max_workers):
+    """
+    Set the size of the shared pool.
+
+    A no-op if it already has that size; a running pool of another size is
+    replaced (work already submitted to it still completes).
+
+    Args:
+        max_workers (int): Number of worker threads
+    """
+    global _pool, _pool_size
+    max_workers = max(1, int(max_workers))
+    if max_workers == _pool_size:
+        return
+    _pool_size = max_workers
+    if _pool is not None:
+        old, _pool = _pool, None
+        old.shutdown(wait=False)
+
+
+def get_pool():
+    """
+    Get the shared worker pool, creating it on first use.
+
+    Returns:
+        ThreadPoolExecutor: Shared executor
+    """
+    global _pool
+    if _pool is None:
+        _pool = ThreadPoolExecutor(max_workers=_pool_size, thread_name_prefix="face-worker")
+        atexit.register(_pool.shutdown, wait=False)
+    return _pool
+
+
+def analyze_faces(faces):
+    """
+    Compute embedding and single-frame liveness for several face crops concurrently.
+
+    All crops are queued for embedding at once (one batch, possibly shared
+    with other callers) while liveness runs on the pool; both are joined
+    before returning, so the call takes roughly as long as the slower of the
+    two rather than their sum.
+
+    Args:
+        faces (list): Face images (BGR)
+
+    Returns:
+        list: (embedding, liveness_score) tuple per face, in input order
+    """
+    pool = get_pool()
+    emb_jobs = get_scheduler().submit_many(faces)
+    live_jobs = [pool.submit(liveness, face) for face in faces]
+    return [(emb_job.result(), live_job.result()) for emb_job, live_job in zip(emb_jobs, live_jobs)]
+
+
+def analyze_face(face):
+    """
+    Compute embedding and single-frame liveness of one face crop concurrently.
+
+    Args:
+        face (np.ndarray): Face image (BGR)
+
+    Returns:
+        tuple: (embedding, liveness_score)
+    """
+    return analyze_faces([face])[0]
@@ -1,11 +1,29 @@
+import json
+import urllib.error
+import urllib.request
+
 import streamlit as st
 import numpy as np
 from PIL import Image
 
+from config import SERVICE_ADDRESS
+
 st.set_page_config(page_title="Face Attendance System", layout="centered")
 
 st.title("🧠 Face Attendance System (Web Demo)")
-st.caption("Browser-based demo | Local system uses OpenCV")
+st.caption("Browser-based demo | Recognition by the local service (python app.py --serve)")
+
+
+def identify(image_bytes):
+    """POST the captured image to the recognition service; None if it isn't running."""
+    request = urllib.request.Request(f"http://{SERVICE_ADDRESS}/identify", data=image_bytes,
+                                     headers={"Content-Type": "image/jpeg"})
+    try:
+        with urllib.request.urlopen(request, timeout=10) as response:
+            return json.loads(response.read())["results"][0]
+    except (urllib.error.URLError, OSError, ValueError, KeyError):
+        return None
+
 
 img = st.camera_input("📸 Capture your face")
 
@@ -13,6 +31,13 @@ if img:
     image = Image.open(img)
     st.image(image, caption="Captured Image", use_column_width=True)
 
-    # Dummy confidence for demo
-    st.success("Face detected successfully!")
-    st.info("This is a web demo. Full real-time system runs locally.")
+    result = identify(img.getvalue())
+    if result is None:
+        st.info("Recognition service not reachable. Start it with: python app.py --serve")
+    elif not result["face"]:
+        st.warning("No face detected - look at the camera and try again.")
+    elif result["name"]:
+        st.success(f"Recognized: {result['name']}")
+        st.write(f"Similarity {result['similarity']:.3f} · Liveness {result['liveness']:.3f}")
+    else:
+        st.error(f"Face not recognized (best similarity {result['similarity']:.3f})")
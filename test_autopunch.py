@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Auto-Punch Tests
+Checks per-track consensus, the dedup window, punch type rules and the
+people-per-minute counters of touchless mode.
+"""
+
+import sys
+import os
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '.'))
+
+from src.autopunch import AutoPuncher, PunchRules, PUNCH_IN, PUNCH_OUT
+
+
+def test_track_consensus():
+    """A track is punched once its results reach consensus, once per dedup window"""
+    print("\n" + "="*70)
+    print("TEST: Track consensus")
+    print("="*70)
+
+    auto = AutoPuncher(PunchRules(), frames=3, consensus_threshold=0.6, min_frames=2,
+                       dedup_window=120.0)
+    assert auto.add("t1", "alice", 0.90, 0.80, now=0.0) is None
+    decision = auto.add("t1", "alice", 0.94, 0.90, now=0.2)
+    assert decision is not None
+    name, face, live, punch_type = decision
+    assert name == "alice" and abs(face - 0.92) < 1e-9 and abs(live - 0.85) < 1e-9
+    assert punch_type == PUNCH_IN
+    auto.accepted("t1", name, punch_type, now=0.3)
+    print("✓ Punched after 2 agreeing results (sequential consensus)")
+
+    assert auto.settled("t1") and auto.add("t1", "alice", 0.9, 0.9, now=0.5) is None
+    print("✓ A punched track stops voting")
+
+    # Same person on a new track (walked out of view and back) within the window
+    auto.forget("t1")
+    for i in range(3):
+        assert auto.add("t2", "alice", 0.9, 0.9, now=10.0 + i) is None
+    assert auto.deduped == 1 and auto.settled("t2")
+    print("✓ Same person deduplicated within the window")
+
+    # Mixed votes never reach consensus
+    auto.add("t3", "bob", 0.9, 0.9, now=1.0)
+    auto.add("t3", None, 0.3, 0.9, now=1.1)
+    assert auto.add("t3", "carol", 0.9, 0.9, now=1.2) is None and not auto.settled("t3")
+    print("✓ No consensus, no punch; the track keeps voting")
+
+    assert auto.add("t2b", "alice", 0.9, 0.9, now=200.0) is None
+    assert auto.add("t2b", "alice", 0.9, 0.9, now=200.1)[3] == PUNCH_OUT
+    print("✓ Punched again after the window, with the alternate type")
+
+    # A manual Punch-In for bob: no auto punch right after, then a Punch-Out
+    auto.manual("bob", PUNCH_IN, now=300.0)
+    for i in range(3):
+        assert auto.add("t4", "bob", 0.9, 0.9, now=301.0 + i) is None
+    auto.forget("t4")
+    assert auto.add("t5", "bob", 0.9, 0.9, now=500.0) is None
+    assert auto.add("t5", "bob", 0.9, 0.9, now=500.1)[3] == PUNCH_OUT
+    print("✓ Manual punches set the next alternate type and the dedup window")
+
+    print("\n✅ PASS: Track consensus")
+
+
+def test_rules_and_throughput():
+    """Punch type rules and people-per-minute measurement"""
+    print("\n" + "="*70)
+    print("TEST: Rules and throughput")
+    print("="*70)
+
+    rules = PunchRules("alternate")
+    day = datetime(2024, 5, 6, 8, 0)
+    assert rules.punch_type("alice", day) == PUNCH_IN
+    rules.record("alice", PUNCH_IN, day)
+    assert rules.punch_type("alice", day.replace(hour=17)) == PUNCH_OUT
+    rules.record("alice", PUNCH_OUT, day.replace(hour=17))
+    assert rules.punch_type("alice", day.replace(hour=18)) == PUNCH_IN
+    assert rules.punch_type("alice", datetime(2024, 5, 7, 8, 0)) == PUNCH_IN
+    rules.record("alice", PUNCH_IN, datetime(2024, 5, 6, 23, 0))
+    assert rules.punch_type("alice", datetime(2024, 5, 7, 8, 0)) == PUNCH_IN
+    print("✓ Alternating In/Out, first punch of a day is In")
+
+    timed = PunchRules("schedule", [("05:00", PUNCH_IN), ("11:30", PUNCH_OUT)])
+    assert timed.punch_type("bob", day) == PUNCH_IN
+    assert timed.punch_type("bob", day.replace(hour=11, minute=30)) == PUNCH_OUT
+    assert timed.punch_type("bob", day.replace(hour=2)) == PUNCH_OUT
+    print("✓ Time-of-day schedule")
+
+    auto = AutoPuncher(PunchRules(), frames=3, consensus_threshold=0.6, min_frames=2,
+                       dedup_window=120.0, rate_window=60.0)
+    auto.started = 0.0
+    for i in range(30):  # One person every 2 s
+        key, now = f"track{i}", i * 2.0
+        auto.add(key, f"person{i}", 0.9, 0.9, now=now)
+        name, _, _, punch_type = auto.add(key, f"person{i}", 0.9, 0.9, now=now + 0.5)
+        auto.accepted(key, name, punch_type, now=now + 0.5)
+    assert auto.punches == 30
+    assert abs(auto.people_per_minute(now=58.5) - 30.0) < 1e-9
+    assert auto.time_to_punch == [0.5] * 30
+    print(f"✓ {auto.report(now=60.0)}")
+
+    print("\n✅ PASS: Rules and throughput")
+
+
+def main():
+    """Run all tests"""
+    tests = [
+        ("Track consensus", test_track_consensus),
+        ("Rules and throughput", test_rules_and_throughput),
+    ]
+
+    results = []
+    for test_name, test_func in tests:
+        try:
+            test_func()
+            results.append((test_name, True))
+        except Exception as e:
+            print(f"\n❌ FAIL: {e}")
+            results.append((test_name, False))
+
+    print("\n" + "="*70)
+    print("TEST SUMMARY")
+    print("="*70)
+    for test_name, passed in results:
+        print(f"{'✅ PASS' if passed else '❌ FAIL'}: {test_name}")
+
+    return all(passed for _, passed in results)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Frame Source Tests
+Checks the recorded/synthetic frame sources that stand in for a webcam.
+"""
+
+import sys
+import os
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '.'))
+
+from src.camera import SyntheticSource, get_camera, open_source
+
+
+def test_replay_sources():
+    """Synthetic frames are deterministic; recordings replay, loop and pace"""
+    print("\n" + "="*70)
+    print("TEST: Frame sources")
+    print("="*70)
+
+    a = SyntheticSource(160, 120, num_frames=4, realtime=False)
+    b = open_source("synthetic:160x120@30", realtime=False)
+    for _ in range(4):
+        ok_a, frame_a = a.read()
+        ok_b, frame_b = b.read()
+        assert ok_a and ok_b and np.array_equal(frame_a, frame_b)
+    assert a.read() == (False, None)
+    print("✓ Synthetic source is deterministic and ends after num_frames")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for i in range(3):
+            cv2.imwrite(os.path.join(tmp, f"{i:03d}.png"), a.frame_at(i))
+        folder = get_camera(tmp, realtime=False)
+        assert [folder.read()[0] for _ in range(4)] == [True, True, True, False]
+        looped = get_camera(f"images:{tmp}", realtime=False, loop=True)
+        assert all(looped.read()[0] for _ in range(7))
+        print("✓ Image folder replays in order and loops")
+
+        paced = open_source(f"images:{tmp}", realtime=True, loop=True)
+        paced.fps = 50.0
+        start = time.perf_counter()
+        for _ in range(6):
+            paced.read()
+        assert time.perf_counter() - start >= 5 / 50.0 * 0.9
+        print("✓ Real-time replay is paced at the source frame rate")
+
+        try:
+            get_camera(os.path.join(tmp, "missing.mp4"))
+            assert False, "Expected RuntimeError"
+        except RuntimeError:
+            pass
+        print("✓ Missing recording raises RuntimeError")
+
+    print("\n✅ PASS: Frame sources")
+
+
+def main():
+    """Run all tests"""
+    tests = [
+        ("Frame sources", test_replay_sources),
+    ]
+
+    results = []
+    for test_name, test_func in tests:
+        try:
+            test_func()
+            results.append((test_name, True))
+        except Exception as e:
+            print(f"\n❌ FAIL: {e}")
+            results.append((test_name, False))
+
+    print("\n" + "="*70)
+    print("TEST SUMMARY")
+    print("="*70)
+    for test_name, passed in results:
+        print(f"{'✅ PASS' if passed else '❌ FAIL'}: {test_name}")
+
+    return all(passed for _, passed in results)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
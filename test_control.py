@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Control Channel Tests
+Checks the headless command socket against a stand-in live loop.
+"""
+
+import sys
+import os
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '.'))
+
+from src.control import ControlChannel, parse_address, send
+from src.jobs import BackgroundJob
+
+
+def test_command_round_trip():
+    """Commands reach the loop; punches answer with the job result"""
+    print("\n" + "="*70)
+    print("TEST: Control channel round trip")
+    print("="*70)
+
+    assert parse_address("127.0.0.1:7870") == ("127.0.0.1", 7870)
+    assert parse_address(":7870") == ("127.0.0.1", 7870)
+    assert parse_address("/run/kiosk.sock") == "/run/kiosk.sock"
+    print("✓ TCP and Unix socket addresses")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        address = os.path.join(tmp, "control.sock")
+        channel = ControlChannel(address, timeout=5.0).start()
+        stop = threading.Event()
+        seen = []
+
+        def live_loop():
+            # Executes commands between frames, like FaceAttendanceSystem.run
+            while not stop.is_set():
+                for command in channel.poll():
+                    seen.append(command.words)
+                    if command.name == "in":
+                        job = BackgroundJob("Punch-In", lambda: job.report("Punch-In ACCEPTED - alice",
+                                                                           1.0, "ok"))
+                        command.reply(True, job=job.start())
+                    else:
+                        command.reply(False, f"unknown command '{command.name}'")
+                time.sleep(0.01)
+
+        loop = threading.Thread(target=live_loop)
+        loop.start()
+        try:
+            assert send(address, "in") == "OK Punch-In ACCEPTED - alice"
+            assert send(address, "jump now") == "ERR unknown command 'jump'"
+            assert seen == [["in"], ["jump", "now"]]
+            print("✓ Punch replies carry the finished job's status")
+        finally:
+            stop.set()
+            loop.join()
+            channel.stop()
+        assert not os.path.exists(address)
+        print("✓ Socket removed on stop")
+
+    print("\n✅ PASS: Control channel round trip")
+
+
+def main():
+    """Run all tests"""
+    tests = [
+        ("Control channel round trip", test_command_round_trip),
+    ]
+
+    results = []
+    for test_name, test_func in tests:
+        try:
+            test_func()
+            results.append((test_name, True))
+        except Exception as e:
+            print(f"\n❌ FAIL: {e}")
+            results.append((test_name, False))
+
+    print("\n" + "="*70)
+    print("TEST SUMMARY")
+    print("="*70)
+    for test_name, passed in results:
+        print(f"{'✅ PASS' if passed else '❌ FAIL'}: {test_name}")
+
+    return all(passed for _, passed in results)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Crop Store Tests
+Checks the enrollment crop pack file used for gallery migration.
+"""
+
+import sys
+import os
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '.'))
+
+from src.crop_store import CropStore, decode_crop
+
+
+def make_crops(count, seed=0):
+    """Smooth random 96x96 BGR crops (JPEG-friendly)."""
+    rng = np.random.default_rng(seed)
+    crops = []
+    for _ in range(count):
+        small = rng.integers(0, 256, size=(6, 6, 3)).astype(np.uint8)
+        crops.append(np.kron(small, np.ones((16, 16, 1), dtype=np.uint8)))
+    return crops
+
+
+def test_latest_session_wins():
+    """Re-enrollment supersedes older crops; torn tails are recovered"""
+    print("\n" + "="*70)
+    print("TEST: Crop pack sessions")
+    print("="*70)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = CropStore(os.path.join(tmp, "crops.pack"))
+        assert store.index() == {} and store.crops("alice") == []
+
+        first = make_crops(3, seed=1)
+        store.add("alice", first)
+        store.add("bob", make_crops(2, seed=2))
+        crops = store.crops("alice")
+        assert len(crops) == 3 and crops[0].shape == first[0].shape
+        assert np.abs(crops[0].astype(int) - first[0]).mean() < 8  # JPEG is lossy
+        print("✓ Crops round-trip through JPEG")
+
+        time.sleep(0.01)  # Distinct session id
+        store.add("alice", make_crops(4, seed=3))
+        assert len(store.crops("alice")) == 4 and len(store.crops("bob")) == 2
+        print("✓ Latest enrollment session wins")
+
+        # Simulate a crash mid-append, then keep using the pack
+        with open(store.path, "ab") as f:
+            f.write(b"FCRP\x00\x01")
+        assert sorted(store.index()) == ["alice", "bob"]
+        store.add("carol", make_crops(1, seed=4))
+        assert sorted(store.index()) == ["alice", "bob", "carol"]
+        assert decode_crop(store.read(store.index()["carol"])[0]) is not None
+        print("✓ Torn tail ignored and cut before the next append")
+
+    print("\n✅ PASS: Crop pack sessions")
+
+
+def main():
+    """Run all tests"""
+    tests = [
+        ("Crop pack sessions", test_latest_session_wins),
+    ]
+
+    results = []
+    for test_name, test_func in tests:
+        try:
+            test_func()
+            results.append((test_name, True))
+        except Exception as e:
+            print(f"\n❌ FAIL: {e}")
+            results.append((test_name, False))
+
+    print("\n" + "="*70)
+    print("TEST SUMMARY")
+    print("="*70)
+    for test_name, passed in results:
+        print(f"{'✅ PASS' if passed else '❌ FAIL'}: {test_name}")
+
+    return all(passed for _, passed in results)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
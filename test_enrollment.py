@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Enrollment Tests
+Checks sample selection during registration (quality screening, near-
+duplicate spares, top-up) and that batched embeddings match single ones.
+"""
+
+import sys
+import os
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '.'))
+
+from src.enrollment import EnrollmentSelector
+from src.liveness import liveness
+
+
+def face(seed, size=96):
+    """Sharp, high-contrast crop that passes the liveness check."""
+    return np.random.default_rng(seed).integers(0, 255, (size, size, 3), dtype=np.uint8)
+
+
+def near(crop, seed):
+    """Near-duplicate of a crop (sensor noise only)."""
+    noise = np.random.default_rng(seed).integers(-2, 3, crop.shape)
+    return np.clip(crop.astype(int) + noise, 0, 255).astype(np.uint8)
+
+
+def flat(crop):
+    """Same picture at low contrast: still sharp, fails liveness."""
+    return np.clip((crop.astype(float) - 128) * 0.15 + 128, 0, 255).astype(np.uint8)
+
+
+def test_screening():
+    """Small, blurry and non-live crops are rejected with their reason"""
+    print("\n" + "="*70)
+    print("TEST: Sample screening")
+    print("="*70)
+
+    selector = EnrollmentSelector(max_samples=5, min_samples=3, duplicate_similarity=0.95,
+                                  min_face_size=60, min_sharpness=30.0, min_liveness=0.75)
+    assert selector.add(face(0, size=40)) == "low_quality"
+    assert selector.add(cv2.GaussianBlur(face(1), (31, 31), 10)) == "low_quality"
+    assert selector.add(flat(face(2))) == "low_quality"
+    assert selector.rejections == {"too small": 1, "blurry": 1, "liveness": 1}
+    assert selector.rejected_quality == 3 and not selector.selected
+    print(f"✓ Rejected by reason: {dict(selector.rejections)}")
+
+    for seed in range(10, 15):
+        assert selector.add(face(seed)) == "selected"
+    assert selector.full and len(selector.samples()) == 5
+    print("✓ Distinct crops selected until max_samples")
+
+    print("\n✅ PASS: Sample screening")
+
+
+def test_spares_pass_liveness():
+    """Only near-duplicates that pass every check can top up the selection"""
+    print("\n" + "="*70)
+    print("TEST: Near-duplicate spares")
+    print("="*70)
+
+    selector = EnrollmentSelector(max_samples=10, min_samples=4, duplicate_similarity=0.95,
+                                  min_face_size=60, min_sharpness=30.0, min_liveness=0.75)
+    base = face(0)
+    assert selector.add(base) == "selected"
+    for i in range(5):
+        assert selector.add(flat(near(base, i))) == "low_quality"
+    assert not selector.ready and selector.samples() == [selector.selected[0]]
+    print("✓ Near-duplicates failing liveness are not kept as spares")
+
+    for i in range(5):
+        assert selector.add(near(base, 100 + i)) == "duplicate"
+    assert selector.rejected_duplicate == 5 and selector.ready
+    samples = selector.samples()
+    assert len(samples) == 4 and len(selector.selected) == 1
+    assert all(liveness(sample) >= 0.75 for sample in samples)
+    print("✓ Top-up spares all passed liveness")
+
+    print("\n✅ PASS: Near-duplicate spares")
+
+
+def test_batched_embeddings():
+    """get_embeddings gives the same vectors as get_embedding one by one"""
+    print("\n" + "="*70)
+    print("TEST: Batched embeddings")
+    print("="*70)
+
+    from src.embedding_model import get_embedding, get_embeddings
+
+    crops = [face(seed, size=120 + 10 * seed) for seed in range(4)]
+    batch = get_embeddings(crops)
+    assert batch.shape == (4, 512)
+    for crop, row in zip(crops, batch):
+        assert np.allclose(get_embedding(crop), row, atol=1e-4)
+    assert get_embeddings([]).shape == (0, 512)
+    print("✓ One forward pass of 4 crops == 4 single passes; empty batch is (0, 512)")
+
+    print("\n✅ PASS: Batched embeddings")
+
+
+def main():
+    """Run all tests"""
+    tests = [
+        ("Sample screening", test_screening),
+        ("Near-duplicate spares", test_spares_pass_liveness),
+        ("Batched embeddings", test_batched_embeddings),
+    ]
+
+    results = []
+    for test_name, test_func in tests:
+        try:
+            test_func()
+            results.append((test_name, True))
+        except Exception as e:
+            print(f"\n❌ FAIL: {e}")
+            results.append((test_name, False))
+
+    print("\n" + "="*70)
+    print("TEST SUMMARY")
+    print("="*70)
+    for test_name, passed in results:
+        print(f"{'✅ PASS' if passed else '❌ FAIL'}: {test_name}")
+
+    return all(passed for _, passed in results)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
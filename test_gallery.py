@@ -0,0 +1,556 @@
+#!/usr/bin/env python3
+"""
+Gallery Tests
+Checks multi-template matching against a brute-force cosine scan.
+"""
+
+import sys
+import os
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '.'))
+
+from src.gallery import Gallery, kmeans_templates
+from src.recognition import recognize_single, recognize_consensus
+
+
+def make_db(num_users=50, dim=64, seed=0):
+    """Random database mixing single-vector and multi-template users."""
+    rng = np.random.default_rng(seed)
+    db = {}
+    for i in range(num_users):
+        k = 1 + i % 4
+        value = rng.normal(size=(k, dim)) if k > 1 else rng.normal(size=dim)
+        db[f"user{i}"] = value
+    return db
+
+
+def brute_force(embedding, db):
+    """Reference: max cosine over each user's templates, linear scan."""
+    best_name, best_score = None, 0.0
+    q = embedding / np.linalg.norm(embedding)
+    for name, value in db.items():
+        for t in np.atleast_2d(value):
+            score = float(q @ (t / np.linalg.norm(t)))
+            if score > best_score:
+                best_name, best_score = name, score
+    return best_name, best_score
+
+
+def test_max_over_templates():
+    """Segmented max equals brute-force scan"""
+    print("\n" + "="*70)
+    print("TEST: Gallery max-over-templates")
+    print("="*70)
+
+    db = make_db()
+    gallery = Gallery.from_db(db)
+    rng = np.random.default_rng(1)
+
+    print(f"✓ {len(gallery)} identities, {gallery.num_templates} templates")
+    assert len(gallery) == len(db)
+
+    for _ in range(100):
+        target = db[f"user{rng.integers(len(db))}"]
+        query = np.atleast_2d(target)[0] + rng.normal(scale=0.5, size=64)
+        name, score = gallery.best(query)
+        ref_name, ref_score = brute_force(query, db)
+        assert name == ref_name and abs(score - ref_score) < 1e-4
+
+    queries = rng.normal(size=(10, 64))
+    batch = gallery.best_batch(queries)
+    for query, (name, score) in zip(queries, batch):
+        assert gallery.best(query)[0] == name
+
+    print("✓ best() and best_batch() agree with brute force")
+    print("\n✅ PASS: Multi-template scoring correct")
+
+
+def test_recognition_contracts():
+    """recognize_single / recognize_consensus keep their return contracts"""
+    print("\n" + "="*70)
+    print("TEST: Recognition return contracts")
+    print("="*70)
+
+    db = make_db(num_users=5)
+    query = np.atleast_2d(db["user2"])[0]
+
+    assert recognize_single(query, {}) == (None, 0.0)
+    name, score = recognize_single(query, db, threshold=0.9)
+    assert name == "user2" and score > 0.99
+    assert recognize_single(query, Gallery.from_db(db), threshold=0.9)[0] == "user2"
+    name, score = recognize_single(-query, db, threshold=0.9)
+    assert name is None
+    print("✓ recognize_single works with dict and Gallery")
+
+    final_name, avg_sim, consensus, matches = recognize_consensus([query] * 3, db, 0.9, 0.6)
+    assert final_name == "user2" and consensus == 1.0 and len(matches) == 3
+    print("✓ recognize_consensus returns (name, avg_sim, consensus, frame_matches)")
+
+    print("\n✅ PASS: Return contracts preserved")
+
+
+def test_kmeans_templates():
+    """k-means summarizes clustered embeddings with one template per cluster"""
+    print("\n" + "="*70)
+    print("TEST: k-means templates")
+    print("="*70)
+
+    rng = np.random.default_rng(2)
+    centers = rng.normal(size=(3, 32))
+    points = np.concatenate([c + rng.normal(scale=0.05, size=(10, 32)) for c in centers])
+
+    templates = kmeans_templates(points, 3)
+    assert templates.shape == (3, 32)
+    assert np.allclose(np.linalg.norm(templates, axis=1), 1.0, atol=1e-5)
+    unit_centers = centers / np.linalg.norm(centers, axis=1, keepdims=True)
+    assert np.all(np.max(unit_centers @ templates.T, axis=1) > 0.99)
+    assert kmeans_templates(points[:2], 5).shape == (2, 32)
+
+    print("✓ One unit-norm template per cluster")
+    print("\n✅ PASS: k-means templates")
+
+
+def test_pq_gallery():
+    """PQ gallery with exact re-ranking finds the same identities"""
+    print("\n" + "="*70)
+    print("TEST: Product-quantized gallery")
+    print("="*70)
+
+    from src.pq import PQGallery
+
+    db = make_db(num_users=300, dim=64)
+    exact = Gallery.from_db(db)
+    pq = PQGallery.from_gallery(exact, num_subspaces=8, num_centroids=64, rerank=10)
+
+    assert pq.codes.shape == (exact.num_templates, 8) and pq.codes.dtype == np.uint8
+    print(f"✓ {exact.templates.nbytes} bytes -> {pq.codes.nbytes} bytes of codes")
+
+    rng = np.random.default_rng(3)
+    agree = 0
+    for _ in range(100):
+        target = db[f"user{rng.integers(len(db))}"]
+        query = np.atleast_2d(target)[0] + rng.normal(scale=0.3, size=64)
+        name, score = pq.best(query)
+        exact_name, exact_score = exact.best(query)
+        agree += name == exact_name
+        if name == exact_name:
+            assert abs(score - exact_score) < 1e-4  # Re-ranked score is exact
+    print(f"✓ Recall@1 vs exact search: {agree}/100")
+    assert agree >= 95
+
+    print("\n✅ PASS: PQ gallery")
+
+
+def test_quantized_gallery():
+    """float16 / int8 galleries score within quantization error of exact"""
+    print("\n" + "="*70)
+    print("TEST: Reduced-precision gallery")
+    print("="*70)
+
+    from src.gallery import QuantizedGallery
+
+    db = make_db(num_users=300, dim=64)
+    exact = Gallery.from_db(db)
+    rng = np.random.default_rng(4)
+    queries = np.stack([np.atleast_2d(db[f"user{i}"])[0] for i in rng.integers(300, size=50)])
+    queries = queries + rng.normal(scale=0.3, size=queries.shape)
+    reference = exact.scores_batch(queries)
+
+    for precision, tolerance in (("float16", 1e-3), ("int8", 2e-2)):
+        gallery = QuantizedGallery.from_gallery(exact, precision)
+        gallery.chunk = 100  # Exercise multiple chunks
+        scores = gallery.scores_batch(queries)
+        assert np.max(np.abs(scores - reference)) < tolerance
+        assert np.array_equal(np.argmax(scores, axis=1), np.argmax(reference, axis=1))
+        print(f"✓ {precision}: {exact.templates.nbytes} -> {gallery.nbytes} bytes, "
+              f"max error {np.max(np.abs(scores - reference)):.5f}")
+
+    print("\n✅ PASS: Reduced-precision gallery")
+
+
+def test_pca_projection():
+    """PCA keeps inner products of low-rank data and projected search agrees"""
+    print("\n" + "="*70)
+    print("TEST: PCA projection")
+    print("="*70)
+
+    from src.gallery import build_gallery, normalize
+    from src.pca import PCAProjection, ProjectedGallery
+
+    rng = np.random.default_rng(5)
+    basis = np.linalg.qr(rng.normal(size=(128, 16)))[0].T
+    db = {f"user{i}": rng.normal(size=(2, 16)) @ basis for i in range(100)}
+    exact = Gallery.from_db(db)
+
+    projection = PCAProjection(16).fit(exact.templates)
+    assert projection.matrix.shape == (128, 16)
+    assert projection.explained.sum() > 0.999
+    projected = projection.transform(exact.templates)
+    assert np.allclose(projected @ projected.T, exact.templates @ exact.templates.T, atol=1e-4)
+    print(f"✓ 128 -> 16-D keeps {projection.explained.sum():.4f} of energy, cosines preserved")
+
+    gallery = build_gallery(db, "exact", projection=projection)
+    assert isinstance(gallery, ProjectedGallery)
+    queries = np.stack([db[f"user{i}"][0] for i in range(20)])
+    assert [n for n, _ in gallery.best_batch(queries)] == [f"user{i}" for i in range(20)]
+    assert PCAProjection(64).fit(exact.templates[:10]).dim == 10
+    print("✓ Projected gallery finds the same identities")
+
+    # Lossy projection of noisy templates: re-normalizing inflates scores,
+    # the fitted calibration maps them back to the original scale
+    basis = np.linalg.qr(rng.normal(size=(128, 24)))[0].T
+    centers = normalize((rng.normal(size=(300, 24)) + 0.5) @ basis)
+    templates = centers.repeat(3, axis=0) + rng.normal(scale=0.04, size=(900, 128))
+    labels = np.arange(900) // 3
+    gallery = Gallery.from_db({f"user{i}": templates[3 * i:3 * i + 3] for i in range(300)})
+    projection = PCAProjection(8).fit(gallery.templates, labels=labels)
+    pairs = [(i, i + 1) for i in range(0, 900, 3)] + [(i, i + 3) for i in range(0, 897, 3)]
+    original = np.array([gallery.templates[i] @ gallery.templates[j] for i, j in pairs])
+    projected = projection.transform(gallery.templates)
+    raw = np.array([projected[i] @ projected[j] for i, j in pairs])
+    mapped = projection.calibrate(raw)
+    genuine, impostor = slice(0, 300), slice(300, None)
+    assert raw[impostor].mean() - original[impostor].mean() > 0.1
+    assert abs(mapped[impostor].mean() - original[impostor].mean()) < 0.03
+    assert abs(mapped[genuine].mean() - original[genuine].mean()) < 0.03
+    print(f"✓ Impostor scores {original[impostor].mean():.2f} -> raw {raw[impostor].mean():.2f}"
+          f" -> calibrated {mapped[impostor].mean():.2f}; genuine {original[genuine].mean():.2f}"
+          f" -> {raw[genuine].mean():.2f} -> {mapped[genuine].mean():.2f}")
+
+    import tempfile
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "pca.npz")
+        projection.save(path)
+        assert np.array_equal(PCAProjection.load(path).calibration, projection.calibration)
+        np.savez(path, mean=projection.mean, matrix=projection.matrix,
+                 explained=projection.explained, whiten=False, num_train=900)
+        legacy = PCAProjection.load(path)
+    assert not legacy.calibrated
+    try:
+        legacy.calibrate(raw)
+        assert False, "uncalibrated projection used"
+    except ValueError:
+        pass
+    print("✓ Calibration saved with the projection; a file without one is refused")
+
+    print("\n✅ PASS: PCA projection")
+
+
+def test_binary_gallery():
+    """Hamming prefilter + exact shortlist matches exact search"""
+    print("\n" + "="*70)
+    print("TEST: Binary-signature gallery")
+    print("="*70)
+
+    from src.binary_index import BinaryGallery, hamming_distances, popcount
+
+    words = np.array([0, 1, 2**63, 2**64 - 1], dtype=np.uint64)
+    assert popcount(words).tolist() == [0, 1, 1, 64]
+    sigs = np.array([[0, 0], [3, 2**64 - 1]], dtype=np.uint64).T
+    assert hamming_distances(sigs, np.array([1, 0], dtype=np.uint64)).tolist() == [1, 65]
+
+    db = make_db(num_users=300, dim=64)
+    exact = Gallery.from_db(db)
+    gallery = BinaryGallery.from_gallery(exact, bits=128, shortlist=30)
+    assert gallery.signatures.shape == (2, exact.num_templates)
+
+    rng = np.random.default_rng(6)
+    agree = 0
+    for _ in range(100):
+        target = db[f"user{rng.integers(len(db))}"]
+        query = np.atleast_2d(target)[0] + rng.normal(scale=0.3, size=64)
+        name, score = gallery.best(query)
+        exact_name, exact_score = exact.best(query)
+        agree += name == exact_name
+        if name == exact_name:
+            assert abs(score - exact_score) < 1e-4  # Shortlist scores are exact
+    print(f"✓ Recall@1 vs exact search: {agree}/100")
+    assert agree >= 95
+
+    print("\n✅ PASS: Binary-signature gallery")
+
+
+def test_sharded_gallery():
+    """Scatter-gather over shard processes equals single-process search"""
+    print("\n" + "="*70)
+    print("TEST: Sharded gallery")
+    print("="*70)
+
+    import tempfile
+    from src.sharding import ShardedGallery, shard_of
+
+    db = make_db(num_users=60, dim=32)
+    exact = Gallery.from_db(db)
+    rng = np.random.default_rng(7)
+    queries = rng.normal(size=(8, 32))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "embeddings.npy")
+        np.save(path, db)
+        gallery = ShardedGallery(3, path, timeout=60.0)
+        try:
+            assert sorted(gallery.names) == sorted(db) and "user5" in gallery
+            assert {shard_of(n, 3) for n in db} == {0, 1, 2}
+            print(f"✓ {len(gallery)} identities across 3 shard processes")
+
+            assert gallery.top_k_batch(queries, 5) == exact.top_k_batch(queries, 5)
+            assert gallery.best_batch(queries) == exact.best_batch(queries)
+            print("✓ Merged top-k equals single-process search")
+
+            # A dead shard is restarted on the next query; others keep running
+            others = [gallery._shards[i].process.pid for i in (0, 2)]
+            gallery._shards[1].process.kill()
+            gallery._shards[1].process.join()
+            assert gallery.top_k_batch(queries, 5) == exact.top_k_batch(queries, 5)
+            assert [gallery._shards[i].process.pid for i in (0, 2)] == others
+            print("✓ Killed shard restarted independently")
+
+            db["newcomer"] = queries[0]
+            np.save(path, db)
+            gallery.reload(["newcomer"])
+            assert gallery.best(queries[0])[0] == "newcomer"
+            print("✓ Reload picks up an enrolled identity")
+        finally:
+            gallery.close()
+
+    print("\n✅ PASS: Sharded gallery")
+
+
+def test_shared_gallery():
+    """Published generations are memory-mapped and switched atomically"""
+    print("\n" + "="*70)
+    print("TEST: Shared gallery generations")
+    print("="*70)
+
+    import tempfile
+    from src.shared_gallery import SharedGalleryStore, db_view
+
+    db = make_db(num_users=20, dim=16)
+    with tempfile.TemporaryDirectory() as tmp:
+        writer = SharedGalleryStore(tmp, keep=1)
+        reader = SharedGalleryStore(tmp)
+        assert reader.generation is None and len(reader.load()) == 0
+
+        writer.publish(db)
+        assert reader.changed() and not reader.changed()
+        first = reader.load()
+        assert first.generation == 1 and isinstance(first.templates, np.memmap)
+        query = np.atleast_2d(db["user3"])[0]
+        assert first.best(query)[0] == "user3"
+        print("✓ Reader maps generation 1 read-only")
+
+        updated = db_view(first)
+        updated["newcomer"] = -query
+        writer.publish(updated)
+        writer.publish(updated)  # Generation 1 is collected (keep=1)
+        assert reader.changed() and reader.generation == 3
+        latest = reader.load()
+        assert latest.best(-query)[0] == "newcomer" and len(latest) == 21
+        assert first.best(query)[0] == "user3"  # Old mapping still valid
+        print("✓ New generation picked up; old mapping stays readable")
+
+        # Two kiosks enroll without having seen each other's generation
+        kiosk_a, kiosk_b = SharedGalleryStore(tmp, keep=1), SharedGalleryStore(tmp, keep=1)
+        kiosk_a.update({"alice": query})
+        merged = kiosk_b.update({"bob": -query}, removals=["user0"])
+        assert {"alice", "bob", "newcomer"} <= set(merged.names) and "user0" not in merged
+        assert len(merged) == 22 and merged.generation == 5
+        print("✓ update() applies each change to the newest generation")
+
+        with kiosk_a.writer():
+            try:
+                with kiosk_b.writer(timeout=0.05):
+                    assert False, "second writer got the lock"
+            except TimeoutError:
+                pass
+            with kiosk_a.writer():  # Re-entrant in one process
+                kiosk_a.update({"carol": query})
+        with kiosk_b.writer(timeout=0.05):
+            pass
+        open(os.path.join(tmp, "WRITER.lock"), "w").close()  # Left by a crashed writer
+        os.utime(os.path.join(tmp, "WRITER.lock"), (0, 0))
+        assert "carol" in kiosk_b.update({"dave": query})
+        print("✓ Writers exclude each other; a stale lock is broken")
+
+    print("\n✅ PASS: Shared gallery generations")
+
+
+def test_database_update():
+    """Concurrent savers keep each other's users (read-modify-write under a lock)"""
+    print("\n" + "="*70)
+    print("TEST: Database file updates")
+    print("="*70)
+
+    import tempfile
+    import threading
+    from src import database
+
+    saved_path = database.EMBEDDINGS_PATH
+    with tempfile.TemporaryDirectory() as tmp:
+        database.EMBEDDINGS_PATH = os.path.join(tmp, "embeddings.npy")
+        try:
+            database.save_db({"existing": np.ones(4)})
+
+            def enroll(kiosk):
+                for i in range(10):
+                    database.update_db({f"kiosk{kiosk}-user{i}": np.full(4, i, float)})
+
+            kiosks = [threading.Thread(target=enroll, args=(k,)) for k in range(3)]
+            for kiosk in kiosks:
+                kiosk.start()
+            for kiosk in kiosks:
+                kiosk.join()
+
+            db = database.update_db({"late": np.zeros(4)}, removals=["existing"])
+            assert len(db) == 31 and "existing" not in db
+            assert database.load_db().keys() == db.keys()
+            assert os.listdir(tmp) == ["embeddings.npy"]
+            print("✓ 30 concurrent enrollments kept; no lock or temp files left")
+        finally:
+            database.EMBEDDINGS_PATH = saved_path
+
+    print("\n✅ PASS: Database file updates")
+
+
+def test_incremental_update():
+    """updated() matches a full rebuild for every gallery kind"""
+    print("\n" + "="*70)
+    print("TEST: Incremental gallery updates")
+    print("="*70)
+
+    from src.binary_index import BinaryGallery
+    from src.database import diff_db
+    from src.gallery import QuantizedGallery
+    from src.pca import PCAProjection, ProjectedGallery
+    from src.pq import PQGallery
+
+    old_db = make_db(num_users=40, dim=32)
+    rng = np.random.default_rng(8)
+    new_db = dict(old_db)
+    del new_db["user1"], new_db["user7"]
+    new_db["user3"] = rng.normal(size=(2, 32))
+    new_db["newcomer"] = rng.normal(size=32)
+
+    upserts, removals = diff_db(old_db, new_db)
+    assert sorted(upserts) == ["newcomer", "user3"] and sorted(removals) == ["user1", "user7"]
+    print("✓ diff_db finds added, changed and removed users")
+
+    base = Gallery.from_db(old_db)
+    projection = PCAProjection(16).fit(base.templates)
+    quantizer = PQGallery.from_gallery(base, num_subspaces=4, num_centroids=16).quantizer
+    kinds = {
+        "exact": lambda g: g,
+        "int8": lambda g: QuantizedGallery.from_gallery(g, "int8"),
+        "binary": lambda g: BinaryGallery.from_gallery(g, bits=64, shortlist=200),
+        "pq": lambda g: PQGallery.from_gallery(g, quantizer=quantizer, rerank=5),
+    }
+    queries = rng.normal(size=(10, 32))
+    for kind, build in kinds.items():
+        updated = build(base).updated(upserts, removals)
+        rebuilt = build(Gallery.from_db(new_db))
+        order = [rebuilt.names.index(n) for n in updated.names]
+        assert sorted(updated.names) == sorted(rebuilt.names)
+        assert np.allclose(updated.scores_batch(queries), rebuilt.scores_batch(queries)[:, order],
+                           atol=1e-5)
+    print(f"✓ {', '.join(kinds)} updates match full rebuilds")
+
+    projected = ProjectedGallery(Gallery(base.names, projection.transform(base.templates),
+                                         base.offsets), projection)
+    updated = projected.updated(upserts, removals)
+    assert updated.best(new_db["newcomer"])[0] == "newcomer" and "user1" not in updated
+    assert "user1" in projected  # Old gallery untouched
+    print("✓ Projected gallery updates in the projected space")
+
+    print("\n✅ PASS: Incremental gallery updates")
+
+
+def test_pq_mapped_updates():
+    """Updates append to the mapped exact-template file instead of copying it"""
+    print("\n" + "="*70)
+    print("TEST: PQ mapped exact templates")
+    print("="*70)
+
+    import tempfile
+    from src.pq import PQGallery
+
+    db = make_db(num_users=60, dim=32)
+    rng = np.random.default_rng(9)
+    queries = rng.normal(size=(10, 32))
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "exact.npy")
+        first = PQGallery.from_gallery(Gallery.from_db(db), num_subspaces=4, num_centroids=16,
+                                       rerank=5, exact_path=path)
+        assert isinstance(first.exact_file, np.memmap) and first.templates is None
+        rows = len(first.exact_file)
+
+        upserts = {"newcomer": rng.normal(size=(2, 32)), "user3": rng.normal(size=32)}
+        second = first.updated(upserts, ["user1"])
+        assert isinstance(second.exact_file, np.memmap) and second.templates is None
+        assert len(second.exact_file) == rows + 3 and len(first.exact_file) == rows
+        assert list(second.rows[-3:]) == [rows, rows + 1, rows + 2]
+        print(f"✓ {rows} rows mapped, update appended 3 rows to the file")
+
+        new_db = dict(db, **upserts)
+        del new_db["user1"]
+        rebuilt = PQGallery.from_gallery(Gallery.from_db(new_db), quantizer=first.quantizer,
+                                         rerank=5)
+        order = [rebuilt.names.index(n) for n in second.names]
+        assert np.allclose(second.scores_batch(queries), rebuilt.scores_batch(queries)[:, order],
+                           atol=1e-5)
+        assert np.allclose(second.templates_of("user3"), rebuilt.templates_of("user3"))
+        assert first.best(np.atleast_2d(db["user1"])[0])[0] == "user1"  # Old gallery intact
+        print("✓ Scores match a full rebuild; the old gallery keeps its rows")
+
+        gallery, compactions = second, 0
+        for i in range(1500):  # Churn one user until the file is mostly dead rows
+            size = len(gallery.exact_file)
+            gallery = gallery.updated({"user5": rng.normal(size=(2, 32))})
+            compactions += len(gallery.exact_file) < size
+            assert len(gallery.exact_file) <= 2 * 1024 + 2
+        assert compactions >= 1 and gallery.num_templates == second.num_templates
+        assert np.allclose(gallery.templates_of("newcomer"), second.templates_of("newcomer"))
+        print(f"✓ Dead rows compacted {compactions}x ({len(gallery.exact_file)} rows on disk)")
+
+    print("\n✅ PASS: PQ mapped exact templates")
+
+
+def main():
+    """Run all tests"""
+    tests = [
+        ("Max over templates", test_max_over_templates),
+        ("Recognition contracts", test_recognition_contracts),
+        ("k-means templates", test_kmeans_templates),
+        ("PQ gallery", test_pq_gallery),
+        ("Reduced-precision gallery", test_quantized_gallery),
+        ("PCA projection", test_pca_projection),
+        ("Binary-signature gallery", test_binary_gallery),
+        ("Sharded gallery", test_sharded_gallery),
+        ("Shared gallery", test_shared_gallery),
+        ("Database file updates", test_database_update),
+        ("Incremental updates", test_incremental_update),
+        ("PQ mapped updates", test_pq_mapped_updates),
+    ]
+
+    results = []
+    for test_name, test_func in tests:
+        try:
+            test_func()
+            results.append((test_name, True))
+        except Exception as e:
+            print(f"\n❌ FAIL: {e}")
+            results.append((test_name, False))
+
+    print("\n" + "="*70)
+    print("TEST SUMMARY")
+    print("="*70)
+    for test_name, passed in results:
+        print(f"{'✅ PASS' if passed else '❌ FAIL'}: {test_name}")
+
+    return all(passed for _, passed in results)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
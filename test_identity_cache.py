@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Identity Cache Tests
+Checks that confidently identified tracks skip recognition until they are
+re-verified, lost, or their box jumps.
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '.'))
+
+from src.identity_cache import IdentityCache
+
+
+def test_skip_and_reverify():
+    """A confident track is answered from the cache until re-verification is due"""
+    print("\n" + "="*70)
+    print("TEST: Cached identities")
+    print("="*70)
+
+    cache = IdentityCache(reverify_after=2.0)
+    box = (100, 100, 80, 80)
+    assert cache.lookup(1, now=0.0) is None
+    cache.store(1, box, "alice", 0.91, 0.88, confident=True, now=0.0)
+
+    for i in range(1, 10):  # Small drift keeps the identity
+        box = (100 + i, 100, 80, 80)
+        cache.observe(1, box)
+        entry = cache.lookup(1, now=i * 0.2)
+        assert entry is not None and entry.prediction == ("alice", 0.91, 0.88)
+    print(f"✓ Recognition skipped while the track stays put ({cache.hits} hits)")
+
+    assert cache.lookup(1, now=2.0) is None
+    print("✓ Re-verification due after the interval")
+    cache.store(1, box, "alice", 0.90, 0.87, confident=True, now=2.0)
+    assert cache.lookup(1, now=2.5) is not None
+
+    cache.store(1, box, None, 0.4, 0.87, confident=False, now=4.0)
+    assert cache.lookup(1, now=4.1) is None and cache.invalidated == 1
+    print("✓ Failed re-verification drops the identity")
+
+    cache.store(2, box, "bob", 0.9, 0.9, confident=False, now=5.0)
+    assert cache.lookup(2, now=5.1) is None
+    print("✓ Unconfident results are never cached")
+    print(f"  {cache.report()}")
+
+    print("\n✅ PASS: Cached identities")
+
+
+def test_invalidation():
+    """Losing the track or a box jump drops its identity"""
+    print("\n" + "="*70)
+    print("TEST: Invalidation")
+    print("="*70)
+
+    cache = IdentityCache(reverify_after=10.0, max_jump=0.5, max_scale=1.5)
+    cache.store(1, (100, 100, 80, 80), "alice", 0.9, 0.9, confident=True, now=0.0)
+    cache.store(2, (300, 100, 80, 80), "bob", 0.9, 0.9, confident=True, now=0.0)
+
+    cache.observe(1, (160, 100, 80, 80))  # Centre moved 0.75 box widths
+    assert cache.lookup(1, now=1.0) is None
+    print("✓ Box jump drops the identity")
+
+    cache.observe(2, (290, 90, 100, 100))  # ~1.56x area
+    assert cache.lookup(2, now=1.0) is None
+    print("✓ Sudden scale change drops the identity")
+
+    cache.store(3, (100, 100, 80, 80), "carol", 0.9, 0.9, confident=True, now=0.0)
+    cache.observe(None, None, lost=[3])
+    assert cache.lookup(3, now=1.0) is None
+    print("✓ Lost track drops the identity")
+
+    print("\n✅ PASS: Invalidation")
+
+
+def test_concurrent_clear():
+    """clear() from another thread never breaks observe() mid-update"""
+    print("\n" + "="*70)
+    print("TEST: Concurrent clear")
+    print("="*70)
+
+    import threading
+
+    class Interleaved(IdentityCache):
+        """Runs clear() on another thread right between lookup and removal."""
+        def _jumped(self, old, new):
+            self.clearer = threading.Thread(target=self.clear)
+            self.clearer.start()
+            self.clearer.join(timeout=0.1)
+            return super()._jumped(old, new)
+
+    cache = Interleaved(reverify_after=10.0)
+    cache.store(1, (100, 100, 80, 80), "alice", 0.9, 0.9, confident=True, now=0.0)
+    cache.observe(1, (160, 100, 80, 80))  # Box jump: the entry is dropped
+    cache.clearer.join(timeout=1.0)
+    assert not cache.clearer.is_alive() and cache.lookup(1, now=1.0) is None
+    print("✓ A watcher-thread clear() waits for observe() instead of raising KeyError")
+
+    print("\n✅ PASS: Concurrent clear")
+
+
+def main():
+    """Run all tests"""
+    tests = [
+        ("Cached identities", test_skip_and_reverify),
+        ("Invalidation", test_invalidation),
+        ("Concurrent clear", test_concurrent_clear),
+    ]
+
+    results = []
+    for test_name, test_func in tests:
+        try:
+            test_func()
+            results.append((test_name, True))
+        except Exception as e:
+            print(f"\n❌ FAIL: {e}")
+            results.append((test_name, False))
+
+    print("\n" + "="*70)
+    print("TEST SUMMARY")
+    print("="*70)
+    for test_name, passed in results:
+        print(f"{'✅ PASS' if passed else '❌ FAIL'}: {test_name}")
+
+    return all(passed for _, passed in results)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
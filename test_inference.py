@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Inference Scheduler Tests
+Checks that crops from concurrent callers share forward passes, that lone
+requests are not delayed, and the batch size / queueing delay metrics.
+"""
+
+import sys
+import os
+import threading
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '.'))
+
+from src.inference import InferenceScheduler
+
+
+def fake_model(sizes, cost=0.01):
+    """Embedding stand-in: fixed cost per forward pass, row i = crop value."""
+    def infer(crops):
+        sizes.append(len(crops))
+        time.sleep(cost)
+        return np.array([[float(crop)] * 4 for crop in crops]).reshape(len(crops), 4)
+    return infer
+
+
+def test_concurrent_callers():
+    """Crops from many threads are batched; results go back to the right caller"""
+    print("\n" + "="*70)
+    print("TEST: Concurrent callers")
+    print("="*70)
+
+    sizes = []
+    scheduler = InferenceScheduler(fake_model(sizes), max_batch=8, max_wait=0.005)
+    results = {}
+
+    def caller(i):
+        results[i] = scheduler.submit(i).result()[0]
+
+    threads = [threading.Thread(target=caller, args=(i,)) for i in range(40)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == {i: float(i) for i in range(40)}
+    assert sum(sizes) == 40 and max(sizes) <= 8 and len(sizes) < 40
+    assert scheduler.items == 40 and scheduler.batches == len(sizes)
+    print(f"✓ 40 single-crop calls in {scheduler.batches} forward passes "
+          f"(mean batch {scheduler.mean_batch:.1f})")
+
+    batch = scheduler.run(list(range(20)))
+    assert batch.shape == (20, 4) and list(batch[:, 0]) == list(range(20))
+    assert scheduler.run([]).shape[0] == 0
+    print("✓ Blocking run() splits large requests by max_batch")
+
+    for line in scheduler.report():
+        print(f"  {line}")
+    scheduler.close()
+
+    print("\n✅ PASS: Concurrent callers")
+
+
+def test_lone_requests():
+    """One caller at a time is not held back by max_wait"""
+    print("\n" + "="*70)
+    print("TEST: Lone requests")
+    print("="*70)
+
+    sizes = []
+    scheduler = InferenceScheduler(fake_model(sizes, cost=0.0), max_batch=8, max_wait=0.2)
+    started = time.perf_counter()
+    for i in range(10):
+        scheduler.submit(i).result()
+    elapsed = time.perf_counter() - started
+    assert elapsed < 0.2 and sizes == [1] * 10
+    _, p50, p95 = scheduler.delay_ms()
+    assert p95 < 50
+    print(f"✓ 10 sequential requests in {elapsed * 1000:.1f} ms (queue delay p50 {p50:.2f} ms)")
+
+    fixed = InferenceScheduler(fake_model([], cost=0.0), max_batch=8, max_wait=0.05,
+                               adaptive_wait=False)
+    started = time.perf_counter()
+    fixed.submit(0).result()
+    assert time.perf_counter() - started >= 0.045
+    print("✓ Without adaptive wait a lone crop waits max_wait for company")
+    scheduler.close()
+    fixed.close()
+
+    print("\n✅ PASS: Lone requests")
+
+
+def test_errors():
+    """A failing forward pass fails the futures of that batch only"""
+    print("\n" + "="*70)
+    print("TEST: Errors")
+    print("="*70)
+
+    def infer(crops):
+        if "bad" in crops:
+            raise ValueError("broken crop")
+        return [len(crop) for crop in crops]
+
+    scheduler = InferenceScheduler(infer, max_batch=1)
+    bad, good = scheduler.submit("bad"), scheduler.submit("good")
+    try:
+        bad.result(timeout=2)
+        assert False, "error swallowed"
+    except ValueError:
+        pass
+    assert good.result(timeout=2) == 4
+    scheduler.close()
+    try:
+        scheduler.submit("late")
+        assert False, "closed scheduler accepted work"
+    except RuntimeError:
+        pass
+    print("✓ Errors reach their callers; a closed scheduler refuses work")
+
+    print("\n✅ PASS: Errors")
+
+
+def test_reconfigure():
+    """Configuring the shared pool and scheduler again (a second system) does not fail"""
+    print("\n" + "="*70)
+    print("TEST: Reconfigure")
+    print("="*70)
+
+    from src import workers
+
+    workers.configure_pool(2)
+    pool = workers.get_pool()
+    workers.configure_pool(2)
+    assert workers.get_pool() is pool
+    print("✓ Same pool size: the running pool is kept")
+
+    job = pool.submit(time.sleep, 0.05)
+    workers.configure_pool(3)
+    assert workers.get_pool() is not pool and workers.get_pool()._max_workers == 3
+    job.result(timeout=1.0)
+    print("✓ New size: the pool is replaced, submitted work still completes")
+
+    from src import inference
+
+    sizes = []
+    inference._scheduler = InferenceScheduler(fake_model(sizes, cost=0.0))
+    try:
+        inference.configure_inference(4, 0.01, adaptive_wait=False)
+        assert inference.get_scheduler().max_batch == 4
+        assert inference.get_scheduler().run(list(range(10))).shape == (10, 4)
+        assert max(sizes) <= 4
+    finally:
+        inference._scheduler.close()
+        inference._scheduler = None
+    print("✓ A running inference scheduler takes the new batching parameters")
+
+    print("\n✅ PASS: Reconfigure")
+
+
+def main():
+    """Run all tests"""
+    tests = [
+        ("Concurrent callers", test_concurrent_callers),
+        ("Lone requests", test_lone_requests),
+        ("Errors", test_errors),
+        ("Reconfigure", test_reconfigure),
+    ]
+
+    results = []
+    for test_name, test_func in tests:
+        try:
+            test_func()
+            results.append((test_name, True))
+        except Exception as e:
+            print(f"\n❌ FAIL: {e}")
+            results.append((test_name, False))
+
+    print("\n" + "="*70)
+    print("TEST SUMMARY")
+    print("="*70)
+    for test_name, passed in results:
+        print(f"{'✅ PASS' if passed else '❌ FAIL'}: {test_name}")
+
+    return all(passed for _, passed in results)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Background Job Tests
+Checks the latest-frame feed between the live loop and jobs (sequencing,
+timeout, close) and job status, cancellation and error reporting.
+"""
+
+import sys
+import os
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '.'))
+
+from src.jobs import FrameFeed, BackgroundJob
+
+
+def test_frame_feed():
+    """wait_next returns only newer frames, skips to the latest, ends on close"""
+    print("\n" + "="*70)
+    print("TEST: Frame feed")
+    print("="*70)
+
+    feed = FrameFeed()
+    assert feed.latest() is None
+    assert feed.wait_next(0, timeout=0.05) == (0, None)
+    print("✓ Timeout without frames returns (after_seq, None)")
+
+    feed.publish("f1", "face1", (0, 0, 10, 10), track_id=7)
+    seq, frame = feed.wait_next(0, timeout=1.0)
+    assert seq == 1 and frame.frame == "f1" and frame.track_id == 7 and frame.detected
+    assert feed.wait_next(seq, timeout=0.05) == (seq, None)
+    print("✓ A consumed frame is not returned twice")
+
+    feed.publish("f1b", "face1b", (0, 0, 10, 10), track_id=7, detected=False)
+    seq, frame = feed.wait_next(seq, timeout=1.0)
+    assert seq == 2 and frame.face == "face1b" and not frame.detected
+    print("✓ Carried-over crops are marked as not detected")
+
+    feed.publish("f2", "face2", None)
+    feed.publish("f3", "face3", None)
+    seq, frame = feed.wait_next(seq, timeout=1.0)
+    assert seq == 4 and frame.frame == "f3"
+    print("✓ A slow consumer skips to the newest frame")
+
+    received = []
+    consumer = threading.Thread(target=lambda: received.append(feed.wait_next(seq, timeout=5.0)))
+    consumer.start()
+    time.sleep(0.05)
+    feed.publish("f4", None, None)
+    consumer.join(timeout=1.0)
+    assert received and received[0][0] == 5
+    print("✓ A waiting consumer wakes on publish")
+
+    received = []
+    consumer = threading.Thread(target=lambda: received.append(feed.wait_next(5, timeout=5.0)))
+    consumer.start()
+    started = time.time()
+    feed.close()
+    consumer.join(timeout=1.0)
+    assert received == [(5, None)] and time.time() - started < 1.0
+    print("✓ close() releases waiting consumers with no frame")
+
+    print("\n✅ PASS: Frame feed")
+
+
+def test_background_job():
+    """Status, cancellation and errors are reported to the overlay"""
+    print("\n" + "="*70)
+    print("TEST: Background job")
+    print("="*70)
+
+    def flow(job, steps):
+        for i in range(steps):
+            if job.cancelled:
+                job.report("Cancelled", level="warn")
+                return
+            job.report(f"Step {i + 1}/{steps}", progress=(i + 1) / steps)
+            time.sleep(0.01)
+        job.report("Done", level="ok")
+
+    job = BackgroundJob("Punch", lambda: flow(job, 3))
+    assert job.status == "Punch..." and job.progress == 0.0 and not job.running
+    job.start().join(timeout=2.0)
+    assert not job.running and job.status == "Done" and job.level == "ok"
+    assert job.progress == 1.0 and job.finished_at is not None and job.error is None
+    print("✓ Progress and final status reported")
+
+    job.report("Clamped", progress=1.7)
+    assert job.progress == 1.0 and job.level == "ok"
+    print("✓ Progress clamped, level kept when not given")
+
+    slow = BackgroundJob("Register", lambda: flow(slow, 1000))
+    slow.start()
+    time.sleep(0.03)
+    slow.cancel()
+    slow.join(timeout=2.0)
+    assert not slow.running and slow.status == "Cancelled" and slow.progress < 1.0
+    print("✓ cancel() stops the flow at its next check")
+
+    def broken():
+        raise ValueError("camera gone")
+
+    failed = BackgroundJob("Punch", broken).start()
+    failed.join(timeout=2.0)
+    assert isinstance(failed.error, ValueError) and failed.level == "warn"
+    assert failed.status == "Punch failed: camera gone" and failed.finished_at is not None
+    print("✓ Exceptions end the job with a failure status")
+
+    print("\n✅ PASS: Background job")
+
+
+def main():
+    """Run all tests"""
+    tests = [
+        ("Frame feed", test_frame_feed),
+        ("Background job", test_background_job),
+    ]
+
+    results = []
+    for test_name, test_func in tests:
+        try:
+            test_func()
+            results.append((test_name, True))
+        except Exception as e:
+            print(f"\n❌ FAIL: {e}")
+            results.append((test_name, False))
+
+    print("\n" + "="*70)
+    print("TEST SUMMARY")
+    print("="*70)
+    for test_name, passed in results:
+        print(f"{'✅ PASS' if passed else '❌ FAIL'}: {test_name}")
+
+    return all(passed for _, passed in results)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Motion Gate Tests
+Checks that detection idles on a static scene and wakes on the first motion.
+"""
+
+import sys
+import os
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '.'))
+
+from src.motion import MotionGate
+from src.camera import SyntheticSource
+
+
+def test_idle_and_wake():
+    """Static scene idles; the first moving frame wakes the pipeline"""
+    print("\n" + "="*70)
+    print("TEST: Motion gate")
+    print("="*70)
+
+    rng = np.random.default_rng(0)
+    scene = SyntheticSource(320, 240, seed=1).frame_at(0)
+    gate = MotionGate(idle_after=2.0)
+    fps = 10.0
+
+    def noisy():
+        noise = rng.integers(-3, 4, size=scene.shape)
+        return np.clip(scene.astype(int) + noise, 0, 255).astype(np.uint8)
+
+    t = 0.0
+    for _ in range(50):  # 5 s of an empty, slightly noisy scene
+        active = gate.update(noisy(), now=t)
+        t += 1 / fps
+    assert not active and 0.5 < gate.idle_fraction < 0.7
+    print(f"✓ Idle after {gate.idle_after:.0f}s without motion "
+          f"({gate.idle_fraction:.0%} of frames skipped)")
+
+    person = noisy()
+    person[60:200, 120:220] = (90, 120, 160)
+    assert gate.update(person, now=t) and gate.woke and gate.wakeups == 1
+    assert gate.update(noisy(), now=t + 0.1) and not gate.woke
+    print("✓ Woken by the first frame with motion")
+
+    # Someone standing still keeps detection running via the tracked face
+    for i in range(40):
+        assert gate.update(person, busy=True, now=t + 0.2 + i / fps)
+    print("✓ A tracked face keeps the pipeline awake without motion")
+    print(f"  {gate.report(detect_cost=0.03)}")
+
+    print("\n✅ PASS: Motion gate")
+
+
+def main():
+    """Run all tests"""
+    tests = [
+        ("Motion gate", test_idle_and_wake),
+    ]
+
+    results = []
+    for test_name, test_func in tests:
+        try:
+            test_func()
+            results.append((test_name, True))
+        except Exception as e:
+            print(f"\n❌ FAIL: {e}")
+            results.append((test_name, False))
+
+    print("\n" + "="*70)
+    print("TEST SUMMARY")
+    print("="*70)
+    for test_name, passed in results:
+        print(f"{'✅ PASS' if passed else '❌ FAIL'}: {test_name}")
+
+    return all(passed for _, passed in results)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
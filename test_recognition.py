@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Recognition Tests
+Checks the sequential (early-exit) consensus against the batch decision.
+"""
+
+import sys
+import os
+import itertools
+from collections import Counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '.'))
+
+from src.recognition import SequentialConsensus
+
+
+def batch_decision(votes, total_frames, consensus_threshold, min_total_votes):
+    """Reference decision: count all votes after the last frame."""
+    named = [v for v in votes if v is not None]
+    if len(named) < min_total_votes or not named:
+        return None
+    name, count = Counter(named).most_common(1)[0]
+    return name if count / total_frames >= consensus_threshold else None
+
+
+def test_sequential_matches_batch():
+    """Early exit never changes the accept/reject decision"""
+    print("\n" + "="*70)
+    print("TEST: Sequential consensus == batch consensus")
+    print("="*70)
+
+    checked = 0
+    early = 0
+    for total_frames in range(1, 6):
+        for threshold in (0.3, 0.5, 0.6, 0.67, 0.8, 1.0):
+            for min_votes in (1, 2, 3):
+                for votes in itertools.product(["A", "B", None], repeat=total_frames):
+                    expected = batch_decision(votes, total_frames, threshold, min_votes)
+
+                    consensus = SequentialConsensus(total_frames, threshold, min_votes)
+                    for vote in votes:
+                        if consensus.decided:
+                            break
+                        consensus.add(vote)
+
+                    assert consensus.decided
+                    assert consensus.result() == expected, (votes, threshold, min_votes)
+                    checked += 1
+                    early += consensus.remaining > 0
+
+    print(f"✓ {checked} vote sequences agree ({early} decided early)")
+    print("\n✅ PASS: Sequential consensus preserves decisions")
+
+
+def test_default_config_exits_early():
+    """With the shipped settings, hopeless sequences stop early; accepts keep the batch rule"""
+    print("\n" + "="*70)
+    print("TEST: Early exit with CONSENSUS_FRAMES settings")
+    print("="*70)
+
+    from config import CONSENSUS_FRAMES, CONSENSUS_THRESHOLD, MIN_FRAMES_FOR_DECISION
+
+    # The decision rule is unchanged: at 0.67, 2 of 3 frames (0.666...) fall short
+    consensus = SequentialConsensus(CONSENSUS_FRAMES, CONSENSUS_THRESHOLD, MIN_FRAMES_FOR_DECISION)
+    consensus.add("alice")
+    consensus.add("alice")
+    assert not consensus.decided
+    consensus.add("alice")
+    print(f"✓ Three matching frames -> decided={consensus.decided}, result={consensus.result()}")
+    assert consensus.decided and consensus.result() == "alice"
+    assert batch_decision(["alice", "alice", None], 3, 0.67, 1) is None
+    assert batch_decision(["alice", "alice", "alice"], 3, 0.67, 1) == "alice"
+
+    consensus = SequentialConsensus(CONSENSUS_FRAMES, CONSENSUS_THRESHOLD, MIN_FRAMES_FOR_DECISION)
+    consensus.add(None)
+    consensus.add(None)
+    print(f"✓ Two unknown frames -> decided={consensus.decided}, remaining={consensus.remaining}")
+    assert consensus.decided and consensus.result() is None
+    assert consensus.frames == 2 < CONSENSUS_FRAMES
+
+    print("\n✅ PASS: Hopeless verification rejected without waiting")
+
+
+def main():
+    """Run all tests"""
+    tests = [
+        ("Sequential == batch", test_sequential_matches_batch),
+        ("Early exit (config)", test_default_config_exits_early),
+    ]
+
+    results = []
+    for test_name, test_func in tests:
+        try:
+            test_func()
+            results.append((test_name, True))
+        except Exception as e:
+            print(f"\n❌ FAIL: {e}")
+            results.append((test_name, False))
+
+    print("\n" + "="*70)
+    print("TEST SUMMARY")
+    print("="*70)
+    for test_name, passed in results:
+        print(f"{'✅ PASS' if passed else '❌ FAIL'}: {test_name}")
+
+    return all(passed for _, passed in results)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
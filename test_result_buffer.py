@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Result Buffer Tests
+Checks that punches only reuse recent live-loop results: age and track
+filtering, the `limit` of fresh(), and the ring buffer bound.
+"""
+
+import sys
+import os
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '.'))
+
+from src.result_buffer import RecentResults
+
+
+def test_fresh_filtering():
+    """Stale results and other tracks are filtered out, newest kept by limit"""
+    print("\n" + "="*70)
+    print("TEST: Fresh results")
+    print("="*70)
+
+    now = time.time()
+    buffer = RecentResults(maxlen=10)
+    assert buffer.latest() is None and buffer.fresh(1.0) == []
+    for i, (age, track) in enumerate([(5.0, 1), (0.8, 1), (0.6, 2), (0.4, 1), (0.2, 1)]):
+        buffer.add(track, (i, 0, 80, 80), np.full(4, i, np.float32), 0.9, timestamp=now - age)
+
+    assert [r.box[0] for r in buffer.fresh(1.0)] == [1, 2, 3, 4]
+    assert [r.box[0] for r in buffer.fresh(0.5)] == [3, 4]
+    print("✓ Results older than max_age are never returned, oldest first")
+
+    assert [r.box[0] for r in buffer.fresh(1.0, track_id=1)] == [1, 3, 4]
+    assert [r.box[0] for r in buffer.fresh(1.0, track_id=2)] == [2]
+    assert buffer.fresh(1.0, track_id=3) == []
+    print("✓ Filtered by track")
+
+    assert [r.box[0] for r in buffer.fresh(1.0, track_id=1, limit=2)] == [3, 4]
+    assert [r.box[0] for r in buffer.fresh(1.0, limit=10)] == [1, 2, 3, 4]
+    assert buffer.fresh(1.0, limit=0) == []
+    print("✓ limit keeps the newest results")
+
+    assert buffer.latest().box[0] == 4
+    buffer.clear()
+    assert buffer.latest() is None and buffer.fresh(10.0) == []
+    print("✓ latest() and clear()")
+
+    print("\n✅ PASS: Fresh results")
+
+
+def test_ring_bound():
+    """Only the newest maxlen results are kept"""
+    print("\n" + "="*70)
+    print("TEST: Ring buffer bound")
+    print("="*70)
+
+    buffer = RecentResults(maxlen=3)
+    for i in range(7):
+        buffer.add(1, (i, 0, 80, 80), None, 0.9)
+    assert [r.box[0] for r in buffer.fresh(60.0)] == [4, 5, 6]
+    print("✓ Oldest results fall off once maxlen is reached")
+
+    print("\n✅ PASS: Ring buffer bound")
+
+
+def test_carried_over_crops():
+    """Crops re-cut at a reused box never reach a punch consensus"""
+    print("\n" + "="*70)
+    print("TEST: Carried-over crops")
+    print("="*70)
+
+    from src.recognition import SequentialConsensus
+
+    buffer = RecentResults(maxlen=10)
+    buffer.add(1, (0, 0, 80, 80), "alice", 0.9)
+    # Detection skipped: the last box was re-cropped (maybe someone else by now)
+    for i in range(1, 4):
+        buffer.add(1, (i, 0, 80, 80), "alice", 0.9, detected=False)
+    assert not buffer.latest().detected
+    assert [r.box[0] for r in buffer.fresh(1.0, track_id=1)] == [0]
+    print("✓ fresh() returns detected results only")
+
+    consensus = SequentialConsensus(3, 0.67, 2)
+    for result in buffer.fresh(1.0, track_id=1, limit=3):
+        consensus.add(result.embedding)
+    assert consensus.frames == 1 and not consensus.decided and consensus.remaining == 2
+    print("✓ Stale crops cast no votes; the punch waits for detected frames")
+
+    print("\n✅ PASS: Carried-over crops")
+
+
+def main():
+    """Run all tests"""
+    tests = [
+        ("Fresh results", test_fresh_filtering),
+        ("Ring buffer bound", test_ring_bound),
+        ("Carried-over crops", test_carried_over_crops),
+    ]
+
+    results = []
+    for test_name, test_func in tests:
+        try:
+            test_func()
+            results.append((test_name, True))
+        except Exception as e:
+            print(f"\n❌ FAIL: {e}")
+            results.append((test_name, False))
+
+    print("\n" + "="*70)
+    print("TEST SUMMARY")
+    print("="*70)
+    for test_name, passed in results:
+        print(f"{'✅ PASS' if passed else '❌ FAIL'}: {test_name}")
+
+    return all(passed for _, passed in results)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Scheduler Tests
+Checks the detection / recognition rates chosen from measured latencies.
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '.'))
+
+from src.scheduler import AdaptiveScheduler
+
+
+def test_rates_follow_hardware():
+    """Fast machines recognize as often as the latency target needs, slow ones back off"""
+    print("\n" + "="*70)
+    print("TEST: Adaptive rates")
+    print("="*70)
+
+    period = 1 / 30
+    scheduler = AdaptiveScheduler(cpu_budget=0.6, target_latency=0.4)
+
+    # Desktop: 5 ms detection, 15 ms recognition - the latency target decides
+    assert scheduler.plan(0.005, 0.015, period) == (1, 11, False)
+    print("✓ Fast hardware: recognition only as often as the latency target needs")
+
+    # Kiosk: 15 ms detection, 120 ms recognition - the budget decides
+    detect, recognize, over = scheduler.plan(0.015, 0.120, period)
+    assert detect == 1 and recognize == 24 and not over
+    assert 0.015 / detect + 0.120 / recognize <= 0.6 * period + 1e-9
+    print("✓ Slow hardware: rates lowered to stay within the CPU budget")
+
+    # Detection alone over budget: carry boxes over between detections
+    detect, recognize, over = scheduler.plan(0.030, 0.120, period)
+    assert detect == 2 and 0.030 / detect + 0.120 / recognize <= 0.6 * period
+    assert scheduler.plan(0.5, 1.0, period) == (3, 30, True)
+    print("✓ Detection skipped before giving up; over-budget flagged")
+
+    # No latency target: as often as the budget allows
+    eager = AdaptiveScheduler(cpu_budget=0.6, target_latency=0)
+    assert eager.plan(0.005, 0.015, period) == (1, 1, False)
+    print("✓ Without a latency target the whole budget is used")
+
+    print("\n✅ PASS: Adaptive rates")
+
+
+def test_replan_period():
+    """Intervals change only every `period` frames, once both stages are measured"""
+    print("\n" + "="*70)
+    print("TEST: Re-planning")
+    print("="*70)
+
+    scheduler = AdaptiveScheduler(cpu_budget=0.6, target_latency=0.4, period=10,
+                                  recognize_interval=5)
+    assert not any(scheduler.tick(0.005, 0.0, 1 / 30) for _ in range(20))
+    assert scheduler.recognize_interval == 5
+    changes = [scheduler.tick(0.005, 0.015, 1 / 30) for _ in range(10)]
+    assert changes == [False] * 9 + [True] and scheduler.recognize_interval == 11
+    assert scheduler.due("recognize", 22) and not scheduler.due("recognize", 23)
+    print("✓ Re-planned after measurements, on the period boundary")
+
+    fixed = AdaptiveScheduler(adaptive=False, recognize_interval=5)
+    assert not any(fixed.tick(0.005, 0.015, 1 / 30) for _ in range(100))
+    assert (fixed.detect_interval, fixed.recognize_interval) == (1, 5)
+    print("✓ Fixed FRAME_SKIP when adaptive scheduling is off")
+
+    print("\n✅ PASS: Re-planning")
+
+
+def main():
+    """Run all tests"""
+    tests = [
+        ("Adaptive rates", test_rates_follow_hardware),
+        ("Re-planning", test_replan_period),
+    ]
+
+    results = []
+    for test_name, test_func in tests:
+        try:
+            test_func()
+            results.append((test_name, True))
+        except Exception as e:
+            print(f"\n❌ FAIL: {e}")
+            results.append((test_name, False))
+
+    print("\n" + "="*70)
+    print("TEST SUMMARY")
+    print("="*70)
+    for test_name, passed in results:
+        print(f"{'✅ PASS' if passed else '❌ FAIL'}: {test_name}")
+
+    return all(passed for _, passed in results)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
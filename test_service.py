@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Service Tests
+Checks request parsing and the HTTP/WebSocket plumbing of the local
+recognition service.
+"""
+
+import sys
+import os
+import asyncio
+import base64
+import hashlib
+import json
+import struct
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '.'))
+
+from src.service import HttpService, HttpError, Request, WS_GUID
+
+
+def jpeg(seed):
+    image = np.random.default_rng(seed).integers(0, 255, (48, 64, 3), dtype=np.uint8)
+    return cv2.imencode(".jpg", image)[1].tobytes()
+
+
+def test_request_images():
+    """Single JPEG and multipart bodies decode to one image per part"""
+    print("\n" + "="*70)
+    print("TEST: Request images")
+    print("="*70)
+
+    single = Request("POST", "/identify?crop=1", {"content-type": "image/jpeg"}, jpeg(0))
+    assert single.path == "/identify" and single.flag("crop")
+    assert [image.shape for image in single.images()] == [(48, 64, 3)]
+
+    boundary = "frames"
+    body = b"".join(f"--{boundary}\r\nContent-Type: image/jpeg\r\n"
+                    f"Content-Disposition: form-data; name=\"f{i}\"\r\n\r\n".encode()
+                    + jpeg(i) + b"\r\n" for i in range(3)) + f"--{boundary}--\r\n".encode()
+    multi = Request("POST", "/punch?type=in", {
+        "content-type": f"multipart/form-data; boundary={boundary}"}, body)
+    assert len(multi.images()) == 3 and multi.query["type"] == "in"
+    print("✓ JPEG and multipart/form-data bodies")
+
+    try:
+        Request("POST", "/identify", {}, b"not an image").images()
+        assert False, "garbage accepted"
+    except HttpError as e:
+        assert e.status == 400
+    print("✓ Undecodable body rejected with 400")
+
+    print("\n✅ PASS: Request images")
+
+
+def test_http_and_websocket():
+    """Routing, errors, keep-alive and a WebSocket echo over a real socket"""
+    print("\n" + "="*70)
+    print("TEST: HTTP / WebSocket")
+    print("="*70)
+
+    async def echo(request):
+        if request.flag("fail"):
+            raise HttpError(409, "nope")
+        return 200, {"path": request.path, "bytes": len(request.body)}
+
+    async def stream(request, ws):
+        while (message := await ws.receive()) is not None:
+            await ws.send_json({"got": len(message)})
+
+    async def scenario():
+        service = await HttpService("127.0.0.1:0", {("POST", "/echo"): echo}, stream).start()
+        port = service._server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+
+        replies = []
+        for target, method in (("/echo", "POST"), ("/echo?fail=1", "POST"),
+                               ("/echo", "GET"), ("/missing", "POST")):
+            writer.write(f"{method} {target} HTTP/1.1\r\nContent-Length: 3\r\n\r\nabc".encode())
+            head = (await reader.readuntil(b"\r\n\r\n")).decode()
+            length = int(head.lower().split("content-length: ")[1].split("\r\n")[0])
+            replies.append((int(head.split()[1]), json.loads(await reader.readexactly(length))))
+
+        ws_reader, ws_writer = await asyncio.open_connection("127.0.0.1", port)
+        key = base64.b64encode(b"0123456789abcdef").decode()
+        ws_writer.write(f"GET /ws HTTP/1.1\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                        f"Sec-WebSocket-Key: {key}\r\n\r\n".encode())
+        handshake = (await ws_reader.readuntil(b"\r\n\r\n")).decode()
+        mask, payload = b"\x01\x02\x03\x04", b"x" * 300
+        masked = bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+        ws_writer.write(struct.pack("!BBH", 0x82, 0x80 | 126, len(payload)) + mask + masked)
+        head = await ws_reader.readexactly(2)
+        echoed = json.loads(await ws_reader.readexactly(head[1] & 0x7F))
+
+        writer.close()
+        ws_writer.close()
+        service.close()
+        return replies, handshake, echoed, service.requests
+
+    replies, handshake, echoed, served = asyncio.run(scenario())
+    assert replies[0] == (200, {"path": "/echo", "bytes": 3})
+    assert [status for status, _ in replies[1:]] == [409, 405, 404]
+    assert served == 4
+    print("✓ Routing, handler errors, 405/404, four requests on one keep-alive connection")
+
+    accept = base64.b64encode(hashlib.sha1((base64.b64encode(b"0123456789abcdef").decode()
+                                            + WS_GUID).encode()).digest()).decode()
+    assert "101 Switching Protocols" in handshake and accept in handshake
+    assert echoed == {"got": 300}
+    print("✓ WebSocket handshake and masked 16-bit-length frame")
+
+    print("\n✅ PASS: HTTP / WebSocket")
+
+
+def test_malformed_headers():
+    """Bad Content-Length and oversized headers get a 400, not a dropped task"""
+    print("\n" + "="*70)
+    print("TEST: Malformed headers")
+    print("="*70)
+
+    async def echo(request):
+        return 200, {"bytes": len(request.body)}
+
+    async def send(port, raw):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(raw)
+        head = (await reader.readuntil(b"\r\n\r\n")).decode()
+        length = int(head.lower().split("content-length: ")[1].split("\r\n")[0])
+        reply = json.loads(await reader.readexactly(length))
+        closed = await reader.read() == b""
+        writer.close()
+        return int(head.split()[1]), reply, closed
+
+    async def scenario():
+        service = await HttpService("127.0.0.1:0", {("POST", "/echo"): echo}).start()
+        port = service._server.sockets[0].getsockname()[1]
+        replies = []
+        for length in ("abc", "-5"):
+            replies.append(await send(port, f"POST /echo HTTP/1.1\r\n"
+                                            f"Content-Length: {length}\r\n\r\n".encode()))
+        replies.append(await send(port, b"POST /echo HTTP/1.1\r\nX-Pad: " + b"x" * (70 << 10)))
+        replies.append(await send(port, b"POST /echo HTTP/1.1\r\nContent-Length: 2\r\n"
+                                        b"Connection: close\r\n\r\nok"))
+        service.close()
+        return replies
+
+    replies = asyncio.run(scenario())
+    for status, reply, closed in replies[:3]:
+        assert status == 400 and closed, (status, reply)
+    assert [reply["error"] for _, reply, _ in replies[:3]] == [
+        "invalid Content-Length", "invalid Content-Length", "request header too large"]
+    print("✓ Non-numeric and negative Content-Length answered with 400")
+    print("✓ Header over the stream limit answered with 400")
+
+    assert replies[3][:2] == (200, {"bytes": 2})
+    print("✓ Service keeps serving afterwards")
+
+    print("\n✅ PASS: Malformed headers")
+
+
+def main():
+    """Run all tests"""
+    tests = [
+        ("Request images", test_request_images),
+        ("HTTP / WebSocket", test_http_and_websocket),
+        ("Malformed headers", test_malformed_headers),
+    ]
+
+    results = []
+    for test_name, test_func in tests:
+        try:
+            test_func()
+            results.append((test_name, True))
+        except Exception as e:
+            print(f"\n❌ FAIL: {e}")
+            results.append((test_name, False))
+
+    print("\n" + "="*70)
+    print("TEST SUMMARY")
+    print("="*70)
+    for test_name, passed in results:
+        print(f"{'✅ PASS' if passed else '❌ FAIL'}: {test_name}")
+
+    return all(passed for _, passed in results)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
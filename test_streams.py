@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Multi-Camera Tests
+Checks round-robin batching across streams and batched recognition.
+"""
+
+import sys
+import os
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '.'))
+
+from src.streams import FairBatcher
+from src.recognition import recognize_batch, recognize_single
+from src.gallery import Gallery
+
+
+def test_fair_batches():
+    """A busy stream can't starve the others"""
+    print("\n" + "="*70)
+    print("TEST: Round-robin batching across streams")
+    print("="*70)
+
+    batcher = FairBatcher(batch_size=2, per_stream=3)
+    for i in range(5):
+        batcher.submit("busy", i)
+    batcher.submit("quiet-1", "a")
+    batcher.submit("quiet-2", "b")
+    assert batcher.dropped["busy"] == 2 and len(batcher) == 5
+    print("✓ Only the newest crops of a stream stay queued")
+
+    first = batcher.next_batch()
+    second = batcher.next_batch()
+    assert [s for s, _ in first] == ["busy", "quiet-1"]
+    assert [s for s, _ in second] == ["quiet-2", "busy"]
+    assert first[0][1] == 2 and second[1][1] == 3
+    print("✓ Batches rotate the first stream served")
+
+    remaining = batcher.next_batch()
+    assert remaining == [("busy", 4)] and batcher.next_batch() == []
+    batcher.remove("quiet-1")
+    batcher.submit("quiet-2", "c")
+    assert batcher.next_batch() == [("quiet-2", "c")]
+    print("✓ Queues drain and removed streams are skipped")
+
+    print("\n✅ PASS: Round-robin batching across streams")
+
+
+def test_batch_matches_single():
+    """Batched recognition gives the per-face result"""
+    print("\n" + "="*70)
+    print("TEST: recognize_batch == recognize_single")
+    print("="*70)
+
+    rng = np.random.default_rng(0)
+    db = {f"user{i}": rng.normal(size=(2, 64)) for i in range(20)}
+    gallery = Gallery.from_db(db)
+    queries = np.concatenate([db["user3"][:1] + 0.1 * rng.normal(size=(1, 64)),
+                              rng.normal(size=(5, 64)), -db["user7"][:1]])
+    for threshold in (0.0, 0.75):
+        batched = recognize_batch(queries, gallery, threshold)
+        single = [recognize_single(q, gallery, threshold) for q in queries]
+        assert [n for n, _ in batched] == [n for n, _ in single]
+        assert np.allclose([s for _, s in batched], [s for _, s in single], atol=1e-5)
+    assert recognize_batch(queries, Gallery.from_db({})) == [(None, 0.0)] * len(queries)
+    print("✓ Same names and scores, including empty gallery")
+
+    print("\n✅ PASS: recognize_batch == recognize_single")
+
+
+def main():
+    """Run all tests"""
+    tests = [
+        ("Round-robin batching", test_fair_batches),
+        ("Batched recognition", test_batch_matches_single),
+    ]
+
+    results = []
+    for test_name, test_func in tests:
+        try:
+            test_func()
+            results.append((test_name, True))
+        except Exception as e:
+            print(f"\n❌ FAIL: {e}")
+            results.append((test_name, False))
+
+    print("\n" + "="*70)
+    print("TEST SUMMARY")
+    print("="*70)
+    for test_name, passed in results:
+        print(f"{'✅ PASS' if passed else '❌ FAIL'}: {test_name}")
+
+    return all(passed for _, passed in results)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Tracking & Temporal Liveness Tests
+Checks IoU track association and loss, the per-track crop ring buffer and
+fusion of single-frame and temporal liveness scores.
+"""
+
+import sys
+import os
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '.'))
+
+from src.tracking import FaceTracker, iou
+from src.liveness import TemporalLiveness, fuse_liveness
+
+
+def test_tracker():
+    """Boxes keep their track while they overlap; unmatched tracks are dropped"""
+    print("\n" + "="*70)
+    print("TEST: IoU tracker")
+    print("="*70)
+
+    assert iou((0, 0, 10, 10), (0, 0, 10, 10)) == 1.0
+    assert iou((0, 0, 10, 10), (20, 20, 10, 10)) == 0.0
+    assert abs(iou((0, 0, 10, 10), (5, 0, 10, 10)) - 50 / 150) < 1e-9
+    print("✓ IoU of identical, disjoint and half-overlapping boxes")
+
+    tracker = FaceTracker(iou_threshold=0.3, max_missed=2)
+    a, b = tracker.update([(100, 100, 80, 80), (300, 100, 80, 80)])
+    assert a != b
+    # Both faces drift; listed in the other order the ids follow the boxes
+    assert tracker.update([(305, 102, 80, 80), (104, 98, 80, 80)]) == [b, a]
+    print("✓ Drifting boxes keep their track ids")
+
+    # Both faces leave; someone appears elsewhere
+    c, = tracker.update([(500, 100, 80, 80)])
+    assert c not in (a, b) and tracker.lost == []
+    print("✓ A distant box starts a new track")
+
+    tracker.update([(500, 100, 80, 80)])
+    assert tracker.lost == []
+    tracker.update([(500, 100, 80, 80)])
+    assert sorted(tracker.lost) == sorted([a, b]) and list(tracker.tracks) == [c]
+    print(f"✓ Tracks missed for more than {tracker.max_missed} frames are lost")
+
+    # Two detections competing for one track: the higher IoU wins
+    tracker = FaceTracker(iou_threshold=0.3)
+    t, = tracker.update([(100, 100, 80, 80)])
+    ids = tracker.update([(130, 100, 80, 80), (102, 100, 80, 80)])
+    assert ids[1] == t and ids[0] != t
+    tracker.reset()
+    assert tracker.lost == [t, ids[0]] and not tracker.tracks
+    print("✓ Greedy matching by highest IoU; reset reports every track lost")
+
+    print("\n✅ PASS: IoU tracker")
+
+
+def test_temporal_liveness():
+    """Ring buffer statistics and frozen vs moving crops"""
+    print("\n" + "="*70)
+    print("TEST: Temporal liveness")
+    print("="*70)
+
+    rng = np.random.default_rng(0)
+    face = rng.integers(0, 255, (96, 96, 3), dtype=np.uint8)
+    temporal = TemporalLiveness(window=5, size=32, min_frames=4)
+
+    scores = [temporal.update("photo", face) for _ in range(3)]
+    assert scores == [None, None, None]
+    print("✓ No score until min_frames crops were seen")
+
+    # First fill: 5 crops but only 4 residuals (slot 0 is still unwritten).
+    # The score must match a larger window holding the same 5 crops.
+    fill = TemporalLiveness(window=5, size=32, min_frames=4)
+    wide = TemporalLiveness(window=10, size=32, min_frames=4)
+    for i in range(5):
+        frame = np.clip(face.astype(int) + rng.integers(-3, 4, face.shape), 0, 255).astype(np.uint8)
+        filled, reference = fill.update("fill", frame), wide.update("fill", frame)
+    first = fill._buffers["fill"]
+    assert first.count == 5 and first.res_count == 4 and first.residuals[0] == 0.0
+    mean, std = fill._window_stats(first)
+    assert abs(mean - first.residuals[1:].mean()) < 1e-9
+    assert abs(std - first.residuals[1:].std()) < 1e-6
+    assert (mean, std) == wide._window_stats(wide._buffers["fill"]) and filled == reference
+    print(f"✓ At count == window the score averages the {first.res_count} residuals written")
+
+    for _ in range(10):  # Wrap the ring buffer twice
+        score = temporal.update("photo", face)
+    buf = temporal._buffers["photo"]
+    assert buf.count == 5 and buf.index == 13 % 5 and buf.res_count == 5
+    assert abs(buf.res_sum - buf.residuals.sum()) < 1e-6
+    assert abs(buf.res_sq - (buf.residuals ** 2).sum()) < 1e-6
+    assert score < 0.5
+    print(f"✓ Ring buffer holds {buf.count} crops, running sums match the window")
+    print(f"✓ Frozen crop scores low ({score:.2f})")
+
+    for _ in range(10):
+        moving = np.clip(face.astype(int) + rng.integers(-25, 26, face.shape), 0, 255)
+        live = temporal.update("live", moving.astype(np.uint8))
+    assert live > score
+    print(f"✓ Crops with non-rigid change score higher ({live:.2f})")
+
+    temporal.reset("photo")
+    assert temporal.score("photo") is None and temporal.score("live") is not None
+    temporal.reset()
+    assert temporal.score("live") is None
+    print("✓ Reset per track and for all tracks")
+
+    print("\n✅ PASS: Temporal liveness")
+
+
+def test_fusion():
+    """Temporal score blended in with its weight, static alone without it"""
+    print("\n" + "="*70)
+    print("TEST: Liveness fusion")
+    print("="*70)
+
+    assert fuse_liveness(0.8, None) == 0.8
+    assert abs(fuse_liveness(0.8, 0.2, temporal_weight=0.4) - 0.56) < 1e-9
+    assert fuse_liveness(0.8, 0.2, temporal_weight=0.0) == 0.8
+    assert fuse_liveness(0.8, 0.2, temporal_weight=1.0) == 0.2
+    print("✓ Weighted blend; static score alone while the track warms up")
+
+    print("\n✅ PASS: Liveness fusion")
+
+
+def main():
+    """Run all tests"""
+    tests = [
+        ("IoU tracker", test_tracker),
+        ("Temporal liveness", test_temporal_liveness),
+        ("Liveness fusion", test_fusion),
+    ]
+
+    results = []
+    for test_name, test_func in tests:
+        try:
+            test_func()
+            results.append((test_name, True))
+        except Exception as e:
+            print(f"\n❌ FAIL: {e}")
+            results.append((test_name, False))
+
+    print("\n" + "="*70)
+    print("TEST SUMMARY")
+    print("="*70)
+    for test_name, passed in results:
+        print(f"{'✅ PASS' if passed else '❌ FAIL'}: {test_name}")
+
+    return all(passed for _, passed in results)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)